@@ -0,0 +1,35 @@
+import sys
+import time
+from src.trinity.preprocessing import load_and_clean_coa, load_and_clean_gl, week_windows
+from src.trinity.cash import begin_cash, buil_actual_weekly_cash, project_cash
+from src.trinity.backtest import rolling_origins, run_backtest
+
+# Usage: python -m benchmarks.bench_backtest [n_origins]
+N_ORIGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 52
+COA_PATH = "tests/Grace Global Logistics Inc_Account List.xlsx"
+GL_PATH = "tests/Grace Global Logistics Inc_Transaction Detail by Account.xlsx"
+N_RERUN = 5
+
+coa, bank_accounts, cc_accounts = load_and_clean_coa(COA_PATH)
+gl = load_and_clean_gl(GL_PATH, coa)
+origins = rolling_origins(gl, N_ORIGINS)
+print(f"{len(gl)} GL rows, {len(origins)} origins ({origins[0].date()} .. {origins[-1].date()})")
+
+t0 = time.perf_counter()
+origin_scores, line_scores = run_backtest(gl, bank_accounts, cc_accounts, origins)
+cube = time.perf_counter() - t0
+print(f"history cube: {cube:.3f}s")
+print(origin_scores[["total_mae", "total_bias", "ending_balance_error"]].describe().round(2))
+
+# The pipeline path: reload the GL and rebuild the weekly pivot for every origin
+t0 = time.perf_counter()
+for origin in origins[:N_RERUN]:
+    (PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, all_week_starts, hist_week_starts, cadence_start,
+     cadence_end, proj_end_date) = week_windows(origin)
+    gl_run = load_and_clean_gl(GL_PATH, coa)
+    bank_tx, _, _ = begin_cash(gl_run, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+    bank_actual_pivot, idx_names = buil_actual_weekly_cash(bank_tx, all_week_starts)
+    project_cash(bank_actual_pivot, bank_tx, cadence_start, cadence_end, cc_accounts, proj_week_starts,
+                 PROJ_WEEK1_START, proj_end_date, hist_week_starts, idx_names)
+rerun = (time.perf_counter() - t0) / N_RERUN * len(origins)
+print(f"re-run per origin (extrapolated from {N_RERUN}): {rerun:.3f}s  ({rerun / cube:.1f}x)")
@@ -0,0 +1,58 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.trinity.projections import classify_cadence_grouped
+from tests.reference import classify_cadence
+
+# Usage: python -m benchmarks.bench_cadence [n_lines]
+N_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+CADENCE_START = pd.Timestamp("2025-01-12")
+CADENCE_END = pd.Timestamp("2026-01-11")
+
+
+def synthetic_dates(n_lines, seed=0):
+    """
+    (line code, date) table cycling through weekly, biweekly, monthly, twice-monthly,
+    quarterly, random and jittered-monthly lines.
+    """
+    rng = np.random.default_rng(seed)
+    month_starts = pd.date_range(CADENCE_START, CADENCE_END, freq="MS")
+    codes, dates = [], []
+    for i in range(n_lines):
+        kind = i % 7
+        if kind == 0:
+            d = pd.date_range(CADENCE_START + pd.Timedelta(days=int(rng.integers(0, 7))), CADENCE_END, freq="7D")
+        elif kind == 1:
+            d = pd.date_range(CADENCE_START + pd.Timedelta(days=int(rng.integers(0, 14))), CADENCE_END, freq="14D")
+        elif kind == 2:
+            d = month_starts + pd.Timedelta(days=int(rng.integers(0, 27)))
+        elif kind == 3:
+            d = month_starts.append(month_starts + pd.Timedelta(days=14))
+        elif kind == 4:
+            d = pd.date_range(CADENCE_START, CADENCE_END, freq="QS") + pd.Timedelta(days=int(rng.integers(0, 20)))
+        elif kind == 5:
+            d = CADENCE_START + pd.to_timedelta(rng.integers(0, 365, size=int(rng.integers(0, 12))), unit="D")
+        else:
+            d = month_starts + pd.to_timedelta(rng.integers(-3, 4, size=len(month_starts)), unit="D")
+        codes.append(np.full(len(d), i))
+        dates.append(np.asarray(d, dtype="datetime64[ns]"))
+    return np.concatenate(codes), pd.Series(np.concatenate(dates))
+
+
+codes, dates = synthetic_dates(N_LINES)
+print(f"{N_LINES} lines, {len(dates)} dates")
+
+t0 = time.perf_counter()
+grouped = classify_cadence_grouped(codes, dates, CADENCE_START, CADENCE_END, n_lines=N_LINES)
+t_grouped = time.perf_counter() - t0
+print(f"grouped: {t_grouped:.3f}s  {pd.Series(grouped).value_counts().to_dict()}")
+
+t0 = time.perf_counter()
+per_line = np.full(N_LINES, "irregular", dtype=object)
+for code, ds in dates.groupby(codes):
+    per_line[code] = classify_cadence(ds, CADENCE_START, CADENCE_END)
+t_loop = time.perf_counter() - t0
+print(f"per line: {t_loop:.3f}s  ({t_loop / t_grouped:.0f}x)")
+
+assert (per_line == grouped).all(), "grouped labels differ from classify_cadence"
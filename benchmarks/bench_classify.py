@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+import time
+import pandas as pd
+
+# Usage: python -m benchmarks.bench_classify [n_outflow_lines] [latency seconds] [seconds per name]
+# Runs against a local stand-in of the Responses API, no network or API key needed.
+N_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+LATENCY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+PER_NAME = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from openai import AsyncOpenAI
+from src.trinity.classify_transactions import classify_inflows, classify_outflows, get_calssifications_async, chunk_names
+from tests.stub_openai import StubServer
+
+
+# Unmapped accounts: the type rules don't settle them, so every line goes to the model
+def present(names, split_type="Unmapped"):
+    return pd.DataFrame(index=pd.MultiIndex.from_tuples(
+        [(name, split_type, "") for name in names], names=["split_account","split_type","split_detail_type"]))
+
+
+inflows = present([f"Customer {i:04d}" for i in range(N_LINES // 4)] + ["Line of Credit Advance"])
+outflows = present([f"Vendor {i:04d}" for i in range(N_LINES)] + ["Owner's Pay"])
+n_chunks = len(chunk_names(inflows.index.get_level_values(0))) + len(chunk_names(outflows.index.get_level_values(0)))
+print(f"{len(inflows)} inflow + {len(outflows)} outflow lines, {n_chunks} chunks, "
+      f"stub latency {LATENCY}s + {PER_NAME}s per name")
+
+with StubServer(latency=LATENCY, per_name=PER_NAME) as stub:
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    t0 = time.perf_counter()
+    classify_inflows(inflows.index.get_level_values(0).to_list())
+    classify_outflows(outflows.index.get_level_values(0).to_list())
+    serial = time.perf_counter() - t0
+    print(f"sequential, one request per list: {serial:.2f}s")
+
+    async def run():
+        async with AsyncOpenAI(base_url=stub.base_url, max_retries=0) as llm:
+            return await get_calssifications_async(inflows, outflows, llm=llm)
+
+    t0 = time.perf_counter()
+    n_async = stub.requests
+    asyncio.run(run())
+    concurrent = time.perf_counter() - t0
+    n_async = stub.requests - n_async
+    print(f"async, chunked and concurrent: {concurrent:.2f}s  ({serial / concurrent:.1f}x, {n_async} requests, peak {stub.peak} in flight)")
@@ -0,0 +1,38 @@
+import statistics
+import subprocess
+import sys
+
+# Usage: python -m benchmarks.bench_import [module] [budget ms]
+# Cold-start cost of importing the pipeline, from `python -X importtime`. Exits 1 when the
+# median is over the budget or a heavy optional dependency is imported eagerly, so CI can track it.
+MODULE = sys.argv[1] if len(sys.argv) > 1 else "src.trinity.pipeline"
+BUDGET_MS = float(sys.argv[2]) if len(sys.argv) > 2 else None
+N_RUNS = 5
+LAZY = ("streamlit", "openai", "openpyxl", "pydantic", "tenacity", "dotenv")
+
+
+def import_profile(module):
+    """
+    One cold import in a fresh interpreter. returns ({module: (self us, cumulative us)}, imported lazy modules)
+    """
+    check = f"import sys, {module}; print(','.join(m for m in {LAZY!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", check], capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            self_us, cum_us, name = line[len("import time:"):].split("|")
+            times[name.strip()] = (int(self_us), int(cum_us))
+    return times, [m for m in proc.stdout.strip().split(",") if m]
+
+
+runs = [import_profile(MODULE) for _ in range(N_RUNS)]
+total_ms = statistics.median(times[MODULE][1] for times, _ in runs) / 1000
+times, eager = runs[-1]
+
+print(f"import {MODULE}: {total_ms:.0f} ms (median of {N_RUNS})")
+for name, (self_us, cum_us) in sorted(times.items(), key=lambda t: -t[1][0])[:10]:
+    print(f"  {self_us / 1000:7.1f} ms self  {cum_us / 1000:7.1f} ms cumulative  {name}")
+if eager:
+    print(f"imported eagerly: {', '.join(eager)}")
+if eager or (BUDGET_MS is not None and total_ms > BUDGET_MS):
+    sys.exit(1)
@@ -0,0 +1,56 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.trinity.preprocessing import week_windows, monday_week_start
+from src.trinity.cash import project_bank_lines
+from tests.reference import project_line
+
+# Usage: python -m benchmarks.bench_projection [n_lines]
+N_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def synthetic_bank_tx(n_lines, cadence_start, cadence_end, seed=0):
+    """
+    Mix of weekly-flow, monthly and sparse lines over the cadence window.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(cadence_start, cadence_end, freq="D")
+    frames = []
+    for i in range(n_lines):
+        kind = i % 3
+        if kind == 0:
+            dates = days[rng.random(len(days)) < 0.3]
+        elif kind == 1:
+            dates = days[days.day == 1 + i % 28]
+        else:
+            dates = days[rng.choice(len(days), size=3, replace=False)]
+        frames.append(pd.DataFrame({
+            "split_account": f"Line {i}",
+            "split_type": "Expenses",
+            "split_detail_type": "",
+            "date": dates,
+            "amount": -rng.gamma(2.0, 100.0, len(dates)).round(2),
+        }))
+    tx = pd.concat(frames, ignore_index=True)
+    tx["week_start"] = monday_week_start(tx["date"])
+    return tx
+
+
+(PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, _, hist_week_starts, cadence_start,
+ cadence_end, proj_end_date) = week_windows("2026-01-12")
+tx = synthetic_bank_tx(N_LINES, cadence_start, cadence_end)
+print(f"{N_LINES} lines, {len(tx)} transactions")
+
+t0 = time.perf_counter()
+lines, proj, method = project_bank_lines(tx, IDX_NAMES, hist_week_starts, proj_week_starts,
+                                         PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+batched = time.perf_counter() - t0
+print(f"batched: {batched:.3f}s  {method.value_counts().to_dict()}")
+
+t0 = time.perf_counter()
+for key, df_line in tx.groupby(IDX_NAMES):
+    project_line(df_line, hist_week_starts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+per_line = time.perf_counter() - t0
+print(f"per line: {per_line:.3f}s  ({per_line / batched:.1f}x)")
@@ -0,0 +1,11 @@
+import sys
+from src.trinity.readers import benchmark_readers, GL_SKIPROWS, GL_COLUMNS, COA_SKIPROWS, COA_COLUMNS
+
+# Usage: python -m benchmarks.bench_readers <GL xlsx> [<COA xlsx>]
+GL_PATH = sys.argv[1] if len(sys.argv) > 1 else "tests/Grace Global Logistics Inc_Transaction Detail by Account.xlsx"
+COA_PATH = sys.argv[2] if len(sys.argv) > 2 else "tests/Grace Global Logistics Inc_Account List.xlsx"
+
+print(f"GL: {GL_PATH}")
+benchmark_readers(GL_PATH, GL_SKIPROWS, GL_COLUMNS)
+print(f"COA: {COA_PATH}")
+benchmark_readers(COA_PATH, COA_SKIPROWS, COA_COLUMNS)
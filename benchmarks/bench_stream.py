@@ -0,0 +1,48 @@
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from src.trinity.excel_stream import SheetStreamer
+
+# Usage: python -m benchmarks.bench_stream [n_transactions]
+# Time and peak Python memory of writing the CC Spend - Transactions sheet with pandas
+# (openpyxl cell objects for every value) against the write-only streamer.
+N_TXN = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+rng = np.random.default_rng(0)
+tx = pd.DataFrame({
+    "date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, N_TXN), unit="D"),
+    "account": rng.choice(["Card A", "Card B", "Card C"], N_TXN),
+    "account_name": rng.choice(["Card A", "Card B", "Card C"], N_TXN),
+    "name": rng.choice([f"Vendor {i}" for i in range(500)], N_TXN),
+    "memo": rng.choice(["", "fuel", "meals", "travel"], N_TXN),
+    "split_account": rng.choice([f"Expense {i}" for i in range(40)], N_TXN),
+    "amount": rng.gamma(2.0, 50.0, N_TXN).round(2),
+}).sort_values(["account_name", "date"])
+
+
+def with_pandas():
+    with pd.ExcelWriter(BytesIO(), engine="openpyxl") as writer:
+        tx.to_excel(writer, sheet_name="CC Spend - Transactions", index=False)
+
+
+def streamed():
+    wb = Workbook(write_only=True)
+    SheetStreamer(wb).write_frame("CC Spend - Transactions", tx)
+    wb.save(BytesIO())
+
+
+print(f"{N_TXN} transactions x {tx.shape[1]} columns")
+for label, write in [("pandas / openpyxl cells", with_pandas), ("write-only streamer", streamed)]:
+    t0 = time.perf_counter()
+    write()
+    elapsed = time.perf_counter() - t0
+    # a second, traced run for the peak (tracing slows it down too much to time)
+    tracemalloc.start()
+    write()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:24s} {elapsed:6.2f}s  peak {peak / 1e6:7.1f} MB")
@@ -0,0 +1,56 @@
+import sys
+import time
+from io import BytesIO
+import pandas as pd
+from openpyxl import Workbook
+from src.trinity.excel_stream import SheetStreamer
+from src.trinity.postprocessing import projections_table, write_projections_sheet
+from tests.reference import add_category_formulas, style_projections_sheet_by_cell
+from tests.synthetic import synthetic_output
+
+# Usage: python -m benchmarks.bench_styling [max_lines]
+# The Projections (Table) sheet built in a regular worksheet, given its formulas and then styled
+# cell by cell (a Font and number format per cell), against streaming it as cells that carry
+# their formula and named style, over growing lines x weeks grids. Times include saving; also
+# reports the size of the saved styles part.
+MAX_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 1600
+SIZES = [(n, w) for n, w in [(100, 17), (400, 30), (800, 56), (1600, 104), (3200, 104)] if n <= MAX_LINES]
+
+
+def by_cell(proj_sheet, indexes):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Projections (Table)"
+    streamer = SheetStreamer(Workbook(write_only=True))
+    streamer.append_header(ws, proj_sheet.columns)
+    streamer.append_rows(ws, proj_sheet)
+    add_category_formulas(ws, *indexes)
+    style_projections_sheet_by_cell(ws, *indexes)
+    return wb
+
+
+def streamed(proj_sheet, indexes):
+    wb = Workbook(write_only=True)
+    write_projections_sheet(wb, proj_sheet, *indexes)
+    return wb
+
+
+def styles_size(data):
+    from zipfile import ZipFile
+    return len(ZipFile(BytesIO(data)).read("xl/styles.xml"))
+
+
+print(f"{'lines x weeks':>15s} {'cells':>8s} {'by cell':>9s} {'streamed':>9s}   styles.xml by cell / streamed")
+for n_lines, n_weeks in SIZES:
+    weeks = list(pd.date_range("2025-01-06", periods=n_weeks, freq="W-MON"))
+    args = synthetic_output(weeks, n_in=n_lines // 4, n_out=n_lines - n_lines // 4, n_txn=10)
+    proj_sheet, *indexes = projections_table(weeks, *args[1:7], *args[12:14])
+    timings, sizes = [], []
+    for build in (by_cell, streamed):
+        t0 = time.perf_counter()
+        buffer = BytesIO()
+        build(proj_sheet, indexes).save(buffer)
+        timings.append(time.perf_counter() - t0)
+        sizes.append(styles_size(buffer.getvalue()))
+    cells = (len(proj_sheet) + 1) * len(proj_sheet.columns)
+    print(f"{n_lines:>7d} x {n_weeks:<5d} {cells:>8d} {timings[0]:8.2f}s {timings[1]:8.2f}s   {sizes[0]} / {sizes[1]} bytes")
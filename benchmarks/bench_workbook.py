@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from src.trinity.postprocessing import build_output_workbook
+from tests.reference import write_output_excel, calculate_category_totals, style_projections
+from tests.synthetic import synthetic_output
+
+# Usage: python -m benchmarks.bench_workbook [n_lines] [n_weeks] [n_cc_transactions]
+# Writing the output workbook: write file + reload for formulas + reload for styles + read back,
+# against the single in-memory pass that returns the bytes directly.
+N_LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+N_WEEKS = int(sys.argv[2]) if len(sys.argv) > 2 else 56
+N_TXN = int(sys.argv[3]) if len(sys.argv) > 3 else 50_000
+
+weeks = list(pd.date_range("2025-01-06", periods=N_WEEKS, freq="W-MON"))
+args = synthetic_output(weeks, n_in=N_LINES // 4, n_out=N_LINES - N_LINES // 4, n_txn=N_TXN)
+
+
+def three_passes(path):
+    indexes = write_output_excel(*args, path)
+    calculate_category_totals(path, *indexes)
+    style_projections(path, *indexes)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    t0 = time.perf_counter()
+    old = three_passes(os.path.join(tmp, "output.xlsx"))
+    t_old = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+new = build_output_workbook(*args)
+t_new = time.perf_counter() - t0
+
+print(f"{N_LINES} lines x {N_WEEKS} weeks, {N_TXN} CC transactions")
+print(f"write + reload/save x2 + read: {t_old:6.2f}s  ({len(old) / 1e6:.1f} MB)")
+print(f"single in-memory pass:         {t_new:6.2f}s  ({len(new) / 1e6:.1f} MB)  {t_old / t_new:.1f}x")
@@ -16,7 +16,7 @@ coa_file = st.file_uploader(
 )
 
 gl_file = st.file_uploader(
-    "Upload GL file", type=["xlsx", "xls"]
+    "Upload GL file", type=["xlsx", "xls", "csv", "parquet"]
 )
 
 date_strt = str(st.date_input("Select projection start date")).replace("/", "-")
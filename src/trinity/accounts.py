@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# ACCOUNT DIMENSION (COA hierarchy)
+# =========================
+
+SEPARATOR = ":"
+
+
+class AccountIndex:
+    """
+    Integer-coded account dimension built once per COA.
+
+    COA names like "Utilities:Internet" encode a parent/child tree. Accounts are numbered
+    in depth-first (pre)order, so the descendants of account i are exactly the ids
+    i+1 .. end[i]-1 and any subtree rollup is a slice of a cumulative sum.
+    Parents that only appear as a prefix (not as their own COA row) are added as
+    implicit accounts.
+    """
+
+    def __init__(self, names, types, detail_types):
+        paths = {}
+        for name, typ, det in zip(names, types, detail_types):
+            paths.setdefault(name, (typ, det, False))
+        for name in list(paths):
+            parts = name.split(SEPARATOR)
+            for k in range(1, len(parts)):
+                paths.setdefault(SEPARATOR.join(parts[:k]), ("", "", True))
+
+        # sorting by path components gives depth-first preorder
+        order = sorted(paths, key=lambda n: n.split(SEPARATOR))
+        n = len(order)
+        self.names = np.array(order, dtype=object)
+        self.types = np.array([paths[a][0] for a in order], dtype=object)
+        self.detail_types = np.array([paths[a][1] for a in order], dtype=object)
+        self.implicit = np.array([paths[a][2] for a in order], dtype=bool)
+        self.depth = np.array([a.count(SEPARATOR) for a in order], dtype=np.int64)
+        self.parent = np.full(n, -1, dtype=np.int64)
+        self.end = np.arange(1, n + 1, dtype=np.int64)
+
+        stack = []
+        for i, a in enumerate(order):
+            while stack and not a.startswith(order[stack[-1]] + SEPARATOR):
+                self.end[stack.pop()] = i
+            if stack:
+                self.parent[i] = stack[-1]
+            stack.append(i)
+        for j in stack:
+            self.end[j] = n
+
+        self._lookup = pd.Index(self.names)
+
+    @classmethod
+    def from_coa(cls, coa):
+        return cls(coa["full_name"], coa["type"], coa["detail_type"])
+
+    def __len__(self):
+        return len(self.names)
+
+    def ids(self, names, include_implicit=True):
+        """
+        Account id for each name, -1 where the name is not in the COA.
+        """
+        ids = self._lookup.get_indexer(pd.Index(names))
+        if not include_implicit:
+            ids = np.where((ids >= 0) & self.implicit[ids], -1, ids)
+        return ids
+
+    def id(self, name):
+        return int(self._lookup.get_loc(name))
+
+    def descendants(self, account_id):
+        return np.arange(account_id + 1, self.end[account_id])
+
+    def children(self, account_id):
+        return np.flatnonzero(self.parent == account_id)
+
+    def rollup(self, values):
+        """
+        values: array (n_accounts, ...) of amounts booked directly to each account.
+        returns the same shape with each account's total including all descendants.
+        """
+        values = np.asarray(values, dtype=float)
+        csum = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+        return csum[self.end] - csum[np.arange(len(self))]
+
+
+def join_account_types(gl, accounts, account_col="split_account"):
+    """
+    Attach the COA full_name/type/detail_type of account_col as full_name/split_type/split_detail_type,
+    like a left merge on full_name but by integer take. Unknown accounts get "Unmapped".
+    """
+    ids = accounts.ids(gl[account_col], include_implicit=False)
+    matched = ids >= 0
+    safe = np.where(matched, ids, 0)
+    gl["full_name"] = np.where(matched, accounts.names[safe], np.nan)
+    gl["split_type"] = np.where(matched, accounts.types[safe], "Unmapped")
+    gl["split_detail_type"] = np.where(matched, accounts.detail_types[safe], "")
+    return gl
+
+
+def weekly_rollup(tx, accounts, week_starts, account_col="split_account"):
+    """
+    Weekly totals per account including descendants (e.g. "Utilities" includes "Utilities:Internet").
+    tx needs account_col, week_start and amount. Rows outside week_starts or the COA are ignored.
+    returns DataFrame indexed by account name with week_starts as columns
+    """
+    week_starts = pd.DatetimeIndex(week_starts)
+    ids = accounts.ids(tx[account_col])
+    wk = week_starts.get_indexer(pd.DatetimeIndex(tx["week_start"]))
+    keep = (ids >= 0) & (wk >= 0)
+
+    direct = np.zeros((len(accounts), len(week_starts)))
+    np.add.at(direct, (ids[keep], wk[keep]), tx["amount"].to_numpy(dtype=float)[keep])
+    return pd.DataFrame(accounts.rollup(direct), index=pd.Index(accounts.names, name=account_col), columns=week_starts)
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from src.trinity.preprocessing import week_windows
+from src.trinity.cache import FrameCache, load_inputs, CACHE_DIR
+from src.trinity.cash import get_bank_tx, project_line_matrix
+from src.trinity.projections import weekly_matrix
+
+# =========================
+# ROLLING-ORIGIN BACKTEST (bank cash lines)
+# =========================
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+class HistoryCube:
+    """
+    Weekly bank cash per line over the whole GL, built once and sliced for every backtest origin.
+
+    Holds the (lines x weeks) matrix of non-CC bank lines plus the date-sorted transactions
+    (line code, date, amount) the cadence methods need, so each origin only takes array slices
+    instead of re-filtering and re-aggregating the ledger. CC payment lines are left out:
+    their cash impact comes from the credit card model, not from project_line_matrix.
+    """
+
+    def __init__(self, gl, bank_accounts, cc_accounts, week_starts, idx_names=IDX_NAMES):
+        bank_tx = get_bank_tx(gl, bank_accounts, cc_accounts)
+        bank_tx = bank_tx[~bank_tx["split_account"].isin(cc_accounts)]
+        # date-sorted like project_bank_lines, so weekly sums add up in the same order
+        bank_tx = bank_tx.sort_values("date", kind="stable")
+
+        self.week_starts = pd.DatetimeIndex(week_starts)
+        self.lines, self.matrix, self.codes = weekly_matrix(bank_tx, idx_names, self.week_starts)
+        self.dates = bank_tx["date"].to_numpy(dtype="datetime64[ns]")
+        self.amounts = bank_tx["amount"].to_numpy(dtype=float)
+
+    def weeks(self, week_starts):
+        cols = self.week_starts.get_indexer(pd.DatetimeIndex(week_starts))
+        if (cols < 0).any():
+            raise ValueError("Week outside the history cube; build it over a wider range")
+        return self.matrix[:, cols]
+
+    def transactions(self, start, end):
+        """
+        (codes, dates, amounts) of the transactions dated start..end (inclusive), still date-sorted.
+        """
+        lo = np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), side="left")
+        hi = np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), side="right")
+        return self.codes[lo:hi], self.dates[lo:hi], self.amounts[lo:hi]
+
+
+def rolling_origins(gl, n_origins=52, step_weeks=1):
+    """
+    The last n_origins Monday projection starts whose full 13-week horizon is covered by the GL,
+    step_weeks apart, oldest first.
+    """
+    (_, _, _, _, _, _, _, proj_week_starts, _, _, _, _, _) = week_windows(gl["date"].max())
+    n_proj_weeks = len(proj_week_starts)
+    last_full = gl["date"].max().normalize() + pd.Timedelta(days=1) - pd.Timedelta(weeks=n_proj_weeks)
+    last_monday = last_full - pd.Timedelta(days=last_full.weekday())
+    return pd.DatetimeIndex([last_monday - pd.Timedelta(weeks=step_weeks * k) for k in range(n_origins)][::-1])
+
+
+def cube_weeks(origins):
+    """
+    Every week start any origin's history or horizon touches.
+    """
+    (_, _, _, _, _, _, _, _, _, hist_week_starts, _, _, _) = week_windows(min(origins))
+    (_, _, _, _, _, _, _, proj_week_starts, _, _, _, _, _) = week_windows(max(origins))
+    return pd.date_range(hist_week_starts[0], proj_week_starts[-1], freq="W-MON")
+
+
+def project_origin(cube, date_strt):
+    """
+    project_cash for the non-CC bank lines at one origin, from cube slices.
+    returns (projection array lines x proj weeks, method array, proj_week_starts)
+    """
+    (PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, _, hist_week_starts, cadence_start,
+     cadence_end, proj_end_date) = week_windows(date_strt)
+
+    # hist weeks always lie inside the cadence window, so the sliced matrix equals the filtered one
+    codes, dates, amounts = cube.transactions(cadence_start, cadence_end)
+    proj, method = project_line_matrix(cube.weeks(hist_week_starts), codes, dates, amounts, hist_week_starts,
+                                       proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start,
+                                       cadence_end)
+    # missing last-year weeks are zero in the output sheets (get_combined_bank fills NaN)
+    return np.nan_to_num(proj), method, proj_week_starts
+
+
+def run_backtest(gl, bank_accounts, cc_accounts, origins):
+    """
+    Replay the bank line projection at every origin and score it against the actual weekly cash.
+
+    returns (origin_scores, line_scores):
+      origin_scores: one row per origin with the MAE and bias of the weekly net total and the
+        ending-balance error (projected minus actual balance at the end of the horizon, for the
+        same beginning balance)
+      line_scores: one row per line with its MAE and bias over every origin and projected week,
+        the mean absolute actual for scale, and the method it got most often
+    """
+    origins = pd.DatetimeIndex(origins)
+    cube = HistoryCube(gl, bank_accounts, cc_accounts, cube_weeks(origins))
+
+    n_lines = len(cube.lines)
+    abs_err = np.zeros(n_lines)
+    err = np.zeros(n_lines)
+    abs_actual = np.zeros(n_lines)
+    n_weeks = 0
+    methods = []
+    rows = []
+    for origin in origins:
+        proj, method, proj_week_starts = project_origin(cube, origin)
+        actual = cube.weeks(proj_week_starts)
+        diff = proj - actual
+
+        abs_err += np.abs(diff).sum(axis=1)
+        err += diff.sum(axis=1)
+        abs_actual += np.abs(actual).sum(axis=1)
+        n_weeks += diff.shape[1]
+        methods.append(method)
+
+        total_diff = diff.sum(axis=0)
+        balance_err = np.cumsum(total_diff)
+        rows.append({
+            "origin": origin,
+            "total_mae": float(np.abs(total_diff).mean()),
+            "total_bias": float(total_diff.mean()),
+            "ending_balance_error": float(balance_err[-1]),
+            "max_abs_balance_error": float(np.abs(balance_err).max()),
+            "actual_total": float(actual.sum()),
+            "projected_total": float(proj.sum()),
+        })
+
+    origin_scores = pd.DataFrame(rows).set_index("origin")
+    methods = pd.DataFrame(np.stack(methods).T if methods else np.empty((n_lines, 0)), index=cube.lines)
+    line_scores = pd.DataFrame({
+        "mae": abs_err / max(n_weeks, 1),
+        "bias": err / max(n_weeks, 1),
+        "mean_abs_actual": abs_actual / max(n_weeks, 1),
+        "method": methods.mode(axis=1)[0] if len(origins) else "",
+    }, index=cube.lines)
+    return origin_scores, line_scores.sort_values("mae", ascending=False)
+
+
+def backtest_cash_iq(COA_PATH, GL_PATH, n_origins=52, step_weeks=1, origins=None):
+    """
+    Load one GL (through the cleaned-input cache) and backtest it at n_origins rolling origins,
+    or at the given origins (Monday projection starts).
+    """
+    cache = FrameCache(CACHE_DIR) if CACHE_DIR else None
+    coa, bank_accounts, cc_accounts, gl = load_inputs(COA_PATH, GL_PATH, cache=cache)
+    if origins is None:
+        origins = rolling_origins(gl, n_origins, step_weeks)
+    return run_backtest(gl, bank_accounts, cc_accounts, origins)
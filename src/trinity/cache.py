@@ -0,0 +1,185 @@
+import datetime
+import hashlib
+import os
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from src.trinity.readers import nulls_to_nan
+from src.trinity.preprocessing import load_and_clean_coa, load_and_clean_gl, get_bank_and_cc_accounts, LOADER_VERSION
+
+# =========================
+# CLEANED INPUT CACHE (content-addressed Parquet)
+# =========================
+
+# Directory of the cache; empty (the default) disables it
+CACHE_DIR = os.getenv("CASH_IQ_CACHE_DIR", "")
+CACHE_MAX_BYTES = int(float(os.getenv("CASH_IQ_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+
+def source_bytes(source):
+    """
+    Raw bytes of an upload (Streamlit UploadedFile / file-like) or a file path.
+    """
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+        return data
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def content_key(*parts):
+    h = hashlib.sha256()
+    h.update(f"loader-v{LOADER_VERSION}".encode())
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+    return h.hexdigest()
+
+
+# Suffix of the column holding the value types of a mixed column
+TYPE_SUFFIX = "__type"
+# Value types of mixed columns by tag (most specific first), and how to read them back from their str()
+VALUE_TYPES = {
+    "bool": ((bool, np.bool_), lambda s: s == "True"),
+    "int": ((int, np.integer), int),
+    "float": ((float, np.floating), float),
+    "datetime": (datetime.datetime, pd.Timestamp),
+    "date": (datetime.date, datetime.date.fromisoformat),
+}
+
+
+def _type_tag(val):
+    for tag, (kind, _) in VALUE_TYPES.items():
+        if isinstance(val, kind):
+            return tag
+    return "str"
+
+
+def _parquet_safe(df):
+    # Parquet needs one type per column; QuickBooks text columns (num, name, memo) can mix
+    # numbers and strings. Those are stored as strings plus a "<col>__type" column of value
+    # types, which _restore_types reads back into the original values
+    df = df.copy()
+    for col in df.columns[df.dtypes.eq(object)]:
+        vals = df[col].dropna()
+        if len(vals) and vals.map(type).nunique() > 1:
+            df[col + TYPE_SUFFIX] = df[col].map(_type_tag).where(df[col].notna())
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _restore_types(df):
+    for type_col in [c for c in df.columns if c.endswith(TYPE_SUFFIX)]:
+        col = type_col[:-len(TYPE_SUFFIX)]
+        values = df[col].astype(object)
+        for tag, (_, parse) in VALUE_TYPES.items():
+            rows = df[type_col] == tag
+            if rows.any():
+                values[rows] = [parse(s) for s in df.loc[rows, col]]
+        df[col] = values
+        df = df.drop(columns=type_col)
+    return df
+
+
+class FrameCache:
+    """
+    Directory of Parquet files named by content key, capped at max_bytes.
+    Least recently used files (by mtime, refreshed on every hit) are evicted first.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key, name):
+        return os.path.join(self.cache_dir, f"{key}-{name}.parquet")
+
+    def get(self, key, name):
+        path = self._path(key, name)
+        try:
+            df = pd.read_parquet(path)
+        except (FileNotFoundError, OSError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return nulls_to_nan(_restore_types(df))
+
+    def put(self, key, name, df):
+        """
+        Store df under (key, name). Best effort: a failed write (no Parquet engine, full disk,
+        a column Parquet can't hold) is reported as a warning and the run goes on uncached.
+        returns df
+        """
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            os.close(fd)
+            _parquet_safe(df).to_parquet(tmp)
+            os.replace(tmp, self._path(key, name))
+            self.evict()
+        except Exception as exc:
+            warnings.warn(f"Could not cache {name} in {self.cache_dir}: {exc}")
+        finally:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+        return df
+
+    def size(self):
+        return sum(os.path.getsize(p) for p, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for f in os.listdir(self.cache_dir):
+            if f.endswith(".parquet"):
+                p = os.path.join(self.cache_dir, f)
+                entries.append((p, os.path.getmtime(p)))
+        return entries
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(os.path.getsize(p) for p, _ in entries)
+        for p, _ in entries:
+            if total <= self.max_bytes:
+                break
+            total -= os.path.getsize(p)
+            os.remove(p)
+
+    def clear(self):
+        for p, _ in self._entries():
+            os.remove(p)
+
+
+def load_inputs(COA_PATH, GL_PATH, cache=None, engine=None):
+    """
+    Cached load_and_clean_coa + load_and_clean_gl.
+    The COA is keyed by its bytes; the GL by its bytes and the COA bytes (the GL merge uses the COA);
+    both also by the reader engine. A hit gives the same values and dtypes as a fresh load.
+    returns coa, bank_accounts, cc_accounts, gl
+    """
+    if cache is None:
+        coa, bank_accounts, cc_accounts = load_and_clean_coa(COA_PATH, engine=engine)
+        return coa, bank_accounts, cc_accounts, load_and_clean_gl(GL_PATH, coa, engine=engine)
+
+    coa_bytes = source_bytes(COA_PATH)
+    coa_key = content_key(coa_bytes, f"engine={engine}")
+    coa = cache.get(coa_key, "coa")
+    if coa is None:
+        coa, bank_accounts, cc_accounts = load_and_clean_coa(COA_PATH, engine=engine)
+        coa = cache.put(coa_key, "coa", coa)
+    else:
+        bank_accounts, cc_accounts = get_bank_and_cc_accounts(coa)
+
+    gl_key = content_key(source_bytes(GL_PATH), coa_bytes, f"engine={engine}")
+    gl = cache.get(gl_key, "gl")
+    if gl is None:
+        gl = cache.put(gl_key, "gl", load_and_clean_gl(GL_PATH, coa, engine=engine))
+
+    return coa, bank_accounts, cc_accounts, gl
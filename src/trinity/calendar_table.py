@@ -0,0 +1,138 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# =========================
+# CALENDAR DIMENSION (one row per day)
+# =========================
+
+# First month of the fiscal year (1 = calendar year)
+FISCAL_START_MONTH = int(os.getenv("CASH_IQ_FISCAL_START_MONTH", "1"))
+# Days added on each side when a lookup falls outside the current calendar, so misses are rare
+CALENDAR_PAD_DAYS = 366
+# Span the shared calendar may grow to (about 60 years); past it, a rebuild covers only the new range
+CALENDAR_MAX_DAYS = 22_000
+
+
+class Calendar:
+    """
+    Day-keyed calendar attributes as numpy arrays, built once over the run's history and
+    projection range. Lookups turn dates into day offsets and index the arrays, instead of
+    building a Timestamp per date.
+
+    week_start is the Monday of the week, week_of_month is (day - 1) // 7 + 1 and
+    week_of_year is int(((month - 1) * 30.5 + day) / 7), as in projections.week_of_year.
+    fiscal_year is the calendar year the fiscal year ends in.
+    """
+
+    def __init__(self, start, end, fiscal_start_month=FISCAL_START_MONTH):
+        self.first = np.datetime64(pd.Timestamp(start).normalize().date(), "D")
+        self.last = np.datetime64(pd.Timestamp(end).normalize().date(), "D")
+        self.fiscal_start_month = fiscal_start_month
+
+        days = np.arange(self.first, self.last + 1, dtype="datetime64[D]")
+        months = days.astype("datetime64[M]")
+        dom = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+        month_num = months.astype(np.int64) % 12 + 1
+        year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+        # 1970-01-01 was a Thursday (weekday 3)
+        weekday = (days.astype(np.int64) + 3) % 7
+
+        self.days = days
+        self.week_start_days = days - weekday
+        self.week_of_month_days = (dom - 1) // 7 + 1
+        self.week_of_year_days = (((month_num - 1) * 30.5 + dom) / 7).astype(np.int64)
+        self.month_start_days = months.astype("datetime64[D]")
+        self.month_end_days = (months + 1).astype("datetime64[D]") - 1
+        shifted = month_num - fiscal_start_month
+        self.fiscal_period_days = shifted % 12 + 1
+        self.fiscal_year_days = year + (shifted >= 0) * (fiscal_start_month > 1)
+
+    def __len__(self):
+        return len(self.days)
+
+    def covers(self, start, end):
+        return self.first <= np.datetime64(start, "D") and np.datetime64(end, "D") <= self.last
+
+    def positions(self, dates):
+        """
+        Row of each date (datetime-like array, no NaT) in the day arrays.
+        """
+        d = pd.DatetimeIndex(np.ravel(dates)).values.astype("datetime64[D]")
+        pos = (d - self.first).astype(np.int64)
+        if len(pos) and (pos.min() < 0 or pos.max() >= len(self)):
+            raise ValueError(f"Dates outside the calendar ({self.first} .. {self.last})")
+        return pos
+
+    def week_start(self, dates):
+        return self.week_start_days[self.positions(dates)].astype("datetime64[ns]")
+
+    def week_of_month(self, dates):
+        return self.week_of_month_days[self.positions(dates)]
+
+    def week_of_year(self, dates):
+        return self.week_of_year_days[self.positions(dates)]
+
+    def month_start(self, dates):
+        return self.month_start_days[self.positions(dates)].astype("datetime64[ns]")
+
+    def month_end(self, dates):
+        return self.month_end_days[self.positions(dates)].astype("datetime64[ns]")
+
+    def fiscal_period(self, dates):
+        pos = self.positions(dates)
+        return self.fiscal_year_days[pos], self.fiscal_period_days[pos]
+
+    def frame(self):
+        return pd.DataFrame({
+            "week_start": self.week_start_days.astype("datetime64[ns]"),
+            "week_of_month": self.week_of_month_days,
+            "week_of_year": self.week_of_year_days,
+            "month_start": self.month_start_days.astype("datetime64[ns]"),
+            "month_end": self.month_end_days.astype("datetime64[ns]"),
+            "fiscal_year": self.fiscal_year_days,
+            "fiscal_period": self.fiscal_period_days,
+        }, index=pd.DatetimeIndex(self.days.astype("datetime64[ns]"), name="date"))
+
+
+# Shared by every run in the process (Streamlit sessions are threads); only replaced, never
+# modified, so a run keeps using the Calendar it got while another one rebuilds
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar(start, end):
+    """
+    The shared calendar, rebuilt (with padding) only when start..end is not covered yet.
+    run_cash_iq builds it once over the history and projection range up front. A rebuild keeps
+    the range already covered unless that would take it past CALENDAR_MAX_DAYS.
+    """
+    global _calendar
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    cal = _calendar
+    if cal is not None and cal.covers(start, end):
+        return cal
+    with _calendar_lock:
+        cal = _calendar
+        if cal is None or not cal.covers(start, end):
+            pad = pd.Timedelta(days=CALENDAR_PAD_DAYS)
+            if cal is not None:
+                merged_start = min(start, pd.Timestamp(cal.first))
+                merged_end = max(end, pd.Timestamp(cal.last))
+                if (merged_end - merged_start + 2 * pad).days < CALENDAR_MAX_DAYS:
+                    start, end = merged_start, merged_end
+            cal = Calendar(start - pad, end + pad)
+            _calendar = cal
+    return cal
+
+
+def calendar_for(dates):
+    """
+    A calendar covering every date in dates (datetime-like array without NaT).
+    """
+    d = pd.DatetimeIndex(np.ravel(dates))
+    if not len(d):
+        cal = _calendar
+        return get_calendar(pd.Timestamp("1970-01-01"), pd.Timestamp("1970-01-01")) if cal is None else cal
+    return get_calendar(d.min(), d.max())
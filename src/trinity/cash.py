@@ -1,32 +1,58 @@
 import numpy as np
 import pandas as pd
-from src.trinity.projections import (build_weekly_series, project_weekly_pattern, project_cadenced_events, 
-                                     allocate_to_weeks, replicate_last_year_transactions, week_of_month, 
-                                     is_weekly_flow)
+from src.trinity.projections import (project_weekly_pattern_matrix, wom_median_matrix, last_year_matrix,
+                                     classify_cadence_grouped, schedule_events_matrix, weekly_flow_mask,
+                                     weekly_matrix)
 
 
 # =========================
 # BEGINNING CASH (bank balances as of day before projection start)
 # =========================
 
-def last_nonnull_balance(df_acct, asof_date, fallback=0.0):
-    df_acct = df_acct[df_acct["date"] <= asof_date].sort_values("date")
-    if "balance" in df_acct.columns and df_acct["balance"].notna().any():
-        return float(df_acct.loc[df_acct["balance"].notna(), "balance"].iloc[-1])
-    return float(fallback)
+def bank_balances_asof(gl, coa, bank_accounts, asof_dates):
+    """
+    Last known GL balance of every bank account at each as-of date, in one sort + merge_asof.
+    Accounts with no balance on or before a date fall back to the COA total_balance (or 0).
+    returns DataFrame indexed by asof_dates with one column per bank account
+    """
+    accts = sorted(bank_accounts)
+    asof_dates = pd.DatetimeIndex(asof_dates)
+
+    rows = gl.loc[gl["account_name"].isin(bank_accounts) & gl["balance"].notna(), ["account_name","date","balance"]]
+    # stable sort keeps file order within a day, so the last row of the day carries the day's closing balance
+    rows = rows.sort_values("date", kind="stable")
+
+    uniq = asof_dates.unique()
+    grid = pd.DataFrame({
+        "account_name": np.repeat(accts, len(uniq)),
+        "asof": np.tile(uniq.values, len(accts)),
+    }).sort_values("asof", kind="stable")
+
+    last = pd.merge_asof(grid, rows, left_on="asof", right_on="date", by="account_name", direction="backward")
+    balances = last.pivot(index="asof", columns="account_name", values="balance").reindex(index=asof_dates, columns=accts)
+
+    fallback = coa.drop_duplicates("full_name").set_index("full_name")["total_balance"].reindex(accts)
+    balances = balances.fillna(fallback.fillna(0.0).astype(float))
+    balances.index.name = "asof_date"
+    return balances
+
+def beginning_cash_balances(gl, coa, bank_accounts, asof_dates):
+    """
+    Total bank cash at each as-of date (e.g. the day before each projection start).
+    """
+    return bank_balances_asof(gl, coa, bank_accounts, asof_dates).sum(axis=1)
 
 def begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts):
     asof_date = PROJ_WEEK1_START - pd.Timedelta(days=1)
 
-    beg_bal_by_bank = {}
-    for acct in bank_accounts:
-        acct_rows = gl[gl["account_name"] == acct].copy()
-        fallback = coa.loc[coa["full_name"].eq(acct), "total_balance"]
-        fallback = float(fallback.iloc[0]) if len(fallback) and pd.notna(fallback.iloc[0]) else 0.0
-        beg_bal_by_bank[acct] = last_nonnull_balance(acct_rows, asof_date, fallback=fallback)
+    beginning_cash_balance = float(beginning_cash_balances(gl, coa, bank_accounts, [asof_date]).iloc[0])
 
-    beginning_cash_balance = float(np.nansum(list(beg_bal_by_bank.values())))
+    bank_tx = get_bank_tx(gl, bank_accounts, cc_accounts)
 
+    return bank_tx, beginning_cash_balance, asof_date
+
+
+def get_bank_tx(gl, bank_accounts, cc_accounts):
     # =========================
     # CASHFLOW BASE: BANK TRANSACTIONS ONLY
     #   - remove bank->bank transfers (no net cash)
@@ -38,34 +64,62 @@ def begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts):
     # explicitly label bank->CC as Credit Card for split_type (if not already)
     bank_tx.loc[bank_tx["split_account"].isin(cc_accounts), "split_type"] = "Credit Card"
 
-    return bank_tx, beginning_cash_balance, asof_date
+    return bank_tx
 
 
 def buil_actual_weekly_cash(bank_tx, all_week_starts):
 
     idx_names = ["split_account","split_type","split_detail_type"]
 
-    bank_weekly = (
-        bank_tx.groupby(idx_names + ["week_start"], dropna=False)["amount"]
-        .sum()
-        .reset_index()
-    )
-
-    bank_actual_pivot = bank_weekly.pivot_table(
-        index=idx_names,
-        columns="week_start",
-        values="amount",
-        aggfunc="sum",
-        fill_value=0.0,
-    )
-
-    for w in all_week_starts:
-        if w not in bank_actual_pivot.columns:
-            bank_actual_pivot[w] = 0.0
-    bank_actual_pivot = bank_actual_pivot[all_week_starts]
+    lines, weekly, _ = weekly_matrix(bank_tx, idx_names, all_week_starts)
+    bank_actual_pivot = pd.DataFrame(weekly, index=lines, columns=pd.DatetimeIndex(all_week_starts, name="week_start"))
 
     return bank_actual_pivot, idx_names
 
+def project_bank_lines(hist_noncc_bank, idx_names, hist_week_starts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end):
+    """
+    Project every bank line from its own transactions at once: one (lines x history weeks) matrix and array ops for every method
+    (weekly flow, cadenced events, week-of-month median, last year).
+    returns (lines, projection array lines x proj weeks, method per line)
+    """
+    # date-sorted, so weekly sums add up in transaction date order
+    hist_noncc_bank = hist_noncc_bank.sort_values("date", kind="stable")
+    lines, hist, codes = weekly_matrix(hist_noncc_bank, idx_names, hist_week_starts)
+
+    proj, method = project_line_matrix(hist, codes, hist_noncc_bank["date"].to_numpy(dtype="datetime64[ns]"),
+                                       hist_noncc_bank["amount"].to_numpy(dtype=float), hist_week_starts, proj_week_starts,
+                                       PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+    return lines, proj, pd.Series(method, index=lines, name="method")
+
+def project_line_matrix(hist, codes, dates, amounts, hist_week_starts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end):
+    """
+    Projection step of project_bank_lines on an already built weekly matrix.
+    hist: (lines x hist weeks) weekly sums; codes/dates/amounts: line code, date and amount of every
+    transaction in the cadence window, sorted by date. Lines with no rows project to zero.
+    returns (projection array lines x proj weeks, method array)
+    """
+    weekly = weekly_flow_mask(hist)
+    method = np.where(weekly, "weekly", "").astype(object)
+    proj = np.zeros((len(hist), len(proj_week_starts)))
+    proj[weekly] = project_weekly_pattern_matrix(hist[weekly], hist_week_starts, proj_week_starts)
+
+    # cadenced events for the other lines, scheduled for all of them at once
+    others = np.isin(codes, np.flatnonzero(~weekly))
+    kinds = classify_cadence_grouped(codes[others], dates[others], cadence_start, cadence_end, n_lines=len(hist))
+    cadenced, has_events = schedule_events_matrix(codes[others], dates[others], amounts[others], kinds, proj_week_starts,
+                                                  PROJ_WEEK1_START, proj_end_date)
+    proj[has_events] = cadenced[has_events]
+    method[has_events] = "cadenced"
+    unscheduled = np.flatnonzero(~weekly & ~has_events)
+
+    if len(unscheduled):
+        wom_proj, found = wom_median_matrix(hist[unscheduled], hist_week_starts, proj_week_starts)
+        last_year = last_year_matrix(hist[unscheduled], hist_week_starts, proj_week_starts)
+        proj[unscheduled] = np.where(found[:, None], wom_proj, last_year)
+        method[unscheduled] = np.where(found, "wom_median", "last_year")
+
+    return proj, method
+
 def project_cash(bank_actual_pivot, bank_tx, cadence_start, cadence_end, cc_accounts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, hist_week_starts, idx_names):
 
     # =========================
@@ -77,48 +131,16 @@ def project_cash(bank_actual_pivot, bank_tx, cadence_start, cadence_end, cc_acco
     hist_ccpay_bank = hist_bank_tx[hist_bank_tx["split_account"].isin(cc_accounts)].copy()
     hist_noncc_bank = hist_bank_tx[~hist_bank_tx["split_account"].isin(cc_accounts)].copy()
 
+    lines, proj, _ = project_bank_lines(hist_noncc_bank, idx_names, hist_week_starts, proj_week_starts,
+                                        PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+
     # Build projection matrix for all bank lines
-    proj_bank = pd.DataFrame(0.0, index=bank_actual_pivot.index, columns=proj_week_starts)
-
-    for key, df_line in hist_noncc_bank.groupby(idx_names):
-        df_line = df_line.sort_values("date")
-        s_hist = build_weekly_series(df_line[["date","amount"]], hist_week_starts)
-
-        # If series exists and more than half values are non zero, return true, else return false
-        if is_weekly_flow(s_hist):
-            # Get projections based on linear slopes for eahc week of the month
-            # These projections therefore get weekly cyclical trends and linear long term trends
-            proj_series = project_weekly_pattern(s_hist, proj_week_starts)
-        else:
-
-            future_events = project_cadenced_events(df_line["date"], df_line["amount"], PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
-            if future_events:
-                dts, amts = zip(*future_events)
-                proj_series = allocate_to_weeks(dts, amts, proj_week_starts)
-            else:
-                tail = s_hist.iloc[-26:] if len(s_hist) else s_hist
-                wom = pd.Series([week_of_month(w) for w in tail.index], index=tail.index)
-                wom_median = tail.groupby(wom).median()
-                found = False
-                for amnt in wom_median:
-                    if amnt != 0.0:
-                        found = True
-                        break
-
-                if found:
-                    overall = float(tail.median()) if len(tail) else 0.0
-                    proj_series = pd.Series(
-                        [float(wom_median.get(week_of_month(w), overall)) for w in proj_week_starts],
-                        index=proj_week_starts
-                    )
-                # If all medians are zero we replicate last year tendencies
-                else:
-                    proj_series = replicate_last_year_transactions(s_hist, proj_week_starts)
-
-        if key in proj_bank.index:
-            proj_bank.loc[key, proj_week_starts] = proj_series.values
-        else:
-            proj_bank.loc[key] = 0.0
-            proj_bank.loc[key, proj_week_starts] = proj_series.values
-
-    return hist_ccpay_bank, proj_bank
\ No newline at end of file
+    index = bank_actual_pivot.index
+    missing = lines[index.get_indexer(lines) < 0]
+    if len(missing):
+        index = index.append(missing)
+    values = np.zeros((len(index), len(proj_week_starts)))
+    values[index.get_indexer(lines)] = proj
+    proj_bank = pd.DataFrame(values, index=index, columns=proj_week_starts)
+
+    return hist_ccpay_bank, proj_bank
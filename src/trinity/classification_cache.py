@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+# =========================
+# CLASSIFICATION CACHE (SQLite)
+# =========================
+
+# SQLite file holding known line classifications; empty disables the cache
+CLASSIFY_CACHE_PATH = os.getenv(
+    "CASH_IQ_CLASSIFY_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cash_iq", "classifications.sqlite")
+)
+
+# Categories of each direction, in the order the Projections (Table) sections list them
+CATEGORIES = {
+    "inflows": ("AR Collected", "Line of Credit Advances", "Other Income"),
+    "outflows": ("Expenses Accounts Payable", "Credit Cards and Loans", "Owner's Expense"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS classifications (
+    client TEXT, direction TEXT, name TEXT, split_type TEXT, prompt_version TEXT,
+    category TEXT, created TEXT,
+    PRIMARY KEY (client, direction, name, split_type, prompt_version)
+);
+"""
+
+
+def normalize_name(name):
+    """
+    Cache key form of an account name: trimmed, single-spaced, case-folded.
+    """
+    return re.sub(r"\s+", " ", str(name)).strip().casefold()
+
+
+def client_key(coa):
+    """
+    Id of a client from its chart of accounts (the sorted account full names), used when the
+    caller gives no client id. It changes whenever an account is added or renamed.
+    """
+    h = hashlib.sha256()
+    h.update("\n".join(sorted(coa["full_name"].dropna().astype(str))).encode())
+    return h.hexdigest()[:16]
+
+
+class ClassificationCache:
+    """
+    Known classifications keyed by (client, direction, normalized name, split_type, prompt version).
+    Changing the prompt gives a new prompt version, so old answers are never reused for it.
+    hits/misses count looked up lines.
+    """
+
+    def __init__(self, path=CLASSIFY_CACHE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # get_calssifications may use it from a worker thread while the caller's thread waits on it
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.con.close()
+
+    def get(self, client, direction, lines, prompt_version):
+        """
+        lines: list of (name, split_type). returns {(normalized name, split_type): category} for the known ones
+        """
+        keys = {(normalize_name(name), str(split_type)) for name, split_type in lines}
+        rows = self.con.execute(
+            "SELECT name, split_type, category FROM classifications "
+            "WHERE client = ? AND direction = ? AND prompt_version = ?",
+            (client, direction, prompt_version),
+        ).fetchall()
+        known = {(name, split_type): category for name, split_type, category in rows if (name, split_type) in keys}
+        self.hits += len(known)
+        self.misses += len(keys) - len(known)
+        return known
+
+    def put(self, client, direction, classified, prompt_version):
+        """
+        classified: list of (name, split_type, category)
+        """
+        created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self.con:
+            self.con.executemany(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((client, direction, normalize_name(name), str(split_type), prompt_version, category, created)
+                 for name, split_type, category in classified),
+            )
+
+    def invalidate(self, client=None, prompt_version=None, name=None):
+        """
+        Delete cached classifications, all of them or only those matching the given fields.
+        returns number of rows deleted
+        """
+        where, params = [], []
+        for col, value in [("client", client), ("prompt_version", prompt_version), ("name", name)]:
+            if value is not None:
+                where.append(f"{col} = ?")
+                params.append(normalize_name(value) if col == "name" else value)
+        sql = "DELETE FROM classifications" + (" WHERE " + " AND ".join(where) if where else "")
+        with self.con:
+            return self.con.execute(sql, params).rowcount
+
+    def rename_client(self, old, new):
+        """
+        Move the classifications cached under client old to client new (kept where new already
+        has the same line). returns number of rows moved
+        """
+        with self.con:
+            moved = self.con.execute("UPDATE OR IGNORE classifications SET client = ? WHERE client = ?", (new, old)).rowcount
+            self.con.execute("DELETE FROM classifications WHERE client = ?", (old,))
+        return moved
+
+    def stats(self):
+        """
+        Cached rows per (client, prompt version).
+        """
+        return self.con.execute(
+            "SELECT client, prompt_version, COUNT(*) FROM classifications GROUP BY client, prompt_version"
+        ).fetchall()
+
+
+def split_known(present, direction, prompt_version, client="", cache=None):
+    """
+    Lines of present (index with split_account and split_type levels) as (name, split_type) pairs,
+    the cached categories among them and the names still to classify.
+    returns (lines, {(normalized name, split_type): category}, unseen names)
+    """
+    names = present.index.get_level_values("split_account").to_list()
+    types = present.index.get_level_values("split_type").astype(str).to_list()
+    lines = list(zip(names, types))
+    known = cache.get(client, direction, lines, prompt_version) if cache is not None else {}
+    unseen = [name for name, split_type in lines if (normalize_name(name), split_type) not in known]
+    return lines, known, unseen
+
+
+def merge_answers(lines, known, by_cat, direction, prompt_version, client="", cache=None):
+    """
+    Add the model's answer ({category: [names]}) for the unseen lines to known, store it, and
+    return {category: [split_account, ...]} over lines, with every category of the direction in
+    CATEGORIES order (empty ones too). Names the model left out stay unclassified.
+    """
+    category_of = {normalize_name(name): cat for cat, cat_names in by_cat.items() for name in cat_names}
+    classified = [(name, split_type, category_of[normalize_name(name)]) for name, split_type in lines
+                  if (normalize_name(name), split_type) not in known and normalize_name(name) in category_of]
+    if cache is not None and classified:
+        cache.put(client, direction, classified, prompt_version)
+    known = {**known, **{(normalize_name(name), split_type): cat for name, split_type, cat in classified}}
+
+    out = {cat: [] for cat in CATEGORIES[direction]}
+    for name, split_type in lines:
+        cat = known.get((normalize_name(name), split_type))
+        if cat is not None:
+            out.setdefault(cat, []).append(name)
+    return out
+
+
+def classify_cached(present, direction, classify, prompt_version, client="", cache=None):
+    """
+    Classify the lines of present into {category: [split_account, ...]}, asking
+    classify(list of names) only for the lines the cache doesn't know yet.
+    """
+    lines, known, unseen = split_known(present, direction, prompt_version, client, cache)
+    by_cat = classify(unseen) if unseen else {}
+    return merge_answers(lines, known, by_cat, direction, prompt_version, client, cache)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the classification cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("--path", default=CLASSIFY_CACHE_PATH)
+    parser.add_argument("--client")
+    parser.add_argument("--prompt-version")
+    parser.add_argument("--name", help="one account name (matched normalized)")
+    args = parser.parse_args(argv)
+
+    cache = ClassificationCache(args.path)
+    if args.command == "clear":
+        print(f"Deleted {cache.invalidate(args.client, args.prompt_version, args.name)} cached classifications")
+    else:
+        for client, prompt_version, n in cache.stats():
+            print(f"{client}  prompt {prompt_version}  {n} lines")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from src.trinity.classification_cache import normalize_name
+
+# =========================
+# RULE-BASED CLASSIFICATION (COA account type -> category)
+# =========================
+
+# The same rules the classification prompts describe, keyed by the normalized split_type
+# of the line. Types not listed here (Unmapped, assets, the collapsed "Other" rows, ...)
+# don't settle the category and are left to the model.
+INFLOW_TYPE_RULES = {
+    "income": "AR Collected",
+    "accounts receivable (a/r)": "AR Collected",
+    "other income": "Other Income",
+    "other current liabilities": "Line of Credit Advances",
+    "long term liabilities": "Line of Credit Advances",
+    "credit card": "Line of Credit Advances",
+}
+
+OUTFLOW_TYPE_RULES = {
+    "expense": "Expenses Accounts Payable",
+    "expenses": "Expenses Accounts Payable",
+    "other expense": "Expenses Accounts Payable",
+    "cost of goods sold": "Expenses Accounts Payable",
+    "accounts payable (a/p)": "Expenses Accounts Payable",
+    "credit card": "Credit Cards and Loans",
+    "credit card payment": "Credit Cards and Loans",
+    "other current liabilities": "Credit Cards and Loans",
+    "long term liabilities": "Credit Cards and Loans",
+    "equity": "Owner's Expense",
+}
+
+TYPE_RULES = {"inflows": INFLOW_TYPE_RULES, "outflows": OUTFLOW_TYPE_RULES}
+
+
+def rule_category(direction, split_type):
+    """
+    Category the account type settles for a line, or None when it is ambiguous.
+    """
+    return TYPE_RULES[direction].get(normalize_name(split_type))
+
+
+def classify_by_rules(present, direction):
+    """
+    Split the lines of present (index with split_account and split_type levels) into those the
+    type rules settle and the rest.
+    returns ({category: [split_account, ...]}, present rows still to classify)
+    """
+    types = present.index.get_level_values("split_type")
+    categories = [rule_category(direction, t) for t in types]
+    by_cat = {}
+    for name, cat in zip(present.index.get_level_values("split_account"), categories):
+        if cat is not None:
+            by_cat.setdefault(cat, []).append(name)
+    return by_cat, present.loc[[cat is None for cat in categories]]
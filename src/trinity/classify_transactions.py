@@ -1,26 +1,19 @@
-from dotenv import load_dotenv
-from openai import OpenAI
-from pydantic import BaseModel
+import asyncio
+import functools
+import hashlib
 import json
 import os
-import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from src.trinity.classification_cache import CATEGORIES, split_known, merge_answers
+from src.trinity.classification_rules import classify_by_rules
 
-load_dotenv()
+# openai, pydantic, tenacity, dotenv and streamlit are imported on first use, so the pipeline
+# imports as a plain library and runs without credentials when no line needs the model
 
-if os.getenv("OPENAI_API_KEY") is None:
-    os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
 
+CLASSIFY_MODEL = "gpt-4.1"
 
-class InflowsFormat(BaseModel):
-    collected: list[str]
-    line_credit: list[str]
-    other: list[str]
-    
-
-def classify_inflows(inflow_list):
-    client = OpenAI()
-
-    prompt = f"""Classify each of the cash inflows from the list provided bellow into one of the provided categories.
+INFLOWS_PROMPT = """Classify each of the cash inflows from the list provided bellow into one of the provided categories.
     The categories will have a brief description of what they mean so you can make the best classification possible.
     Do NOT change any of the names of the inflows from the provided list. The names of the categorized inflows must match
     letter for letter the names in the provided list.
@@ -37,11 +30,76 @@ def classify_inflows(inflow_list):
     Provide the classification in the format: Inflow - Category
     """
 
+OUTFLOWS_PROMPT = """Classify each of the cash outflows from the list provided bellow into one of the provided categories.
+    The categories will have a brief description of what they mean so you can make the best classification possible.
+    Do NOT change any of the names of the inflows from the provided list. The names of the categorized inflows must match
+    letter for letter the names in the provided list.
+
+    Outflows list:
+    {outflow_list}
+
+    Categories:
+    expenses_accounts_payable: Any outflow that is from AP vendors, Expense, or an Other expense account
+    credit_cards_loans: Any account that is Credit card or Liability.
+    owner_expenses: Any account that is an equity account.
+
+    Provide the classification in the format: Outflow - Category
+    """
+
+# Async path: names per request (estimated tokens), requests in flight and attempts per request
+CLASSIFY_CHUNK_TOKENS = int(os.getenv("CASH_IQ_CLASSIFY_CHUNK_TOKENS", "400"))
+CLASSIFY_CONCURRENCY = int(os.getenv("CASH_IQ_CLASSIFY_CONCURRENCY", "4"))
+CLASSIFY_ATTEMPTS = int(os.getenv("CASH_IQ_CLASSIFY_ATTEMPTS", "4"))
+
+# Cached classifications are only reused for the exact prompts and model that produced them
+PROMPT_VERSION = hashlib.sha256((CLASSIFY_MODEL + INFLOWS_PROMPT + OUTFLOWS_PROMPT).encode()).hexdigest()[:12]
+
+
+def ensure_api_key():
+    """
+    Resolve OPENAI_API_KEY on first use: the environment, then a .env file, then Streamlit secrets.
+    """
+    if os.getenv("OPENAI_API_KEY") is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+    if os.getenv("OPENAI_API_KEY") is None:
+        import streamlit as st
+        os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
+
+
+@functools.cache
+def response_format(direction):
+    """
+    Structured-output model of the classification answer for "inflows" or "outflows".
+    """
+    from pydantic import BaseModel
+
+    class InflowsFormat(BaseModel):
+        collected: list[str]
+        line_credit: list[str]
+        other: list[str]
+
+    class OutflowsFormat(BaseModel):
+        expenses_accounts_payable: list[str]
+        credit_cards_loans: list[str]
+        owner_expenses: list[str]
+
+    return {"inflows": InflowsFormat, "outflows": OutflowsFormat}[direction]
+
+
+def classify_inflows(inflow_list):
+    from openai import OpenAI
+
+    ensure_api_key()
+    client = OpenAI()
+
+    prompt = INFLOWS_PROMPT.format(inflow_list=inflow_list)
+
     response = client.responses.parse(
-    model="gpt-4.1",
+    model=CLASSIFY_MODEL,
     temperature=0,
     input=prompt,
-    text_format=InflowsFormat
+    text_format=response_format("inflows")
     )
 
     json_output = json.loads(response.output_parsed.model_dump_json())
@@ -51,35 +109,19 @@ def classify_inflows(inflow_list):
     return new_dict
 
 
-class OutflowsFormat(BaseModel):
-    expenses_accounts_payable: list[str]
-    credit_cards_loans: list[str]
-    owner_expenses: list[str]
-
 def classify_outflows(outflow_list):
-    client = OpenAI()
+    from openai import OpenAI
 
-    prompt = f"""Classify each of the cash outflows from the list provided bellow into one of the provided categories.
-    The categories will have a brief description of what they mean so you can make the best classification possible.
-    Do NOT change any of the names of the inflows from the provided list. The names of the categorized inflows must match
-    letter for letter the names in the provided list.
+    ensure_api_key()
+    client = OpenAI()
 
-    Outflows list:
-    {outflow_list}
-
-    Categories:
-    expenses_accounts_payable: Any outflow that is from AP vendors, Expense, or an Other expense account
-    credit_cards_loans: Any account that is Credit card or Liability.
-    owner_expenses: Any account that is an equity account.
-
-    Provide the classification in the format: Outflow - Category
-    """
+    prompt = OUTFLOWS_PROMPT.format(outflow_list=outflow_list)
 
     response = client.responses.parse(
-    model="gpt-4.1",
+    model=CLASSIFY_MODEL,
     temperature=0,
     input=prompt,
-    text_format=OutflowsFormat
+    text_format=response_format("outflows")
     )
 
     json_output = json.loads(response.output_parsed.model_dump_json())
@@ -88,11 +130,130 @@ def classify_outflows(outflow_list):
     new_dict = {key_mapping[k]: v for k, v in json_output.items()}
     return new_dict
 
-def get_calssifications(inflows_present, outflows_present):
-    inflows_list = inflows_present.index.get_level_values('split_account').to_list()
-    inflows_by_cat = classify_inflows(inflows_list)
+# =========================
+# ASYNC CLASSIFICATION (one pooled client, chunked, concurrent)
+# =========================
+
+# prompt, list placeholder and answer field -> category (in CATEGORIES order)
+DIRECTIONS = {
+    "inflows": (INFLOWS_PROMPT, "inflow_list",
+                {'collected': 'AR Collected', 'line_credit': 'Line of Credit Advances', 'other': 'Other Income'}),
+    "outflows": (OUTFLOWS_PROMPT, "outflow_list",
+                 {'expenses_accounts_payable': 'Expenses Accounts Payable', 'credit_cards_loans': 'Credit Cards and Loans',
+                  'owner_expenses': "Owner's Expense"}),
+}
+
+
+def estimate_tokens(name):
+    # ~4 characters per token, plus the quotes and separator of the list repr
+    return len(name) // 4 + 2
+
+
+def chunk_names(names, max_tokens=CLASSIFY_CHUNK_TOKENS):
+    """
+    Split unique names into consecutive chunks of at most max_tokens estimated tokens.
+    """
+    chunks, chunk, size = [], [], 0
+    for name in dict.fromkeys(names):
+        tokens = estimate_tokens(name)
+        if chunk and size + tokens > max_tokens:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(name)
+        size += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
 
-    outflows_list = outflows_present.index.get_level_values('split_account').to_list()
-    outflows_by_cat = classify_outflows(outflows_list)
+async def classify_chunk_async(llm, direction, names, semaphore, attempts=CLASSIFY_ATTEMPTS):
+    """
+    One classification request, retried with exponential backoff on connection errors,
+    rate limits and server errors. returns {category: [names]}
+    """
+    from openai import APIConnectionError, RateLimitError, InternalServerError
+    from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+    template, placeholder, key_mapping = DIRECTIONS[direction]
+    prompt = template.format(**{placeholder: names})
+    text_format = response_format(direction)
+    async with semaphore:
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type((APIConnectionError, RateLimitError, InternalServerError)),
+            stop=stop_after_attempt(attempts), wait=wait_exponential(multiplier=0.5, max=8), reraise=True,
+        ):
+            with attempt:
+                response = await llm.responses.parse(model=CLASSIFY_MODEL, temperature=0, input=prompt, text_format=text_format)
+    json_output = json.loads(response.output_parsed.model_dump_json())
+    return {key_mapping[k]: v for k, v in json_output.items()}
+
+
+async def classify_names_async(llm, direction, names, semaphore, max_tokens=CLASSIFY_CHUNK_TOKENS):
+    """
+    Classify names in token-bounded chunks sent concurrently. returns the merged {category: [names]}
+    """
+    answers = await asyncio.gather(*(classify_chunk_async(llm, direction, chunk, semaphore)
+                                     for chunk in chunk_names(names, max_tokens)))
+    merged = {}
+    for answer in answers:
+        for cat, cat_names in answer.items():
+            merged.setdefault(cat, []).extend(cat_names)
+    return merged
+
+
+async def get_calssifications_async(inflows_present, outflows_present, client="", cache=None, llm=None,
+                                    concurrency=CLASSIFY_CONCURRENCY, max_tokens=CLASSIFY_CHUNK_TOKENS):
+    """
+    get_calssifications with the inflow and outflow requests (and their chunks) in flight together
+    over one pooled AsyncOpenAI client. llm: an AsyncOpenAI client to use (default: a new one for this
+    call; its connection pool is bound to the running event loop).
+    Lines whose account type settles the category are classified by the type rules and never sent.
+    """
+    pending = []
+    for direction, present in [("inflows", inflows_present), ("outflows", outflows_present)]:
+        by_rule, ambiguous = classify_by_rules(present, direction)
+        pending.append((direction, by_rule, *split_known(ambiguous, direction, PROMPT_VERSION, client, cache)))
+
+    async def run(llm):
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(classify_names_async(llm, direction, unseen, semaphore, max_tokens)
+                                      for direction, _, _, _, unseen in pending))
+
+    if not any(unseen for *_, unseen in pending):
+        answers = [{}, {}]
+    elif llm is not None:
+        answers = await run(llm)
+    else:
+        from openai import AsyncOpenAI
+
+        ensure_api_key()
+        # retries are done by tenacity, per chunk
+        async with AsyncOpenAI(max_retries=0) as llm:
+            answers = await run(llm)
+
+    out = []
+    for (direction, by_rule, lines, known, _), answer in zip(pending, answers):
+        by_model = merge_answers(lines, known, answer, direction, PROMPT_VERSION, client, cache)
+        # every category, in the field order of the model's structured answer
+        out.append({cat: by_rule.get(cat, []) + by_model.get(cat, []) for cat in CATEGORIES[direction]})
+    return tuple(out)
+
+
+def get_calssifications(inflows_present, outflows_present, client="", cache=None):
+    """
+    Inflow and outflow categories of the present lines. With a ClassificationCache only the
+    lines not classified before (for this client and prompt version) go to the model, and
+    when every line is known no request is made at all.
+    Called from inside a running event loop (a notebook, an async app), asyncio.run can't nest, so
+    the requests run on their own loop in a worker thread; async callers should await
+    get_calssifications_async instead.
+    """
+    def run():
+        return asyncio.run(get_calssifications_async(inflows_present, outflows_present, client, cache))
 
-    return inflows_by_cat, outflows_by_cat
\ No newline at end of file
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run).result()
@@ -1,7 +1,26 @@
 from src.trinity.preprocessing import monday_week_start
-from src.trinity.projections import week_of_month, project_weekly_pattern, classify_cadence
+from src.trinity.projections import (classify_cadence_grouped, project_weekly_pattern_matrix, top_values,
+                                     wom_median_matrix, weekly_matrix)
+from src.trinity.calendar_table import calendar_for
+import os
+import numpy as np
 import pandas as pd
 
+# Model CC spend, statement timing and payments per card account (CASH_IQ_CC_PER_CARD=1); by default all
+# cards are pooled into one, as before
+CC_PER_CARD = os.getenv("CASH_IQ_CC_PER_CARD", "0") != "0"
+POOLED_CARD = "All Cards"
+
+
+def card_of(accounts, per_card=None):
+    """
+    Card label of each CC account: the account itself, or POOLED_CARD when cards are pooled.
+    """
+    per_card = CC_PER_CARD if per_card is None else per_card
+    if per_card:
+        return accounts.astype(object)
+    return pd.Series(POOLED_CARD, index=accounts.index, dtype=object)
+
 
 def begin_cc(gl, bank_accounts, cc_accounts):
 
@@ -19,202 +38,241 @@ def begin_cc(gl, bank_accounts, cc_accounts):
     return cc_spend_txn
 
 
-def get_cc_debt_history(cc_spend_txn, asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS):
+def get_cc_debt_history(cc_spend_txn, asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS, per_card=None):
     # =========================
     # PROJECT CREDIT CARD SPEND (LIABILITY) + PROJECT CC PAYMENTS (CASH) + ALLOCATE CC PAYMENTS
     # =========================
 
-    # 1) Weekly CC spend by category (historical) for projecting CC spend pattern (NOT cash)
+    # 1) Weekly CC spend by card and category (historical) for projecting CC spend pattern (NOT cash)
     cc_spend_hist_start = PROJ_WEEK1_START - pd.Timedelta(weeks=CC_SPEND_TS_WEEKS)
     cc_spend_hist = cc_spend_txn[(cc_spend_txn["date"] >= cc_spend_hist_start) & (cc_spend_txn["date"] <= asof_date)].copy()
 
-    # category = split_account (expense accounts etc.)
+    # category = split_account (expense accounts etc.), card = the CC account (or one pooled card)
     cc_spend_hist["cat"] = cc_spend_hist["split_account"].fillna("Uncategorized")
+    cc_spend_hist["card"] = card_of(cc_spend_hist["account_name"], per_card)
 
-    # weekly totals per category across ALL CC accounts
     cc_spend_hist["week_start"] = monday_week_start(cc_spend_hist["date"])
-    cc_spend_week_cat = cc_spend_hist.groupby(["cat","week_start"])["amount"].sum().reset_index()
-
-    cc_spend_cat_pivot = cc_spend_week_cat.pivot_table(
-        index=["cat"],
-        columns="week_start",
-        values="amount",
-        aggfunc="sum",
-        fill_value=0.0
-    )
+    cc_hist_weeks = pd.date_range(start=cc_spend_hist_start, end=monday_week_start(pd.Series([asof_date])).iloc[0], freq="W-MON")
+    lines, weekly, _ = weekly_matrix(cc_spend_hist, ["card","cat"], cc_hist_weeks)
+    cc_spend_cat_pivot = pd.DataFrame(weekly, index=lines, columns=cc_hist_weeks)
 
     return cc_spend_cat_pivot, cc_spend_hist_start
 
 def project_cc_debt(cc_spend_cat_pivot, cc_spend_hist_start, TOP_N_CC_CATS, proj_week_starts, actual_week_starts):
-
+    """
+    Project weekly CC spend for every (card, category) in one (cards x categories x weeks) array.
+    The top TOP_N_CC_CATS categories are picked on spend across all cards; each card's remaining
+    categories are collapsed into "Other CC Categories". Series with activity in >= 40% of the weeks
+    use the weekly-flow projection, the rest the week-of-month median.
+    returns (projected, history) DataFrames indexed by (card, cat) over every card x category pair
+    """
     # ensure week columns for CC spend history
     cc_hist_weeks = pd.date_range(start=cc_spend_hist_start, end=actual_week_starts[-1], freq="W-MON")
-    for w in cc_hist_weeks:
-        if w not in cc_spend_cat_pivot.columns:
-            cc_spend_cat_pivot[w] = 0.0
-    cc_spend_cat_pivot = cc_spend_cat_pivot[cc_hist_weeks]
+    pivot = cc_spend_cat_pivot.reindex(columns=cc_hist_weeks, fill_value=0.0)
 
-    # Keep top CC cats, collapse rest
-    cc_abs_totals = cc_spend_cat_pivot.abs().sum(axis=1).sort_values(ascending=False)
-    top_cc_cats = cc_abs_totals.head(TOP_N_CC_CATS).index.tolist()
-    cc_spend_cat_pivot_top = cc_spend_cat_pivot.loc[top_cc_cats].copy()
-    if len(cc_spend_cat_pivot) > len(top_cc_cats):
-        other = cc_spend_cat_pivot.drop(index=top_cc_cats).sum(axis=0)
-        cc_spend_cat_pivot_top.loc["Other CC Categories"] = other
-
-    # Project CC spend weekly by category using weekly-flow projection (NOT flat)
-    cc_spend_proj_cat = pd.DataFrame(0.0, index=cc_spend_cat_pivot_top.index, columns=proj_week_starts)
-    for cat in cc_spend_cat_pivot_top.index:
-        s_hist = cc_spend_cat_pivot_top.loc[cat]
-        # treat CC spend categories as weekly-flow by default; if mostly zeros, use wom median fallback
-        nz_rate = (s_hist != 0).mean() if len(s_hist) else 0.0
-        if nz_rate >= 0.40:
-            proj = project_weekly_pattern(s_hist, proj_week_starts)
-        else:
-            tail = s_hist.iloc[-26:] if len(s_hist) else s_hist
-            wom = pd.Series([week_of_month(pd.Timestamp(w)) for w in tail.index], index=tail.index)
-            wom_median = tail.groupby(wom).median()
-            overall = float(tail.median()) if len(tail) else 0.0
-            proj_vals = []
-            for w in proj_week_starts:
-                proj_vals.append(float(wom_median.get(week_of_month(pd.Timestamp(w)), overall)))
-            proj = pd.Series(proj_vals, index=proj_week_starts, dtype=float)
-        cc_spend_proj_cat.loc[cat] = proj.values
+    cards = pivot.index.unique("card") if len(pivot) else pd.Index([], dtype=object)
+    cat_level = pivot.index.get_level_values("cat") if len(pivot) else pd.Index([], dtype=object)
 
+    # Keep top CC cats (by spend across all cards), collapse rest
+    cc_abs_totals = pivot.groupby(level="cat").sum().abs().sum(axis=1).sort_values(ascending=False) if len(pivot) else pd.Series(dtype=float)
+    top_cc_cats = cc_abs_totals.head(TOP_N_CC_CATS).index.tolist()
+    cats = top_cc_cats + (["Other CC Categories"] if len(cc_abs_totals) > len(top_cc_cats) else [])
+
+    cat_idx = pd.Index(top_cc_cats).get_indexer(cat_level)
+    cat_idx[cat_idx < 0] = len(top_cc_cats)
+    cube = np.zeros((len(cards), len(cats), len(cc_hist_weeks)))
+    np.add.at(cube, (cards.get_indexer(pivot.index.get_level_values("card")) if len(pivot) else [], cat_idx), pivot.to_numpy(dtype=float))
+
+    # Project CC spend weekly for all (card, category) series at once (NOT flat)
+    hist = cube.reshape(-1, len(cc_hist_weeks))
+    proj = np.zeros((len(hist), len(proj_week_starts)))
+    flow = (hist != 0).mean(axis=1) >= 0.40 if hist.shape[1] else np.zeros(len(hist), dtype=bool)
+    proj[flow] = project_weekly_pattern_matrix(hist[flow], cc_hist_weeks, proj_week_starts)
+    proj[~flow] = wom_median_matrix(hist[~flow], cc_hist_weeks, proj_week_starts)[0]
+
+    index = pd.MultiIndex.from_product([cards, cats], names=["card","cat"])
+    cc_spend_proj_cat = pd.DataFrame(proj, index=index, columns=proj_week_starts)
+    cc_spend_cat_pivot_top = pd.DataFrame(hist, index=index, columns=cc_hist_weeks)
     return cc_spend_proj_cat, cc_spend_cat_pivot_top
 
 
-def project_cc_payments(hist_ccpay_bank, asof_date, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end):
-
-        # 2) Project CC payments (cash) on realistic cadence inferred from historical bank->CC payments
-    #    - Determine typical payment cadence & timing from bank-side payments
+def project_cc_payments(hist_ccpay_bank, asof_date, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end, cards=(), per_card=None):
+    """
+    Payment cadence, typical day of month and projected payment dates for every card at once,
+    from the bank-side payments to each card (split_account). cards adds cards that have spend
+    but no payment history; they get a monthly payment on day 15.
+    returns (payment events DataFrame [card, payment_date] sorted by date, cadence per card, day of month per card)
+    """
+    # 2) Project CC payments (cash) on realistic cadence inferred from historical bank->CC payments
+    #    - Determine typical payment cadence & timing from bank-side payments, per card
     #    - Determine payment amount as "statement-like": pay prior month's projected CC spend (absolute), on typical payment day-of-month
     #    - Allocate the payment into categories based on rolling spend mix (last CC_MIX_ROLLING_WEEKS before the payment)
-    #
-    # Payment timing inference:
-    ccpay_dates = hist_ccpay_bank["date"].sort_values()
-    ccpay_kind = classify_cadence(ccpay_dates, cadence_start, cadence_end) if len(ccpay_dates) else "monthly"
-
-    # Typical day-of-month for payment (use mode)
-    if len(ccpay_dates):
-        dti = pd.DatetimeIndex(pd.to_datetime(ccpay_dates))
-        dom_mode = int(pd.Series(dti.day).value_counts().idxmax())
-    else:
-        dom_mode = 15
+    hist_ccpay_bank = hist_ccpay_bank.sort_values("date", kind="stable")
+    pay_cards = card_of(hist_ccpay_bank["split_account"], per_card)
+    cards = pd.Index(sorted(set(card_of(pd.Series(list(cards), dtype=object), per_card)) | set(pay_cards)), name="card")
+    codes = cards.get_indexer(pay_cards)
+    dates = hist_ccpay_bank["date"].to_numpy(dtype="datetime64[ns]")
+
+    # Payment timing inference: cadence per card (cards without payments are treated as monthly)
+    has_pay = np.bincount(codes, minlength=len(cards)) > 0
+    kinds = classify_cadence_grouped(codes, dates, cadence_start, cadence_end, n_lines=len(cards))
+    kinds[~has_pay] = "monthly"
+
+    # Typical day-of-month per card: value_counts().idxmax() of its payment days, 15 without payments
+    dom = top_values(codes, pd.DatetimeIndex(dates).day.to_numpy(), len(cards), 1)[:, 0]
+    dom[dom < 0] = 15
 
     # We will schedule ONE payment per month (or per cadence) in projection.
     # If cadence is weekly/biweekly (rare), we schedule by that cadence, but amount still follows recent spend.
-    payment_event_dates = []
     horizon_end = proj_end_date
-
-    if ccpay_kind in {"weekly","biweekly"}:
-        step = pd.Timedelta(days=7 if ccpay_kind == "weekly" else 14)
-        d = asof_date
-        while d < horizon_end:
-            d = d + step
-            if d >= PROJ_WEEK1_START:
-                payment_event_dates.append(d)
-    else:
-        # monthly/semimonthly/irregular -> treat as monthly statement payment
-        months = pd.date_range(start=PROJ_WEEK1_START.normalize(), end=horizon_end.normalize(), freq="MS")
-        for m in months:
-            d = m + pd.Timedelta(days=dom_mode - 1)
-            if d.month != m.month:
-                d = m + pd.offsets.MonthEnd(0)
-            if PROJ_WEEK1_START <= d < horizon_end:
-                payment_event_dates.append(pd.Timestamp(d))
-
-    payment_event_dates = sorted(payment_event_dates)
-
-    return payment_event_dates, ccpay_kind, dom_mode
-
-def spend_mix_for_window(window_week_starts, cc_spend_cat_pivot_top, cc_spend_proj_cat):
+    ev_card, ev_date = [], []
+
+    step_days = np.select([kinds == "weekly", kinds == "biweekly"], [7, 14], 0)
+    stepped = np.flatnonzero(step_days > 0)
+    if len(stepped):
+        step = step_days[stepped, None] * np.timedelta64(1, "D")
+        start = np.datetime64(pd.Timestamp(asof_date).to_datetime64(), "ns")
+        end = np.datetime64(pd.Timestamp(horizon_end).to_datetime64(), "ns")
+        # steps taken by "while d < horizon_end: d += step"
+        n_steps = -((start - end) // step[:, 0]) if start < end else np.zeros(len(stepped), dtype=int)
+        k = np.arange(1, int(np.max(n_steps, initial=0)) + 1)
+        d = start + k[None, :] * step
+        keep = (k[None, :] <= n_steps[:, None]) & (d >= np.datetime64(pd.Timestamp(PROJ_WEEK1_START).to_datetime64(), "ns"))
+        ev_card.append(np.broadcast_to(stepped[:, None], d.shape)[keep])
+        ev_date.append(d[keep])
+
+    # monthly/semimonthly/irregular -> treat as monthly statement payment on the typical day (clamped to month end)
+    monthly = np.flatnonzero(step_days == 0)
+    months = pd.date_range(start=PROJ_WEEK1_START.normalize(), end=horizon_end.normalize(), freq="MS")
+    if len(monthly) and len(months):
+        cal = calendar_for(months)
+        month_len = ((cal.month_end(months) - months.to_numpy(dtype="datetime64[ns]")) // np.timedelta64(1, "D")) + 1
+        d = months.to_numpy(dtype="datetime64[ns]")[None, :] + (np.minimum(dom[monthly, None], month_len[None, :]) - 1) * np.timedelta64(1, "D")
+        keep = (d >= np.datetime64(PROJ_WEEK1_START.to_datetime64())) & (d < np.datetime64(pd.Timestamp(horizon_end).to_datetime64()))
+        ev_card.append(np.broadcast_to(monthly[:, None], d.shape)[keep])
+        ev_date.append(d[keep])
+
+    ev_card = np.concatenate(ev_card) if ev_card else np.array([], dtype=int)
+    ev_date = np.concatenate(ev_date) if ev_date else np.array([], dtype="datetime64[ns]")
+    order = np.lexsort((ev_card, ev_date))
+    payment_events = pd.DataFrame({"card": cards[ev_card[order]], "payment_date": pd.DatetimeIndex(ev_date[order])})
+
+    ccpay_kind = pd.Series(kinds, index=cards, name="cadence_inferred")
+    dom_mode = pd.Series(dom, index=cards, name="typical_dom")
+    return payment_events, ccpay_kind, dom_mode
+
+SCHEDULE_COLUMNS = ["payment_date","payment_week_start","estimated_payment_total","allocation_window_weeks","prior_month","cadence_inferred","typical_dom"]
+
+def spend_matrix(cc_spend_cat_pivot_top, cc_spend_proj_cat):
+    """
+    Actual + projected CC spend as one (rows x weeks) array over the sorted union of their
+    week columns (weeks in both are added, like a concat + groupby of the two frames).
+    returns (week starts, array)
+    """
+    hist_weeks, proj_weeks = pd.DatetimeIndex(cc_spend_cat_pivot_top.columns), pd.DatetimeIndex(cc_spend_proj_cat.columns)
+    weeks = hist_weeks.union(proj_weeks)
+    spend = np.zeros((len(cc_spend_cat_pivot_top), len(weeks)))
+    spend[:, weeks.get_indexer(hist_weeks)] += cc_spend_cat_pivot_top.to_numpy(dtype=float)
+    spend[:, weeks.get_indexer(proj_weeks)] += cc_spend_proj_cat.reindex(cc_spend_cat_pivot_top.index).to_numpy(dtype=float)
+    return weeks, spend
+
+def window_sums(prefix, weeks, start, end):
     """
-    rolling mix over a set of week_starts: use actual if available, else projected.
-    returns shares by category over that window
+    Sums over week columns start..end (inclusive, per event) as prefix-sum differences
+    along the last axis. Weeks outside the grid count as zero, like reindex(fill_value=0.0).
     """
-    mix_vals = []
-    for cat in cc_spend_cat_pivot_top.index:
-        # actual + projected per category weekly
-        s_cat = pd.concat([cc_spend_cat_pivot_top.loc[cat], cc_spend_proj_cat.loc[cat]])
-        mix_vals.append(s_cat.reindex(window_week_starts, fill_value=0.0).abs().sum())
-    mix = pd.Series(mix_vals, index=cc_spend_cat_pivot_top.index)
-    if mix.sum() == 0:
-        return pd.Series({"Uncategorized": 1.0})
-    return mix / mix.sum()
+    lo = weeks.searchsorted(pd.DatetimeIndex(start), side="left")
+    hi = weeks.searchsorted(pd.DatetimeIndex(end), side="right")
+    return prefix[..., hi] - prefix[..., lo]
 
 def allocate_payments(cc_spend_proj_cat, cc_spend_cat_pivot_top, payment_event_dates, CC_MIX_ROLLING_WEEKS, proj_week_starts, idx_names, ccpay_kind, dom_mode):
-    # Compute monthly "statement" amount from projected CC spend:
-    # For each payment date, pay the prior month's total projected CC spend magnitude.
-    # We compute CC spend totals from cc_spend_proj_cat (weekly) and/or last actual weeks for the first payment.
-    cc_spend_week_all = cc_spend_cat_pivot_top.sum(axis=0)  # historical weekly total across cats
-    cc_spend_proj_week_all = cc_spend_proj_cat.sum(axis=0)  # projected weekly total across cats
-
-    # Helper: get CC spend by week (actual+proj)
-    cc_spend_total_week = pd.concat([cc_spend_week_all, cc_spend_proj_week_all]).groupby(level=0).sum()
-
-    # Build a projected cash-outflow table for CC payments by category (signed negative)
-    cc_payment_alloc = pd.DataFrame(0.0,
-                                index=pd.MultiIndex.from_tuples([], names=idx_names),
-                                columns=proj_week_starts)
-
-    # Prebuild combined per-category weekly spend (actual+proj) for window lookups
-    cc_cat_week_combined = {}
-    for cat in cc_spend_cat_pivot_top.index:
-        cc_cat_week_combined[cat] = pd.concat([cc_spend_cat_pivot_top.loc[cat], cc_spend_proj_cat.loc[cat]]).groupby(level=0).sum()
-
-    # Also store CC payment schedule
-    cc_payment_schedule_rows = []
-
-    for pay_date in payment_event_dates:
-        # Determine "prior month" window relative to payment date
-        pay_date = pd.Timestamp(pay_date)
-        prior_month_end = (pay_date.replace(day=1) - pd.Timedelta(days=1)).normalize()
-        prior_month_start = prior_month_end.replace(day=1)
-
-        # weeks in prior month (Mon week starts that intersect that month)
-        weeks_in_prior_month = pd.date_range(
-            start=monday_week_start(pd.Series([prior_month_start]))[0],
-            end=monday_week_start(pd.Series([prior_month_end]))[0],
-            freq="W-MON"
-        )
-
-        # Statement amount = sum of weekly CC spend totals in prior month (absolute)
-        stmt_amt = cc_spend_total_week.reindex(weeks_in_prior_month, fill_value=0.0).abs().sum()
-
-        # If statement amount is tiny/zero, skip
-        if float(stmt_amt) == 0.0:
-            continue
-
-        # Allocate across categories based on rolling mix window ending before payment date
-        mix_end_week = monday_week_start(pd.Series([pay_date - pd.Timedelta(days=1)]))[0]
-        mix_window_weeks = pd.date_range(end=mix_end_week, periods=CC_MIX_ROLLING_WEEKS, freq="W-MON")
-        shares = spend_mix_for_window(mix_window_weeks, cc_spend_cat_pivot_top, cc_spend_proj_cat)
-
-        # allocate into the payment's week bucket
-        pay_week = monday_week_start(pd.Series([pay_date]))[0]
-        if pay_week not in proj_week_starts:
-            continue
-
-        # Add rows for each category
-        for cat, share in shares.items():
-            line = (f"CC Payment - {cat}", "Credit Card Payment", "")
-            if line not in cc_payment_alloc.index:
-                cc_payment_alloc.loc[line, :] = 0.0
-            cc_payment_alloc.loc[line, pay_week] += -float(stmt_amt * share)  # signed cash outflow
-
-        cc_payment_schedule_rows.append({
-            "payment_date": pay_date,
-            "payment_week_start": pay_week,
-            "estimated_payment_total": float(stmt_amt),
-            "allocation_window_weeks": f"{mix_window_weeks.min().date()} to {mix_window_weeks.max().date()}",
-            "prior_month": f"{prior_month_start.date()} to {prior_month_end.date()}",
-            "cadence_inferred": ccpay_kind,
-            "typical_dom": dom_mode,
-        })
-
-    cc_payment_schedule = pd.DataFrame(cc_payment_schedule_rows).sort_values("payment_date") if len(cc_payment_schedule_rows) else pd.DataFrame(
-        columns=["payment_date","payment_week_start","estimated_payment_total","allocation_window_weeks","prior_month","cadence_inferred","typical_dom"]
-    )
-
-    return cc_payment_schedule, cc_payment_alloc
\ No newline at end of file
+    """
+    Statement amount and category split of every projected CC payment from one
+    (cards x categories x weeks) spend array. Each payment pays the absolute weekly spend of its own
+    card over the weeks touching the prior month, split by that card's category shares of absolute
+    spend over the CC_MIX_ROLLING_WEEKS weeks before it (all "Uncategorized" when there was none).
+    Both are prefix-sum slice differences, and the allocation is added into a preallocated
+    (lines x proj weeks) matrix of category lines, summed over cards.
+
+    Spend frames indexed by category only and a plain list of payment dates are treated as one card.
+    returns (payment schedule, allocation DataFrame of signed cash outflows)
+    """
+    if "card" not in (cc_spend_cat_pivot_top.index.names or []):
+        cc_spend_cat_pivot_top = pd.concat({POOLED_CARD: cc_spend_cat_pivot_top}, names=["card"])
+        cc_spend_proj_cat = pd.concat({POOLED_CARD: cc_spend_proj_cat}, names=["card"])
+    if not isinstance(payment_event_dates, pd.DataFrame):
+        payment_event_dates = pd.DataFrame({"card": POOLED_CARD, "payment_date": pd.DatetimeIndex(payment_event_dates)})
+    if not isinstance(ccpay_kind, pd.Series):
+        ccpay_kind = pd.Series(ccpay_kind, index=pd.Index(payment_event_dates["card"].unique()))
+        dom_mode = pd.Series(dom_mode, index=ccpay_kind.index)
+
+    cards = cc_spend_cat_pivot_top.index.unique("card")
+    cats = cc_spend_cat_pivot_top.index.unique("cat")
+    grid = pd.MultiIndex.from_product([cards, cats], names=["card","cat"])
+    weeks, spend = spend_matrix(cc_spend_cat_pivot_top.reindex(grid, fill_value=0.0), cc_spend_proj_cat.reindex(grid, fill_value=0.0))
+    spend = spend.reshape(len(cards), len(cats), len(weeks))
+    cat_prefix = np.concatenate([np.zeros((len(cards), len(cats), 1)), np.cumsum(np.abs(spend), axis=2)], axis=2)
+    total_prefix = np.concatenate([np.zeros((len(cards), 1)), np.cumsum(np.abs(spend.sum(axis=1)), axis=1)], axis=1)
+
+    # Calendar lookups for every payment date at once: prior month bounds and their week starts,
+    # the week before the payment (end of the mix window) and the payment week
+    events = payment_event_dates.sort_values("payment_date", kind="stable")
+    pay_dates = pd.DatetimeIndex(events["payment_date"])
+    pay_cards = pd.Index(events["card"])
+    cal = calendar_for(pay_dates.append(pay_dates - pd.Timedelta(days=62)))
+    prior_month_ends = cal.month_start(pay_dates) - np.timedelta64(1, "D")
+    prior_month_starts = cal.month_start(prior_month_ends)
+    mix_end_weeks = pd.DatetimeIndex(cal.week_start(pay_dates - pd.Timedelta(days=1)))
+    mix_start_weeks = mix_end_weeks - pd.Timedelta(weeks=CC_MIX_ROLLING_WEEKS - 1)
+    pay_weeks = pd.DatetimeIndex(cal.week_start(pay_dates))
+
+    # each event reads its own card's prefix sums; cards without spend have nothing to pay
+    code = cards.get_indexer(pay_cards)
+    known = code >= 0
+    safe = np.where(known, code, 0)
+    ev = np.arange(len(events))
+    stmt_amt = window_sums(total_prefix, weeks, cal.week_start(prior_month_starts), cal.week_start(prior_month_ends))
+    stmt_amt = np.where(known, stmt_amt[safe, ev] if len(cards) else 0.0, 0.0)
+    mix = window_sums(cat_prefix, weeks, mix_start_weeks, mix_end_weeks)[safe, :, ev].T if len(cards) else np.zeros((len(cats), len(ev)))
+    mix_total = mix.sum(axis=0)
+    pay_col = pd.DatetimeIndex(proj_week_starts).get_indexer(pay_weeks)
+    paid = np.flatnonzero((stmt_amt != 0.0) & (pay_col >= 0))
+
+    # Rows appear in the order payments first reach them: every category, or "Uncategorized"
+    # for a payment whose mix window had no spend
+    uncategorized = mix_total[paid] == 0
+    rows, row_of = [], {}
+    for unc in uncategorized:
+        for cat in (["Uncategorized"] if unc else cats):
+            if cat not in row_of:
+                row_of[cat] = len(rows)
+                rows.append(cat)
+
+    alloc = np.zeros((len(rows), len(proj_week_starts)))
+    if len(paid):
+        cat_rows = np.array([row_of.get(c, -1) for c in cats], dtype=int)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = mix[:, paid] / mix_total[paid]
+        split = ~uncategorized
+        cols = np.broadcast_to(pay_col[paid][split], (len(cats), split.sum()))
+        np.add.at(alloc, (np.broadcast_to(cat_rows[:, None], cols.shape), cols), -(stmt_amt[paid][split] * shares[:, split]))
+        if uncategorized.any():
+            np.add.at(alloc[row_of["Uncategorized"]], pay_col[paid][uncategorized], -stmt_amt[paid][uncategorized])
+
+    index = pd.MultiIndex.from_tuples([(f"CC Payment - {cat}", "Credit Card Payment", "") for cat in rows], names=idx_names)
+    cc_payment_alloc = pd.DataFrame(alloc, index=index, columns=proj_week_starts)
+
+    fmt = lambda d: pd.DatetimeIndex(d).strftime("%Y-%m-%d")
+    columns = ["card"] + SCHEDULE_COLUMNS
+    cc_payment_schedule = pd.DataFrame({
+        "card": pay_cards[paid],
+        "payment_date": pay_dates[paid],
+        "payment_week_start": pay_weeks[paid],
+        "estimated_payment_total": stmt_amt[paid],
+        "allocation_window_weeks": fmt(mix_start_weeks[paid]) + " to " + fmt(mix_end_weeks[paid]),
+        "prior_month": fmt(prior_month_starts[paid]) + " to " + fmt(prior_month_ends[paid]),
+        "cadence_inferred": ccpay_kind.reindex(pay_cards[paid]).to_numpy(),
+        "typical_dom": dom_mode.reindex(pay_cards[paid]).to_numpy(),
+    }, columns=columns) if len(paid) else pd.DataFrame(columns=columns)
+
+    return cc_payment_schedule, cc_payment_alloc
@@ -0,0 +1,127 @@
+import datetime
+import os
+import numpy as np
+import pandas as pd
+
+# =========================
+# STREAMING (WRITE-ONLY) EXCEL SHEETS
+# =========================
+
+# Rows per sheet Excel accepts, header included
+EXCEL_MAX_ROWS = 1_048_576
+# Frame rows converted and appended per batch
+DETAIL_BATCH_ROWS = int(os.getenv("CASH_IQ_DETAIL_BATCH_ROWS", "10000"))
+# What to do with the rows of a detail sheet past EXCEL_MAX_ROWS: "split" continues them in
+# "<sheet> (2)", "<sheet> (3)", ... and "csv" writes them to "<output name> - <sheet>.csv"
+DETAIL_OVERFLOW = os.getenv("CASH_IQ_DETAIL_OVERFLOW", "split")
+
+# Cell formats pd.ExcelWriter uses, so streamed sheets read back the same
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT = "YYYY-MM-DD"
+
+
+def excel_value(val):
+    """
+    The value pd.ExcelWriter would store for val, and its number format (or None).
+    """
+    if val is None or (pd.api.types.is_scalar(val) and pd.isna(val)):
+        return None, None
+    if isinstance(val, (bool, np.bool_)):
+        return bool(val), None
+    if isinstance(val, (int, np.integer)):
+        return int(val), None
+    if isinstance(val, (float, np.floating)):
+        return ("inf" if val > 0 else "-inf") if np.isinf(val) else float(val), None
+    if isinstance(val, datetime.datetime):
+        return val, DATETIME_FORMAT
+    if isinstance(val, datetime.date):
+        return val, DATE_FORMAT
+    if isinstance(val, datetime.timedelta):
+        return val.total_seconds() / 86400, "0"
+    return str(val), None
+
+
+class SheetStreamer:
+    """
+    Writes DataFrames into the sheets of a write-only openpyxl workbook a batch of rows at a
+    time, so no cell objects are kept in memory. Header cells get pd.ExcelWriter's header style
+    and values its number formats.
+    """
+
+    def __init__(self, wb, max_rows=EXCEL_MAX_ROWS, overflow=DETAIL_OVERFLOW, spill_prefix=None,
+                 batch_rows=DETAIL_BATCH_ROWS):
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        if overflow not in ("split", "csv"):
+            raise ValueError(f"overflow must be 'split' or 'csv', not {overflow!r}")
+        if overflow == "csv" and not spill_prefix:
+            raise ValueError("overflow='csv' needs a spill_prefix for the CSV files")
+        self.wb = wb
+        self.max_rows = max_rows
+        self.overflow = overflow
+        self.spill_prefix = spill_prefix
+        self.batch_rows = batch_rows
+        thin = Side(style="thin")
+        self.header_font = Font(bold=True)
+        self.header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        self.header_alignment = Alignment(horizontal="center", vertical="top")
+        self.spilled = []
+
+    def cell(self, ws, val, header=False):
+        from openpyxl.cell import WriteOnlyCell
+
+        value, fmt = excel_value(val)
+        if not header and fmt is None:
+            return value
+        cell = WriteOnlyCell(ws, value)
+        if fmt is not None:
+            cell.number_format = fmt
+        if header:
+            cell.font = self.header_font
+            cell.border = self.header_border
+            cell.alignment = self.header_alignment
+        return cell
+
+    def append_header(self, ws, columns):
+        ws.append([self.cell(ws, c, header=True) for c in columns])
+
+    def append_rows(self, ws, df):
+        """
+        Append the rows of df in batches: one column conversion per batch instead of a cell object per value.
+        """
+        for start in range(0, len(df), self.batch_rows):
+            batch = df.iloc[start:start + self.batch_rows]
+            columns = []
+            for _, col in batch.items():
+                if pd.api.types.is_datetime64_any_dtype(col) or col.dtype == object:
+                    columns.append([self.cell(ws, v) for v in col.astype(object)])
+                else:
+                    columns.append([excel_value(v)[0] for v in col.to_numpy()])
+            for row in zip(*columns):
+                ws.append(row)
+
+    def write_frame(self, sheet_name, df):
+        """
+        df as a new sheet (header + rows), with the rows past max_rows split into more
+        sheets or spilled to a CSV file. returns the sheet names written
+        """
+        per_sheet = self.max_rows - 1
+        ws = self.wb.create_sheet(sheet_name)
+        self.append_header(ws, df.columns)
+        self.append_rows(ws, df.iloc[:per_sheet])
+        names = [sheet_name]
+        if len(df) <= per_sheet:
+            return names
+
+        if self.overflow == "csv":
+            path = f"{self.spill_prefix} - {sheet_name}.csv"
+            df.iloc[per_sheet:].to_csv(path, index=False, chunksize=self.batch_rows)
+            self.spilled.append(path)
+            return names
+
+        for part, start in enumerate(range(per_sheet, len(df), per_sheet), start=2):
+            names.append(f"{sheet_name} ({part})")
+            ws = self.wb.create_sheet(names[-1])
+            self.append_header(ws, df.columns)
+            self.append_rows(ws, df.iloc[start:start + per_sheet])
+        return names
@@ -0,0 +1,216 @@
+import hashlib
+import os
+import re
+import sqlite3
+import numpy as np
+import pandas as pd
+from src.trinity.cash import get_bank_tx
+from src.trinity.credit_card import begin_cc
+from src.trinity.classification_cache import client_key
+
+# =========================
+# INCREMENTAL GL STORE (SQLite)
+# =========================
+
+# Set to a directory to keep one store per client there (named by the client id); empty disables the store
+STORE_DIR = os.getenv("CASH_IQ_STORE_DIR", "")
+
+# Fields that identify a transaction. The running balance is left out on purpose:
+# it changes for every later row when an earlier row is added.
+FINGERPRINT_COLUMNS = ["account_name","date","txn_type","num","name","memo","split_account","amount"]
+
+STORED_COLUMNS = ["account_name","split_account","split_type","split_detail_type","date","week_start","amount"]
+BANK_KEY = ["split_account","split_type","split_detail_type","week_start"]
+CC_KEY = ["account_name","split_account","week_start"]
+# Bump whenever the aggregate tables change, so existing stores re-aggregate on the next sync
+STORE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    fp INTEGER PRIMARY KEY,
+    account_name TEXT, split_account TEXT, split_type TEXT, split_detail_type TEXT,
+    date TEXT, week_start TEXT, amount_cents INTEGER
+);
+CREATE TABLE IF NOT EXISTS bank_weekly (
+    split_account TEXT, split_type TEXT, split_detail_type TEXT, week_start TEXT,
+    amount_cents INTEGER, n INTEGER,
+    PRIMARY KEY (split_account, split_type, split_detail_type, week_start)
+);
+DROP TABLE IF EXISTS cc_weekly;
+CREATE TABLE IF NOT EXISTS cc_card_weekly (
+    account_name TEXT, split_account TEXT, week_start TEXT, amount_cents INTEGER, n INTEGER,
+    PRIMARY KEY (account_name, split_account, week_start)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def transaction_fingerprints(gl):
+    """
+    Stable 64-bit id per GL row. Identical rows are told apart by their occurrence number,
+    so a duplicated payment stays two transactions.
+    """
+    base = pd.util.hash_pandas_object(gl[FINGERPRINT_COLUMNS], index=False)
+    seq = base.groupby(base).cumcount()
+    fp = pd.util.hash_pandas_object(pd.DataFrame({"base": base.values, "seq": seq.values}), index=False)
+    return fp.to_numpy().view(np.int64)
+
+
+def accounts_key(bank_accounts, cc_accounts):
+    h = hashlib.sha256()
+    h.update(f"store-v{STORE_VERSION}".encode())
+    h.update("\n".join(sorted(bank_accounts)).encode())
+    h.update(b"\0")
+    h.update("\n".join(sorted(cc_accounts)).encode())
+    return h.hexdigest()
+
+
+def store_path(client, store_dir=STORE_DIR):
+    """
+    Store file of a client, by its stable id (see run_cash_iq). returns "<store_dir>/<client>.sqlite"
+    """
+    return os.path.join(store_dir, re.sub(r"[^\w.-]+", "_", client) + ".sqlite")
+
+
+def migrate_store(client, coa, store_dir=STORE_DIR):
+    """
+    Store file of a client, moving the one an earlier run kept under the client_key of its chart of
+    accounts to the client's own name first (that key changes whenever an account is added or renamed).
+    returns the store path
+    """
+    path = store_path(client, store_dir)
+    legacy = store_path(client_key(coa), store_dir)
+    if legacy != path and os.path.exists(legacy):
+        if os.path.exists(path):
+            os.remove(legacy)
+        else:
+            os.replace(legacy, path)
+    return path
+
+
+def _to_cents(amount):
+    return np.rint(np.asarray(amount, dtype=float) * 100).astype(np.int64)
+
+
+class GLStore:
+    """
+    Persistent copy of a client's GL plus the weekly aggregates the pipeline builds from it:
+    bank cash by (split account, type, detail type, week) and CC spend by (category, week).
+
+    sync() diffs an uploaded GL against the stored one by transaction fingerprint and only
+    applies the added and removed rows to the aggregates, so a weekly refresh costs the size
+    of the change. Amounts are kept in integer cents so repeated +/- updates stay exact.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.executescript(SCHEMA)
+
+    def close(self):
+        self.con.close()
+
+    def _meta(self, key):
+        row = self.con.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, gl, bank_accounts, cc_accounts):
+        """
+        Make the store mirror gl. returns counts of added and removed transactions
+        """
+        fp = transaction_fingerprints(gl)
+        key = accounts_key(bank_accounts, cc_accounts)
+
+        # The diff is read inside the write transaction: a concurrent sync of the same store
+        # waits for it instead of inserting the same new rows from a stale read
+        self.con.execute("BEGIN IMMEDIATE")
+        with self.con:
+            stored = pd.read_sql("SELECT fp FROM transactions", self.con)["fp"].to_numpy()
+            added = gl.loc[~np.isin(fp, stored), STORED_COLUMNS].copy()
+            added["fp"] = fp[~np.isin(fp, stored)]
+            gone = stored[~np.isin(stored, fp)]
+            rebuild = self._meta("accounts_key") != key
+
+            removed = self._delete(gone)
+            self._insert(added)
+            if rebuild:
+                # bank / CC account lists changed: re-aggregate every stored transaction
+                self.con.execute("DELETE FROM bank_weekly")
+                self.con.execute("DELETE FROM cc_card_weekly")
+                self._apply(self._read_transactions(), bank_accounts, cc_accounts, 1)
+                self.con.execute("INSERT OR REPLACE INTO meta VALUES ('accounts_key', ?)", (key,))
+            else:
+                self._apply(added, bank_accounts, cc_accounts, 1)
+                self._apply(removed, bank_accounts, cc_accounts, -1)
+
+        return {"added": len(added), "removed": len(removed), "rebuilt": rebuild}
+
+    def _insert(self, tx):
+        rows = zip(
+            tx["fp"].tolist(), tx["account_name"], tx["split_account"], tx["split_type"], tx["split_detail_type"],
+            tx["date"].dt.strftime("%Y-%m-%d"), tx["week_start"].dt.strftime("%Y-%m-%d"), _to_cents(tx["amount"]).tolist(),
+        )
+        self.con.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _read_transactions(self, where="", params=()):
+        tx = pd.read_sql(f"SELECT * FROM transactions {where}", self.con, params=params)
+        tx["date"] = pd.to_datetime(tx["date"])
+        tx["week_start"] = pd.to_datetime(tx["week_start"])
+        tx["amount"] = tx["amount_cents"] / 100.0
+        return tx
+
+    def _delete(self, fps):
+        # stage the ids in a temp table so large diffs don't hit the SQL variable limit
+        self.con.execute("CREATE TEMP TABLE IF NOT EXISTS gone (fp INTEGER PRIMARY KEY)")
+        self.con.execute("DELETE FROM gone")
+        self.con.executemany("INSERT INTO gone VALUES (?)", ((int(f),) for f in fps))
+        removed = self._read_transactions("WHERE fp IN (SELECT fp FROM gone)")
+        self.con.execute("DELETE FROM transactions WHERE fp IN (SELECT fp FROM gone)")
+        return removed
+
+    def _apply(self, tx, bank_accounts, cc_accounts, sign):
+        if not len(tx):
+            return
+        tx = tx.assign(amount_cents=_to_cents(tx["amount"]) * sign)
+
+        bank = get_bank_tx(tx, bank_accounts, cc_accounts)
+        self._upsert("bank_weekly", bank, BANK_KEY, sign)
+
+        cc = begin_cc(tx, bank_accounts, cc_accounts)
+        self._upsert("cc_card_weekly", cc, CC_KEY, sign)
+
+    def _upsert(self, table, tx, key, sign):
+        if not len(tx):
+            return
+        agg = tx.groupby(key, dropna=False)["amount_cents"].agg(["sum", "size"]).reset_index()
+        agg["week_start"] = agg["week_start"].dt.strftime("%Y-%m-%d")
+        agg["size"] *= sign
+        cols = ", ".join(key)
+        self.con.executemany(
+            f"INSERT INTO {table} ({cols}, amount_cents, n) VALUES ({', '.join('?' * (len(key) + 2))}) "
+            f"ON CONFLICT ({cols}) DO UPDATE SET amount_cents = amount_cents + excluded.amount_cents, n = n + excluded.n",
+            agg[key + ["sum", "size"]].itertuples(index=False, name=None),
+        )
+        self.con.execute(f"DELETE FROM {table} WHERE n <= 0")
+
+    def _read_weekly(self, table):
+        df = pd.read_sql(f"SELECT * FROM {table}", self.con)
+        df["week_start"] = pd.to_datetime(df["week_start"])
+        df["date"] = df["week_start"]
+        df["amount"] = df["amount_cents"] / 100.0
+        return df.drop(columns=["amount_cents", "n"])
+
+    def bank_weekly(self):
+        """
+        Weekly bank cash per line, one row per (line, week), shaped like bank_tx
+        so it can go straight into buil_actual_weekly_cash.
+        """
+        return self._read_weekly("bank_weekly")
+
+    def cc_spend_weekly(self):
+        """
+        Weekly CC spend per card and category, shaped like cc_spend_txn (date = week start)
+        so it can go straight into get_cc_debt_history. Week-level dates give the same
+        window as the transaction dates when the projection starts on a Monday.
+        """
+        return self._read_weekly("cc_card_weekly")
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from src.trinity.projections import weekly_flow_mask, weekly_pattern_residuals, weekly_matrix
+
+# =========================
+# MONTE CARLO CASH BALANCE BANDS
+# =========================
+
+BAND_QUANTILES = (0.10, 0.50, 0.90)
+# Paths simulated per block when lines are resampled independently (bounds memory to block x weeks x lines)
+PATH_BLOCK = 1000
+
+
+def bank_line_residuals(bank_tx, cc_accounts, cadence_start, cadence_end, hist_week_starts, idx_names):
+    """
+    Weekly residuals (lines x hist weeks) of the weekly-flow bank lines, from the same history window
+    and week-of-month fit project_cash uses. Cadenced and sparse lines are left out: their
+    projected events carry no week-to-week noise of that kind.
+    returns (lines, residual array)
+    """
+    hist_tx = bank_tx[(bank_tx["date"] >= cadence_start) & (bank_tx["date"] <= cadence_end)]
+    hist_tx = hist_tx[~hist_tx["split_account"].isin(cc_accounts)].sort_values("date", kind="stable")
+    lines, hist, _ = weekly_matrix(hist_tx, idx_names, hist_week_starts)
+    weekly = weekly_flow_mask(hist)
+    return lines[weekly], weekly_pattern_residuals(hist[weekly], hist_week_starts)
+
+
+def simulate_flow_noise(residuals, n_weeks, n_paths, joint=True, seed=None):
+    """
+    Bootstrap the net weekly cash noise (paths x weeks) from residuals (lines x hist weeks).
+    joint=True draws one history week per (path, week) for all lines together, which keeps the
+    co-movement between lines (payroll and payroll taxes); joint=False draws every line independently.
+    """
+    rng = np.random.default_rng(seed)
+    residuals = np.asarray(residuals, dtype=float)
+    n_lines, n_hist = residuals.shape
+    if not n_lines or not n_hist:
+        return np.zeros((n_paths, n_weeks))
+
+    if joint:
+        return residuals.sum(axis=0)[rng.integers(0, n_hist, size=(n_paths, n_weeks))]
+
+    noise = np.empty((n_paths, n_weeks))
+    rows = np.arange(n_lines)
+    for start in range(0, n_paths, PATH_BLOCK):
+        stop = min(start + PATH_BLOCK, n_paths)
+        draws = rng.integers(0, n_hist, size=(stop - start, n_weeks, n_lines))
+        noise[start:stop] = residuals[rows, draws].sum(axis=2)
+    return noise
+
+
+def cash_balance_bands(beg_bal_series, end_bal_series, proj_week_starts, noise, cash_floor=0.0, quantiles=BAND_QUANTILES):
+    """
+    Add the simulated noise (paths x proj weeks) to the projected weeks of get_cash_balance and
+    summarize per week: beginning/ending balance quantiles and the probability that the ending
+    balance is below cash_floor. Actual weeks carry no noise.
+    returns (bands DataFrame indexed by week start, probability of going below the floor in any projected week)
+    """
+    weeks = beg_bal_series.index
+    proj = pd.Index(weeks).get_indexer(pd.DatetimeIndex(proj_week_starts))
+    n_paths = len(noise)
+
+    drift = np.zeros((n_paths, len(weeks)))
+    drift[:, proj] = noise
+    drift = np.cumsum(drift, axis=1)
+    end_paths = end_bal_series.to_numpy(dtype=float)[None, :] + drift
+    beg_paths = beg_bal_series.to_numpy(dtype=float)[None, :] + np.concatenate([np.zeros((n_paths, 1)), drift[:, :-1]], axis=1)
+
+    bands = {}
+    for label, paths in [("Beginning", beg_paths), ("Ending", end_paths)]:
+        for q, values in zip(quantiles, np.quantile(paths, quantiles, axis=0)):
+            bands[f"{label} Bank Balance P{round(q * 100)}"] = values
+    below = end_paths < cash_floor
+    bands[f"P(Ending < {cash_floor:,.0f})"] = below.mean(axis=0)
+
+    p_breach = float(below[:, proj].any(axis=1).mean()) if n_paths else 0.0
+    return pd.DataFrame(bands, index=pd.Index(weeks, name="Week Start")), p_breach
+
+
+def simulate_cash_bands(bank_tx, cc_accounts, cadence_start, cadence_end, hist_week_starts, idx_names, beg_bal_series,
+                        end_bal_series, proj_week_starts, n_paths=10_000, cash_floor=0.0, joint=True, seed=None):
+    """
+    Residual bootstrap around the deterministic projection. returns (bands, probability of breaching the floor)
+    """
+    _, residuals = bank_line_residuals(bank_tx, cc_accounts, cadence_start, cadence_end, hist_week_starts, idx_names)
+    noise = simulate_flow_noise(residuals, len(proj_week_starts), n_paths, joint=joint, seed=seed)
+    return cash_balance_bands(beg_bal_series, end_bal_series, proj_week_starts, noise, cash_floor)
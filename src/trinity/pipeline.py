@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import tempfile
+from src.trinity.preprocessing import week_windows
+from src.trinity.cache import FrameCache, load_inputs, CACHE_DIR
+from src.trinity.gl_store import GLStore, STORE_DIR, migrate_store
+from src.trinity.calendar_table import get_calendar
+from src.trinity.cash import begin_cash, buil_actual_weekly_cash, project_cash
+from src.trinity.credit_card import begin_cc, get_cc_debt_history, project_cc_debt, project_cc_payments, allocate_payments
+from src.trinity.postprocessing import get_combined_bank, build_inflows_outflows, get_cash_balance, get_cc_output_sheets, build_output_workbook
+from src.trinity.excel_stream import DETAIL_OVERFLOW
+from src.trinity.classify_transactions import get_calssifications
+from src.trinity.classification_cache import ClassificationCache, CLASSIFY_CACHE_PATH, client_key
+from src.trinity.scenarios import run_scenarios
+from src.trinity.montecarlo import simulate_cash_bands
+
+# =========================
+# HEADLESS ENTRY POINT (no Streamlit)
+# =========================
+
+
+def run_cash_iq(COA_PATH, GL_PATH, date_strt, OUTPUT_XLSX, scenarios=None, simulate_paths=0, cash_floor=0.0, spilled=None,
+                client=None):
+    """
+    Build the 13-week cash flow workbook, also saved at OUTPUT_XLSX unless it is empty.
+    client is a stable id of the client (e.g. its name): the GL store and the cached classifications
+    are kept under it. Without one they fall back to client_key(coa), which changes with the accounts.
+    With CASH_IQ_DETAIL_OVERFLOW=csv, detail rows past the Excel row limit go to CSV files in a
+    new temporary directory per run; their paths are appended to the spilled list when one is given.
+    returns the workbook bytes
+    """
+    # Projection, history and cadence windows for the start date
+    (PROJ_WEEK1_START, CC_MIX_ROLLING_WEEKS, CC_SPEND_TS_WEEKS, TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES, 
+     TOP_N_CC_CATS, actual_week_starts, proj_week_starts, all_week_starts, hist_week_starts, cadence_start,
+       cadence_end, proj_end_date) = week_windows(date_strt)
+    # Cleaned COA/GL frames are cached on disk by file content when CASH_IQ_CACHE_DIR is set
+    cache = FrameCache(CACHE_DIR) if CACHE_DIR else None
+    coa, bank_accounts, cc_accounts, gl = load_inputs(COA_PATH, GL_PATH, cache=cache)
+    coa_key = client_key(coa)
+    client = client or coa_key
+    # One calendar over the whole history and projection range; every week/month lookup indexes it
+    get_calendar(min(gl["date"].min(), cadence_start), proj_end_date)
+
+    # Start processing the cash data
+    bank_tx, beginning_cash_balance, asof_date = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+    cc_spend_txn = begin_cc(gl, bank_accounts, cc_accounts)
+
+    # With a GL store only the rows that changed since the last upload update the weekly aggregates
+    # behind the actuals pivot and the CC spend history; the bank line projections, beginning cash
+    # and the CC payment history still read the full GL
+    if STORE_DIR:
+        os.makedirs(STORE_DIR, exist_ok=True)
+        store = GLStore(migrate_store(client, coa))
+        store.sync(gl, bank_accounts, cc_accounts)
+        bank_weekly, cc_spend_weekly = store.bank_weekly(), store.cc_spend_weekly()
+        store.close()
+    else:
+        bank_weekly, cc_spend_weekly = bank_tx, cc_spend_txn
+
+    bank_actual_pivot, idx_names = buil_actual_weekly_cash(bank_weekly, all_week_starts)
+    hist_ccpay_bank, proj_bank = project_cash(bank_actual_pivot, bank_tx, cadence_start, cadence_end, cc_accounts, proj_week_starts, 
+                                              PROJ_WEEK1_START, proj_end_date, hist_week_starts, idx_names)
+
+    # Start processing the CC data
+    cc_spend_cat_pivot, cc_spend_hist_start = get_cc_debt_history(cc_spend_weekly, asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS)
+    cc_spend_proj_cat, cc_spend_cat_pivot_top = project_cc_debt(cc_spend_cat_pivot, cc_spend_hist_start, TOP_N_CC_CATS, proj_week_starts, actual_week_starts)
+    payment_event_dates, ccpay_kind, dom_mode = project_cc_payments(hist_ccpay_bank, asof_date, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end,
+                                                                    cards=cc_spend_cat_pivot_top.index.unique("card"))
+    cc_payment_schedule, cc_payment_alloc = allocate_payments(cc_spend_proj_cat, cc_spend_cat_pivot_top, payment_event_dates, CC_MIX_ROLLING_WEEKS, 
+                                                              proj_week_starts, idx_names, ccpay_kind, dom_mode)
+
+    # Now combine the information to get the excel output
+    combined_full = get_combined_bank(proj_bank, bank_actual_pivot, actual_week_starts, proj_week_starts, all_week_starts, cc_payment_alloc)
+    inflows_present, outflows_present, total_inflows, total_outflows = build_inflows_outflows(combined_full, actual_week_starts, all_week_starts, 
+                                                                                              TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES, idx_names)
+    beg_bal_series, end_bal_series = get_cash_balance(total_inflows, total_outflows, beginning_cash_balance, all_week_starts)
+    # What-if scenarios (dict name -> rules, see scenarios.py) are compared side by side in their own sheet
+    scenario_comparison = run_scenarios(combined_full, scenarios, beginning_cash_balance, actual_week_starts, proj_week_starts,
+                                        all_week_starts, TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES) if scenarios else None
+    # Optional probabilistic mode: P10/P50/P90 balances from bootstrapped weekly residuals
+    cash_bands = simulate_cash_bands(bank_tx, cc_accounts, cadence_start, cadence_end, hist_week_starts, idx_names, beg_bal_series,
+                                     end_bal_series, proj_week_starts, simulate_paths, cash_floor) if simulate_paths else None
+    cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present = get_cc_output_sheets(cc_spend_cat_pivot_top, cc_spend_proj_cat, 
+                                                                                                    cc_payment_alloc, all_week_starts, proj_week_starts)
+    # Known lines are classified from the local cache (set CASH_IQ_CLASSIFY_CACHE="" to disable); only new ones go to the model
+    classify_cache = ClassificationCache(CLASSIFY_CACHE_PATH) if CLASSIFY_CACHE_PATH else None
+    if classify_cache is not None and client != coa_key:
+        # classifications an earlier run kept under the chart of accounts key
+        classify_cache.rename_client(coa_key, client)
+    inflows_by_cat, outflows_by_cat = get_calssifications(inflows_present, outflows_present, client, classify_cache)
+    if classify_cache is not None:
+        classify_cache.close()
+    # Data, formulas and styles go into one in-memory workbook; the file is only a copy of its bytes
+    spill_prefix = None
+    if DETAIL_OVERFLOW == "csv":
+        name = os.path.splitext(os.path.basename(OUTPUT_XLSX))[0] if OUTPUT_XLSX else f"Cash_IQ_{date_strt}"
+        spill_prefix = os.path.join(tempfile.mkdtemp(prefix="cash_iq_"), name)
+    spilled = [] if spilled is None else spilled
+    excel_bytes = build_output_workbook(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present,
+                                        total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display,
+                                        cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series,
+                                        end_bal_series, scenario_comparison=scenario_comparison, cash_bands=cash_bands,
+                                        spill_prefix=spill_prefix, spilled=spilled)
+    if OUTPUT_XLSX:
+        with open(OUTPUT_XLSX, "wb") as f:
+            f.write(excel_bytes)
+        print(f"Saved: {OUTPUT_XLSX}")
+    for path in spilled:
+        print(f"Saved (rows past the Excel limit): {path}")
+    print(f"Projection Week 1 starts: {PROJ_WEEK1_START.date()} (Monday)")
+    return excel_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the 13-week cash flow workbook from a COA and GL export")
+    parser.add_argument("coa")
+    parser.add_argument("gl")
+    parser.add_argument("date_strt", help="projection start (a Monday), e.g. 2026-01-12")
+    parser.add_argument("--out", help="output workbook (default Cash_IQ_<date>.xlsx)")
+    parser.add_argument("--client", help="stable client id for the GL store and the classification cache")
+    parser.add_argument("--scenarios", help="JSON file mapping scenario name -> list of rules")
+    parser.add_argument("--simulate-paths", type=int, default=0)
+    parser.add_argument("--cash-floor", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    scenarios = None
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios = json.load(f)
+    out = args.out or f"Cash_IQ_{args.date_strt}.xlsx"
+    run_cash_iq(args.coa, args.gl, args.date_strt, out, scenarios=scenarios, simulate_paths=args.simulate_paths,
+                cash_floor=args.cash_floor, client=args.client)
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
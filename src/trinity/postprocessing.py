@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from src.trinity.classify_transactions import classify_inflows, classify_outflows
+from src.trinity.excel_stream import SheetStreamer, DETAIL_OVERFLOW, EXCEL_MAX_ROWS, excel_value
 
 def get_combined_bank(proj_bank, bank_actual_pivot, actual_week_starts, proj_week_starts, all_week_starts, cc_payment_alloc):
     # Add CC payment allocation rows to bank cash projections
@@ -115,200 +113,229 @@ def get_cc_output_sheets(cc_spend_cat_pivot_top, cc_spend_proj_cat, cc_payment_a
 
     cc_spend_proj_display = cc_spend_proj_cat.reindex(columns=proj_week_starts, fill_value=0.0)
 
+    # (card, category) pairs a card never used stay out of the sheets
+    active = (cc_spend_cat_pivot_top != 0).any(axis=1) | (cc_spend_proj_cat != 0).any(axis=1)
+    cc_spend_actual_display = cc_spend_actual_display[active.to_numpy()]
+    cc_spend_proj_display = cc_spend_proj_display[active.to_numpy()]
+
     cc_payment_alloc_present = cc_payment_alloc.abs() if len(cc_payment_alloc) else pd.DataFrame(columns=proj_week_starts)
 
     return cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present
 
 
 
-def write_output_excel(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series, PROJ_WEEK1_START, OUTPUT_XLSX):
-    # =========================
-    # WRITE OUTPUT EXCEL
-    # =========================
-    with pd.ExcelWriter(OUTPUT_XLSX, engine="openpyxl") as writer:
-        # Summary
-        summary = pd.DataFrame(
-            {
-                "Week Start": all_week_starts,
-                "Beginning Bank Balance": [beg_bal_series[w] for w in all_week_starts],
-                "Total Cash Inflows": [total_inflows[w] for w in all_week_starts],
-                "Total Cash Outflows": [total_outflows[w] for w in all_week_starts],
-                "Ending Bank Balance": [end_bal_series[w] for w in all_week_starts],
-            }
-        )
-        summary.to_excel(writer, sheet_name="Summary", index=False)
-
-        # Cash details
-        inflows_present.reset_index().to_excel(writer, sheet_name="Cash Inflows (Detail)", index=False)
-        outflows_present.reset_index().to_excel(writer, sheet_name="Cash Outflows (Detail)", index=False)
-
-        # Credit card sheets
-        cc_spend_txn.sort_values(["account_name","date"]).to_excel(writer, sheet_name="CC Spend - Transactions", index=False)
-        cc_spend_actual_display.reset_index().to_excel(writer, sheet_name="CC Spend - Weekly (Hist)", index=False)
-        cc_spend_proj_display.reset_index().to_excel(writer, sheet_name="CC Spend - Weekly (Proj)", index=False)
-        cc_payment_schedule.to_excel(writer, sheet_name="CC Payments - Schedule", index=False)
-        cc_payment_alloc_present.reset_index().to_excel(writer, sheet_name="Cash - CC Pay Allocation", index=False)
-
-        # Template-style table
-        rows = []
-        rows.append(("", "", ""))
-        cash_balance_indexes = []
-        rows.append(("Beginning Bank Balance", "", ""))
-        cash_balance_indexes.append(len(rows)+1)
-        rows.append(("Cash Inflows", "", ""))
-        inflow_section_indexes = []
-        for inflow_cat in inflows_by_cat:
-            rows.append(("", inflow_cat, ""))
-            inflow_section_indexes.append(len(rows)+1)
-            for acct in sorted(inflows_by_cat[inflow_cat]):
-                rows.append(("", "", acct))
-
-            rows.append(("", "", ""))
-
-        rows.append(("Total Cash Inflows", "", ""))
+def template_rows(inflows_by_cat, outflows_by_cat):
+    """
+    Label columns (Section, Notes, Line Item) of the Projections (Table) sheet, one tuple per row.
+    returns (rows, inflow section rows, outflow section rows, cash balance rows) with 1-based Excel rows
+    """
+    rows = []
+    rows.append(("", "", ""))
+    cash_balance_indexes = []
+    rows.append(("Beginning Bank Balance", "", ""))
+    cash_balance_indexes.append(len(rows)+1)
+    rows.append(("Cash Inflows", "", ""))
+    inflow_section_indexes = []
+    for inflow_cat in inflows_by_cat:
+        rows.append(("", inflow_cat, ""))
         inflow_section_indexes.append(len(rows)+1)
-        rows.append(("Cash Outflows", "", ""))
-        outflow_section_indexes = []
-        for outflow_cat in outflows_by_cat:
-            rows.append(("", outflow_cat, ""))
-            outflow_section_indexes.append(len(rows)+1)
-            for acct in sorted(outflows_by_cat[outflow_cat]):
-                rows.append(("", "", acct))
+        for acct in sorted(inflows_by_cat[inflow_cat]):
+            rows.append(("", "", acct))
 
-            rows.append(("", "", ""))
+        rows.append(("", "", ""))
 
-        rows.append(("Total Cash Outflows", "", ""))
+    rows.append(("Total Cash Inflows", "", ""))
+    inflow_section_indexes.append(len(rows)+1)
+    rows.append(("Cash Outflows", "", ""))
+    outflow_section_indexes = []
+    for outflow_cat in outflows_by_cat:
+        rows.append(("", outflow_cat, ""))
         outflow_section_indexes.append(len(rows)+1)
-        rows.append(("Ending Bank Balance", "", ""))
-        cash_balance_indexes.append(len(rows)+1)
-
-        proj_sheet = pd.DataFrame(rows, columns=["Section","Notes","Line Item"])
-        for w in all_week_starts:
-            proj_sheet[w.strftime("%Y-%m-%d")] = np.nan
-
-        def put_row_value(section, acct, values):
-            mask = (proj_sheet["Section"].eq(section)) & (proj_sheet["Line Item"].eq(acct))
-            idx = proj_sheet.index[mask]
-            if len(idx):
-                i = idx[0]
-                for w in all_week_starts:
-                    proj_sheet.loc[i, w.strftime("%Y-%m-%d")] = float(values[w])
-
-        put_row_value("Beginning Bank Balance","", beg_bal_series)
-        put_row_value("Ending Bank Balance","", end_bal_series)
-        put_row_value("Total Cash Inflows","", total_inflows)
-        put_row_value("Total Cash Outflows","", total_outflows)
-
-        for (acct, typ, det), row in inflows_present.iterrows():
-            put_row_value("", acct, row)
-
-        for (acct, typ, det), row in outflows_present.iterrows():
-            put_row_value("", acct, row)
-
-        # Switch the Notes and Line item columns for the projections sheet
-        #proj_sheet[['Line Item', 'Notes']] = proj_sheet[['Notes', 'Line Item']].values
-        #proj_sheet = proj_sheet.rename(columns={'Line Item':'Notes','Notes':'Line Item'})
+        for acct in sorted(outflows_by_cat[outflow_cat]):
+            rows.append(("", "", acct))
 
-        proj_sheet.to_excel(writer, sheet_name="Projections (Table)", index=False)
-
-        print(f"Saved: {OUTPUT_XLSX}")
-        print(f"Projection Week 1 starts: {PROJ_WEEK1_START.date()} (Monday)")
-
-    return inflow_section_indexes, outflow_section_indexes, cash_balance_indexes
-
-
-def calculate_category_totals(OUTPUT_XLSX, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
-
-    wb = load_workbook(OUTPUT_XLSX, data_only=True)
-    ws = wb["Projections (Table)"]
-
-    # -----------------------------------------
-    # Get the category totals
-    # -----------------------------------------
-
-    for section_indexes in [inflow_section_indexes, outflow_section_indexes]:
+        rows.append(("", "", ""))
 
-        if section_indexes is inflow_section_indexes:
-            operation = 'SUM'
-        else:
-            operation = '-SUM'
-    
-        for i in range(len(section_indexes)):
-            idx = section_indexes[i]
-            if idx == section_indexes[-1]:
-                break
-            
-            next_idx = section_indexes[i+1]
-            
-            row = ws[idx]
-            for col in range(3, len(row)):
-                col_letter = get_column_letter(col+1)
+    rows.append(("Total Cash Outflows", "", ""))
+    outflow_section_indexes.append(len(rows)+1)
+    rows.append(("Ending Bank Balance", "", ""))
+    cash_balance_indexes.append(len(rows)+1)
+    return rows, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes
+
+
+def projections_table(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, beg_bal_series, end_bal_series):
+    """
+    The Projections (Table) frame: template labels plus one (rows x weeks) value block.
+    Each series and present line goes to the first template row with its (Section, Line Item);
+    when an account name has several present lines the last one wins.
+    returns (proj_sheet, inflow section rows, outflow section rows, cash balance rows)
+    """
+    rows, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes = template_rows(inflows_by_cat, outflows_by_cat)
+
+    # (Section, Line Item) -> first row position
+    row_of = {}
+    for i, (section, _, item) in enumerate(rows):
+        row_of.setdefault((section, item), i)
+
+    lines = pd.concat([inflows_present, outflows_present])
+    names = lines.index.get_level_values("split_account")
+    last = ~names.duplicated(keep="last")
+    series = [("Beginning Bank Balance", beg_bal_series), ("Ending Bank Balance", end_bal_series),
+              ("Total Cash Inflows", total_inflows), ("Total Cash Outflows", total_outflows)]
+    keys = [(section, "") for section, _ in series] + [("", name) for name in names[last]]
+    blocks = [np.asarray([s[w] for w in all_week_starts], dtype=float)[None, :] for _, s in series]
+    blocks.append(lines.loc[last, all_week_starts].to_numpy(dtype=float) if len(lines) else np.zeros((0, len(all_week_starts))))
+    source = np.concatenate(blocks)
+
+    target = np.array([row_of.get(key, -1) for key in keys], dtype=np.int64)
+    values = np.full((len(rows), len(all_week_starts)), np.nan)
+    values[target[target >= 0]] = source[target >= 0]
+
+    labels = pd.DataFrame(rows, columns=["Section","Notes","Line Item"])
+    weeks = pd.DataFrame(values, columns=[w.strftime("%Y-%m-%d") for w in all_week_starts])
+    return pd.concat([labels, weeks], axis=1), inflow_section_indexes, outflow_section_indexes, cash_balance_indexes
+
+
+def category_formulas(n_cols, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    """
+    Formulas of the category, total and cash balance cells of the Projections (Table) sheet, which
+    replace their values. returns {(sheet row, 0-based column): formula (or 0.0 for an empty category)}
+    """
+    from openpyxl.utils import get_column_letter
+
+    formulas = {}
+    letter = {col: get_column_letter(col+1) for col in range(n_cols+1)}
+
+    # Category totals: sum of the accounts below the category (outflows negated)
+    for section_indexes, operation in [(inflow_section_indexes, "SUM"), (outflow_section_indexes, "-SUM")]:
+        for idx, next_idx in zip(section_indexes[:-1], section_indexes[1:]):
+            for col in range(3, n_cols):
                 if next_idx-2 >= idx+1:
-                    row[col].value = f'={operation}({col_letter}{idx+1}:{col_letter}{next_idx-2})'
+                    formulas[idx, col] = f"={operation}({letter[col]}{idx+1}:{letter[col]}{next_idx-2})"
                 else:
-                    row[col].value = 0.0
-
-
-    # -----------------------------------------
-    # Calculate total inflows and outflows
-    # -----------------------------------------
+                    formulas[idx, col] = 0.0
 
+    # Total inflows and outflows: sum of the category totals
     total_inflows_row_idx = inflow_section_indexes[-1]
     total_outflows_row_idx = outflow_section_indexes[-1]
-    for col in range(3, ws.max_column):
-        #print(col)
-        col_letter = get_column_letter(col+1)
-        # Total Inflows
-        inflows_sum_String =  f'='
-        for i in range(len(inflow_section_indexes)-1):
-            inflows_sum_String += f'{col_letter}{inflow_section_indexes[i]}+'
-        inflows_sum_String = inflows_sum_String.rstrip('+')
-        row = ws[total_inflows_row_idx]
-        row[col].value = inflows_sum_String
-
-        # Total Outflows
-        outflows_sum_String =  f'='
-        for i in range(len(outflow_section_indexes)-1):
-            outflows_sum_String += f'{col_letter}{outflow_section_indexes[i]}+'
-        outflows_sum_String = outflows_sum_String.rstrip('+')
-        row = ws[total_outflows_row_idx]
-        row[col].value = outflows_sum_String
-
-
-    # ----------------------------------------------
-    # Calculate beginning and ending cash balances
-    # ----------------------------------------------
-
-    beg_cash_row_idx = cash_balance_indexes[0]
-    end_cash_row_idx = cash_balance_indexes[1]
-    beg_row = ws[beg_cash_row_idx]
-    end_row = ws[end_cash_row_idx]
-
-    # Logic is different for the values of the past than teh ones of the present:
-
-    # Cash balances for the past
+    for col in range(3, n_cols):
+        formulas[total_inflows_row_idx, col] = "=" + "+".join(f"{letter[col]}{idx}" for idx in inflow_section_indexes[:-1])
+        formulas[total_outflows_row_idx, col] = "=" + "+".join(f"{letter[col]}{idx}" for idx in outflow_section_indexes[:-1])
+
+    # Beginning and ending cash balances
+    beg_cash_row_idx, end_cash_row_idx = cash_balance_indexes[:2]
+    # Past weeks: the end balance is the next beginning, the beginning backs out the week's flows
     for col in range(3, 7):
-        col_letter = get_column_letter(col+1)
-        next_col_letter = get_column_letter(col+2)
-        
-        # End balance is just the beg balanace from teh next column
-        end_row[col].value = f'={next_col_letter}{beg_cash_row_idx}'
-
-        # Beg balaance is end balaance - inflows - outflows (already negative)
-        beg_row[col].value = f'={col_letter}{end_cash_row_idx}-{col_letter}{total_outflows_row_idx}-{col_letter}{total_inflows_row_idx}'
-
-    for col in range(7, ws.max_column):
-        col_letter = get_column_letter(col+1)
-        prev_col_letter = get_column_letter(col)
-
-        # Beg balaance is end balaance from previous column except for the one of the present
-        if col == 7:
-            pass
-        else:
-            beg_row[col].value = f'={prev_col_letter}{end_cash_row_idx}'
-
-        # End balance is beg balance + inflows + outflows (already negative)
-        end_row[col].value = f'={col_letter}{beg_cash_row_idx}+{col_letter}{total_inflows_row_idx}+{col_letter}{total_outflows_row_idx}'
-
-        
-    wb.save(OUTPUT_XLSX)
\ No newline at end of file
+        formulas[end_cash_row_idx, col] = f"={letter[col+1]}{beg_cash_row_idx}"
+        formulas[beg_cash_row_idx, col] = f"={letter[col]}{end_cash_row_idx}-{letter[col]}{total_outflows_row_idx}-{letter[col]}{total_inflows_row_idx}"
+    # Present and projected weeks: the beginning is the previous end (except for the present week)
+    for col in range(7, n_cols):
+        if col > 7:
+            formulas[beg_cash_row_idx, col] = f"={letter[col-1]}{end_cash_row_idx}"
+        formulas[end_cash_row_idx, col] = f"={letter[col]}{beg_cash_row_idx}+{letter[col]}{total_inflows_row_idx}+{letter[col]}{total_outflows_row_idx}"
+    return formulas
+
+
+def write_projections_sheet(wb, proj_sheet, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    """
+    Stream the Projections (Table) sheet into the write-only wb: every cell is written once, with
+    its value or formula and the named style of its row kind.
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from src.trinity.styling import register_projection_styles, projection_row_kinds
+
+    styles = {key: style.name for key, style in register_projection_styles(wb).items()}
+    row_kinds = projection_row_kinds(inflow_section_indexes, outflow_section_indexes, cash_balance_indexes)
+    formulas = category_formulas(len(proj_sheet.columns), inflow_section_indexes, outflow_section_indexes, cash_balance_indexes)
+
+    ws = wb.create_sheet("Projections (Table)")
+    rows = [list(proj_sheet.columns)] + proj_sheet.astype(object).values.tolist()
+    for r, values in enumerate(rows, start=1):
+        kind, start = row_kinds.get(r, ("body", 0))
+        row = []
+        for c, val in enumerate(values):
+            value = formulas.get((r, c), excel_value(val)[0])
+            cell = WriteOnlyCell(ws, value)
+            # Accounting format only for numbers
+            cell.style = styles[kind if c >= start else "body", isinstance(value, (int, float))]
+            row.append(cell)
+        ws.append(row)
+    return ws
+
+
+def output_frames(all_week_starts, inflows_present, outflows_present, total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series):
+    """
+    The plain sheets that come before Projections (Table). returns {sheet name: frame} in workbook order
+    """
+    # Summary
+    summary = pd.DataFrame(
+        {
+            "Week Start": all_week_starts,
+            "Beginning Bank Balance": [beg_bal_series[w] for w in all_week_starts],
+            "Total Cash Inflows": [total_inflows[w] for w in all_week_starts],
+            "Total Cash Outflows": [total_outflows[w] for w in all_week_starts],
+            "Ending Bank Balance": [end_bal_series[w] for w in all_week_starts],
+        }
+    )
+    return {
+        "Summary": summary,
+        # Cash details
+        "Cash Inflows (Detail)": inflows_present.reset_index(),
+        "Cash Outflows (Detail)": outflows_present.reset_index(),
+        # Credit card sheets
+        "CC Spend - Transactions": cc_spend_txn.sort_values(["account_name","date"]),
+        "CC Spend - Weekly (Hist)": cc_spend_actual_display.reset_index(),
+        "CC Spend - Weekly (Proj)": cc_spend_proj_display.reset_index(),
+        "CC Payments - Schedule": cc_payment_schedule,
+        "Cash - CC Pay Allocation": cc_payment_alloc_present.reset_index(),
+    }
+
+
+def build_output_workbook(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series, scenario_comparison=None, cash_bands=None, spill_prefix=None, overflow=DETAIL_OVERFLOW, max_rows=EXCEL_MAX_ROWS, spilled=None):
+    """
+    Write the sheets, the Projections (Table) formulas and its styles into an in-memory
+    workbook, serialized once (no save / reload / save round trips through disk).
+    The workbook is write-only and every sheet is written in one pass: the detail sheets
+    (CC transactions above all) a batch of rows at a time, so they keep no cell objects in
+    memory, and Projections (Table) one row of styled cells at a time. Detail rows past
+    max_rows go to extra sheets (overflow="split") or to "<spill_prefix> - <sheet>.csv" (overflow="csv"),
+    whose paths are appended to the spilled list when one is given.
+    returns the xlsx bytes
+    """
+    from io import BytesIO
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    streamer = SheetStreamer(wb, max_rows=max_rows, overflow=overflow, spill_prefix=spill_prefix)
+    frames = output_frames(all_week_starts, inflows_present, outflows_present, total_inflows, total_outflows,
+                           cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn,
+                           cc_payment_schedule, beg_bal_series, end_bal_series)
+    for sheet_name, frame in frames.items():
+        streamer.write_frame(sheet_name, frame)
+
+    # Template-style table, with its formulas and styles
+    proj_sheet, *indexes = projections_table(
+        all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows,
+        total_outflows, beg_bal_series, end_bal_series)
+    write_projections_sheet(wb, proj_sheet, *indexes)
+
+    # What-if comparison (run_scenarios), only when scenarios were requested
+    if scenario_comparison is not None:
+        streamer.write_frame("Scenarios", scenario_comparison.reset_index())
+
+    # Monte Carlo balance bands (simulate_cash_bands), only in probabilistic mode
+    if cash_bands is not None:
+        bands, p_breach = cash_bands
+        ws = wb.create_sheet("Cash Bands")
+        for i, frame in enumerate([bands.reset_index(),
+                                   pd.DataFrame({"Probability of breaching the cash floor in the horizon": [p_breach]})]):
+            if i:
+                ws.append([])
+            streamer.append_header(ws, frame.columns)
+            streamer.append_rows(ws, frame)
+
+    if spilled is not None:
+        spilled.extend(streamer.spilled)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
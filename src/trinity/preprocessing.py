@@ -1,4 +1,14 @@
+import os
+import numpy as np
 import pandas as pd
+from src.trinity.calendar_table import calendar_for
+from src.trinity.accounts import AccountIndex, join_account_types
+from src.trinity.readers import (read_sheet, iter_csv_chunks, iter_parquet_chunks, csv_line_count, parquet_row_count,
+                                 parse_dates, COA_SKIPROWS, COA_COLUMNS, COA_USECOLS, GL_SKIPROWS, GL_COLUMNS,
+                                 GL_DATE_FORMAT)
+
+# Raw rows per block for chunked CSV/Parquet GL ingest
+GL_CHUNK_ROWS = 250_000
 
 def safe_strip(s):
     return s.astype(str).str.strip()
@@ -9,15 +19,25 @@ def to_numeric(series):
 
 def monday_week_start(d: pd.Series) -> pd.Series:
     d = pd.to_datetime(d)
-    return d - pd.to_timedelta(d.dt.weekday, unit="D")
+    ns = d.to_numpy(dtype="datetime64[ns]")
+    ok = ~np.isnat(ns)
+    out = ns.copy()
+    # calendar week start of the day, keeping any time of day like d - weekday days did
+    day = ns[ok].astype("datetime64[D]").astype("datetime64[ns]")
+    out[ok] = calendar_for(day).week_start(day) + (ns[ok] - day)
+    return pd.Series(out, index=d.index, name=d.name)
+
 
+# Bump whenever load_and_clean_coa / load_and_clean_gl output changes,
+# so cached frames from older loaders are not reused
+LOADER_VERSION = 1
 
 # =========================
 # LOAD & CLEAN COA
 # =========================
 
-def load_and_clean_coa(COA_PATH):
-    coa = pd.read_excel(COA_PATH, skiprows=3, names=["full_name","type","detail_type","description","total_balance"])
+def load_and_clean_coa(COA_PATH, engine=None):
+    coa = read_sheet(COA_PATH, COA_SKIPROWS, COA_COLUMNS, usecols=COA_USECOLS, engine=engine)
     coa = coa[(coa["type"].notna()) & (coa["full_name"].notna())].copy()
     coa["full_name"] = safe_strip(coa["full_name"])
     coa["type"] = safe_strip(coa["type"])
@@ -26,46 +46,118 @@ def load_and_clean_coa(COA_PATH):
     global bank_accounts
     global cc_accounts
 
-    bank_accounts = set(coa.loc[coa["type"].eq("Bank"), "full_name"])
-    cc_accounts   = set(coa.loc[coa["type"].eq("Credit Card"), "full_name"])
+    bank_accounts, cc_accounts = get_bank_and_cc_accounts(coa)
 
     return coa, bank_accounts, cc_accounts
 
+def get_bank_and_cc_accounts(coa):
+    bank_accounts = set(coa.loc[coa["type"].eq("Bank"), "full_name"])
+    cc_accounts   = set(coa.loc[coa["type"].eq("Credit Card"), "full_name"])
+    return bank_accounts, cc_accounts
+
 # =========================
 # LOAD GL (QB Transaction Detail by Account)
 # =========================
 
-def load_and_clean_gl(GL_PATH, coa):
-
-    gl = pd.read_excel(
-        GL_PATH,
-        skiprows=4,
-        names=["account_section","date","txn_type","num","name","memo","split_account","amount","balance"],
-    )
-
-    gl["account_name"] = gl["account_section"].ffill()
-    gl["account_name"] = safe_strip(gl["account_name"].fillna(""))
+def gl_format(GL_PATH):
+    """
+    "xlsx", "csv" or "parquet", from the file name (Streamlit uploads carry it in .name)
+    """
+    name = getattr(GL_PATH, "name", GL_PATH)
+    ext = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if ext in {"csv", "parquet"}:
+        return ext
+    return "xlsx"
+
+def clean_gl_chunk(gl, accounts, carry_section=None, date_format=GL_DATE_FORMAT):
+    """
+    Clean one block of raw GL rows. accounts is the AccountIndex of the COA.
+    carry_section is the account section in effect at the end of the previous block, so the
+    forward-fill continues across block boundaries. returns (clean rows, section to carry forward)
+    """
+    account_name = gl["account_section"].ffill()
+    if carry_section is not None:
+        account_name = account_name.fillna(carry_section)
+    last = account_name.dropna()
+    carry_section = last.iloc[-1] if len(last) else carry_section
+
+    gl["account_name"] = safe_strip(account_name.fillna(""))
     gl["split_account"] = safe_strip(gl["split_account"].fillna(""))
 
-    gl["date"] = pd.to_datetime(gl["date"], errors="coerce")
-    gl = gl[gl["date"].notna()].copy()
-
+    gl["date"] = parse_dates(gl["date"], date_format)
     gl["amount"] = to_numeric(gl["amount"])
-    gl = gl[gl["amount"].notna()].copy()
+    gl = gl[gl["date"].notna() & gl["amount"].notna()].reset_index(drop=True)
 
     # attach split account type for grouping
-    gl = gl.merge(
-        coa[["full_name","type","detail_type"]],
-        how="left",
-        left_on="split_account",
-        right_on="full_name",
-    )
-    gl.rename(columns={"type":"split_type","detail_type":"split_detail_type"}, inplace=True)
-    gl["split_type"] = gl["split_type"].fillna("Unmapped")
-    gl["split_detail_type"] = gl["split_detail_type"].fillna("")
+    gl = join_account_types(gl, accounts)
 
     gl["week_start"] = monday_week_start(gl["date"])
-    
+
+    return gl, carry_section
+
+def iter_gl_chunks(GL_PATH, coa, chunksize=GL_CHUNK_ROWS, date_format=GL_DATE_FORMAT):
+    """
+    Yield cleaned GL blocks of at most chunksize raw rows from a CSV or Parquet export.
+    Only the block being cleaned is in memory; what the caller keeps is up to it.
+    """
+    fmt = gl_format(GL_PATH)
+    if fmt == "csv":
+        chunks = iter_csv_chunks(GL_PATH, GL_SKIPROWS, GL_COLUMNS, chunksize)
+    elif fmt == "parquet":
+        chunks = iter_parquet_chunks(GL_PATH, GL_COLUMNS, chunksize)
+    else:
+        raise ValueError(f"Chunked GL ingest needs a CSV or Parquet file, got '{fmt}'")
+
+    accounts = AccountIndex.from_coa(coa)
+    carry_section = None
+    for raw in chunks:
+        clean, carry_section = clean_gl_chunk(raw, accounts, carry_section, date_format)
+        if len(clean):
+            yield clean
+
+def fill_columns(chunks, capacity):
+    """
+    Copy each frame of chunks (same columns) into columns preallocated for capacity rows as it
+    is produced, so only one chunk is alive next to the output, instead of every chunk plus the
+    copy pd.concat makes. The columns grow if capacity turns out too small, and a column whose
+    dtype changes is upcast. returns one frame with a fresh RangeIndex, or None without chunks
+    """
+    columns, n = None, 0
+    for chunk in chunks:
+        if columns is None:
+            columns = {c: np.empty(max(capacity, len(chunk)), dtype=chunk[c].dtype) for c in chunk.columns}
+        stop = n + len(chunk)
+        for c, values in chunk.items():
+            values = values.to_numpy()
+            out = columns[c]
+            if values.dtype != out.dtype:
+                try:
+                    dtype = np.promote_types(out.dtype, values.dtype)
+                except TypeError:
+                    dtype = np.dtype(object)
+                out = columns[c] = out.astype(dtype)
+            if stop > len(out):
+                out = columns[c] = np.concatenate([out, np.empty(max(stop, 2 * len(out)) - len(out), dtype=out.dtype)])
+            out[n:stop] = values
+        n = stop
+    if columns is None:
+        return None
+    # views of the preallocated columns, not another copy
+    return pd.DataFrame({c: values[:n] for c, values in columns.items()}, copy=False)
+
+def load_and_clean_gl(GL_PATH, coa, engine=None, date_format=GL_DATE_FORMAT, chunksize=GL_CHUNK_ROWS):
+
+    fmt = gl_format(GL_PATH)
+    if fmt == "xlsx":
+        gl = read_sheet(GL_PATH, GL_SKIPROWS, GL_COLUMNS, engine=engine)
+        gl, _ = clean_gl_chunk(gl, AccountIndex.from_coa(coa), date_format=date_format)
+        return gl
+
+    # Cleaning only drops rows, so the raw row count bounds the output
+    capacity = csv_line_count(GL_PATH) if fmt == "csv" else parquet_row_count(GL_PATH)
+    gl = fill_columns(iter_gl_chunks(GL_PATH, coa, chunksize, date_format), capacity)
+    if gl is None:
+        gl, _ = clean_gl_chunk(pd.DataFrame(columns=GL_COLUMNS), AccountIndex.from_coa(coa), date_format=date_format)
     return gl
 
 # =========================
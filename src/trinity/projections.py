@@ -1,193 +1,348 @@
 import pandas as pd
 import numpy as np
-from src.trinity.preprocessing import monday_week_start
+from src.trinity.calendar_table import calendar_for
 
 def week_of_month(dt: pd.Timestamp) -> int:
     return ((dt.day - 1) // 7) + 1
 
-def clamp(v, lo, hi):
-    return max(lo, min(hi, v))
+def weekly_sums(codes, weeks, amounts, n_lines, week_starts):
+    """
+    Weekly aggregation kernel shared by every weekly matrix: sum amounts into a dense
+    (n_lines x weeks) array keyed by integer line code and week start, with one np.bincount.
+    Rows whose week is not in week_starts are ignored.
+    """
+    week_starts = pd.DatetimeIndex(week_starts)
+    wk = week_starts.get_indexer(pd.DatetimeIndex(weeks))
+    keep = wk >= 0
+    cells = np.asarray(codes, dtype=np.int64)[keep] * len(week_starts) + wk[keep]
+    sums = np.bincount(cells, weights=np.asarray(amounts, dtype=float)[keep], minlength=n_lines * len(week_starts))
+    return sums.reshape(n_lines, len(week_starts))
 
-def allocate_to_weeks(dates, amounts, week_starts):
-    s = pd.Series(amounts, index=pd.to_datetime(dates))
-    wk = monday_week_start(s.index.to_series())
-    out = s.groupby(wk).sum()
-    return out.reindex(week_starts, fill_value=0.0)
+def weekly_matrix(tx, keys, week_starts, week_col="week_start"):
+    """
+    Weekly sums of tx amounts per line (the key columns) as a dense (lines x weeks) array.
+    Every line in tx gets a row, also when none of its rows fall in week_starts.
+    returns (lines MultiIndex sorted like groupby, array, line code of every tx row)
+    """
+    key_index = pd.MultiIndex.from_frame(tx[keys])
+    lines = key_index.unique().sort_values()
+    codes = lines.get_indexer(key_index)
+    return lines, weekly_sums(codes, tx[week_col], tx["amount"], len(lines), week_starts), codes
 
-def project_weekly_pattern(series_hist, proj_weeks):
+def classify_cadence_grouped(line_codes, dates, cadence_start, cadence_end, n_lines=None):
     """
-    Project a weekly-flow line:
-    - Use week-of-month seasonality (avg by week_in_month: 1..5)
-    - Add mild trend based on last 12 weeks slope, clamped
+    classify_cadence (tests/reference.py) for many lines in one sorted pass.
+    line_codes: integer line id (0..n_lines-1) of every date. Lines without dates are "irregular".
+    returns array of cadence kinds indexed by line id
     """
-    hist_weeks = series_hist.index
-    hist_vals = series_hist.values.astype(float)
+    line_codes = np.asarray(line_codes, dtype=np.int64)
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+    n_lines = int(line_codes.max()) + 1 if n_lines is None and len(line_codes) else (n_lines or 0)
 
-    # Seasonality by week-of-month
-    wom = np.array([week_of_month(pd.Timestamp(w)) for w in hist_weeks])
-    df = pd.DataFrame({"wom": wom, "y": hist_vals})
-    wom_means = df.groupby("wom")["y"].mean()
+    # Add the cadence window ends to every line (see classify_cadence)
+    sentinels = np.array([pd.Timestamp(cadence_start), pd.Timestamp(cadence_end)], dtype="datetime64[ns]")
+    lines = np.concatenate([line_codes, np.repeat(np.arange(n_lines), 2)])
+    dates = np.concatenate([dates, np.tile(sentinels, n_lines)])
+    ok = ~np.isnat(dates)
+    lines, dates = lines[ok], dates[ok]
 
-    # Baseline from seasonality (fallback to overall mean)
-    overall_mean = float(df["y"].mean())
+    # sort by (line, date) and keep unique dates per line
+    order = np.lexsort((dates, lines))
+    lines, dates = lines[order], dates[order]
+    first = np.ones(len(lines), dtype=bool)
+    first[1:] = (lines[1:] != lines[:-1]) | (dates[1:] != dates[:-1])
+    lines, dates = lines[first], dates[first]
+    n_unique = np.bincount(lines, minlength=n_lines)
 
-    # Trend from last 12 weeks (simple linear regression)
-    tail_n = min(12, len(hist_vals))
-    if tail_n >= 6:
-        y = hist_vals[-tail_n:]
-        x = np.arange(tail_n)
-        # slope via least squares
-        slope = float(np.polyfit(x, y, 1)[0])
-    else:
-        slope = 0.0
-
-    # Clamp trend so we don't explode
-    # Convert weekly slope into a per-week multiplier relative to mean magnitude
-    denom = max(1.0, np.nanmean(np.abs(hist_vals[-tail_n:])) if tail_n else 1.0)
-    slope_ratio = slope / denom
-    slope_ratio = clamp(slope_ratio, -0.15, 0.15)  # cap to +/-15% per week equivalent
-    # Apply cumulative trend
-    proj = []
-    for i, w in enumerate(proj_weeks, start=1):
-        wom_i = week_of_month(pd.Timestamp(w))
-        base = float(wom_means.get(wom_i, overall_mean))
-        proj_val = base * (1.0 + slope_ratio * i)
-        proj.append(proj_val)
-
-    return pd.Series(proj, index=proj_weeks, dtype=float)
-
-
-def project_cadenced_events(dates, amounts, proj_start, proj_end, cadence_start, cadence_end):
-    """
-    Schedule future events based on cadence kind; return list of (date, amount_signed)
-    Amount uses median of past event amounts (signed).
-    """
-    dates = pd.to_datetime(dates).dropna().sort_values()
-    amounts = pd.Series(amounts).astype(float)
-
-    if len(dates) == 0:
-        return []
-
-    kind = classify_cadence(dates, cadence_start, cadence_end)
-    amt_med = float(pd.Series(amounts).replace(0, np.nan).dropna().median()) if (pd.Series(amounts) != 0).any() else 0.0
-    last_date = pd.Timestamp(dates.max())
-
-    future = []
-
-    if kind == "weekly":
-        step = pd.Timedelta(days=7)
-        d = last_date
-        while d < proj_end:
-            d = d + step
-            if d >= proj_start:
-                future.append((d, amt_med))
-
-    elif kind == "biweekly":
-        step = pd.Timedelta(days=14)
-        d = last_date
-        while d < proj_end:
-            d = d + step
-            if d >= proj_start:
-                future.append((d, amt_med))
-
-    elif kind == "monthly":
-        d = last_date
-        while d < proj_end:
-            d = d + pd.DateOffset(months=1)
-            if d >= proj_start:
-                future.append((d, amt_med))
-
-    elif kind == "quarterly":
-        d = last_date
-        while d < proj_end:
-            d = d + pd.DateOffset(months=3)
-            if d >= proj_start:
-                future.append((d, amt_med))
-
-    elif kind == "annual":
-        d = last_date
-        while d < proj_end:
-            d = d + pd.DateOffset(years=1)
-            if d >= proj_start:
-                future.append((d, amt_med))
-
-    elif kind == "semimonthly":
-        # Choose two most common days of month from history
-        dti = pd.DatetimeIndex(pd.to_datetime(dates))
-        dom = dti.day
-        top_days = pd.Series(dom).value_counts().head(2).index.tolist()
-        if len(top_days) == 1:
-            top_days = [top_days[0], min(28, top_days[0] + 14)]
-        top_days = sorted(top_days)
-
-        months = pd.date_range(start=proj_start.normalize(), end=proj_end.normalize(), freq="MS")
-        for m in months:
-            for day in top_days:
-                d = m + pd.Timedelta(days=day - 1)
-                # clamp to month end
-                if d.month != m.month:
-                    d = m + pd.offsets.MonthEnd(0)
-                if proj_start <= d < proj_end:
-                    future.append((d, amt_med / 2.0))
+    # day gaps inside each line
+    same = lines[1:] == lines[:-1]
+    gaps = (dates[1:] - dates[:-1]).astype("timedelta64[D]").astype(np.int64)
+    keep = same & (gaps > 0)
+    gap_line, gaps = lines[1:][keep], gaps[keep]
 
-    else:
-        # irregular: no scheduled events; return empty (will be handled by weekly TS method if needed)
-        return []
-
-    return future
-
-def is_weekly_flow(series_hist):
-    """
-    Decide whether a line behaves like a weekly-flow series.
-    If it has non-zero activity in >= 60% of weeks, treat as weekly-flow.
-    """
-    nz_rate = (series_hist != 0).mean() if len(series_hist) else 0.0
-    return nz_rate >= 0.60
-
-def build_weekly_series(transactions_df, week_index):
-    """
-    transactions_df has columns: date, amount
-    returns weekly sum series indexed by week_index (Mon starts)
-    """
-    wk = monday_week_start(transactions_df["date"])
-    s = transactions_df.groupby(wk)["amount"].sum()
-    return s.reindex(week_index, fill_value=0.0)
-
-def classify_cadence(date_series: pd.Series, cadence_start, cadence_end) -> str:
-
-    # We need to add the cadence end and start dates to the ds variable
-    # This way the take into account the whole year and not get isolated events passed as weekly, monthy, etc
-    date_series = pd.concat([pd.Series(cadence_start), date_series, pd.Series(cadence_end)])
-    ds = pd.to_datetime(date_series).dropna().sort_values().unique()
-    if len(ds) < 3: return "irregular"
-    diffs = np.diff(ds).astype("timedelta64[D]").astype(int)
-    diffs = diffs[diffs > 0]
-    std = np.std(diffs)
-    if len(diffs) < 2: return "irregular"
-    med = float(np.median(diffs))
-    if 12 <= med <= 17 and std/14 <0.2:
-        months = pd.to_datetime(ds).to_period("M")
-        counts = pd.Series(months).value_counts()
-        if (counts >= 2).mean() >= 0.55: return "semimonthly"
-        return "biweekly"
-    if 24 <= med <= 37 and std/30 <0.2: return "monthly"
-    if 70 <= med <= 110 and std/90 <0.2: return "quarterly"
-    if 320 <= med <= 420 and std/365 <0.2: return "annual"
-    return "irregular"
+    m = np.bincount(gap_line, minlength=n_lines)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(gap_line, weights=gaps, minlength=n_lines) / m
+        std = np.sqrt(np.bincount(gap_line, weights=(gaps - mean[gap_line]) ** 2, minlength=n_lines) / m)
+
+    # segment medians: gaps sorted within each line
+    order = np.lexsort((gaps, gap_line))
+    sorted_gaps = gaps[order].astype(float)
+    offsets = np.concatenate([[0], np.cumsum(m)[:-1]])
+    med = np.full(n_lines, np.nan)
+    has = m > 0
+    lo = offsets[has] + (m[has] - 1) // 2
+    hi = offsets[has] + m[has] // 2
+    med[has] = (sorted_gaps[lo] + sorted_gaps[hi]) / 2.0
+
+    kinds = np.full(n_lines, "irregular", dtype=object)
+    valid = (n_unique >= 3) & (m >= 2)
+    with np.errstate(invalid="ignore"):
+        semi_window = valid & (med >= 12) & (med <= 17) & (std / 14 < 0.2)
+        monthly = valid & ~semi_window & (med >= 24) & (med <= 37) & (std / 30 < 0.2)
+        quarterly = valid & ~semi_window & (med >= 70) & (med <= 110) & (std / 90 < 0.2)
+        annual = valid & ~semi_window & (med >= 320) & (med <= 420) & (std / 365 < 0.2)
+
+    # semimonthly when >= 55% of the months seen have two or more dates
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    month_key, month_counts = np.unique(np.stack([lines, months]), axis=1, return_counts=True)
+    share = np.bincount(month_key[0], weights=month_counts >= 2, minlength=n_lines) / np.maximum(
+        np.bincount(month_key[0], minlength=n_lines), 1)
+
+    kinds[semi_window] = np.where(share[semi_window] >= 0.55, "semimonthly", "biweekly")
+    kinds[monthly] = "monthly"
+    kinds[quarterly] = "quarterly"
+    kinds[annual] = "annual"
+    return kinds
 
 def week_of_year(ts):
     ts = pd.Timestamp(ts)
     return int(((ts.month-1) * 30.5 + float(ts.day))/7)
 
-def replicate_last_year_transactions(s_hist, proj_week_starts):
-    week_of_year_transaction_map = {}
-    for w in s_hist.index:
-        week_of_year_transaction_map[week_of_year(w)] = s_hist[w]
-    projection_list = []
-    for w in proj_week_starts:
-        woy = week_of_year(w)
-        corresponding_last_year_transaction = week_of_year_transaction_map.get(woy)
-        projection_list.append(corresponding_last_year_transaction)
-    proj_series = pd.Series(projection_list, index=proj_week_starts)
-    return proj_series
+# =========================
+# BATCHED (lines x weeks) PROJECTIONS
+# =========================
+# Each one replaces a per-line function that is kept in tests/reference.py as the test oracle
+
+def week_of_month_array(week_starts):
+    week_starts = pd.DatetimeIndex(week_starts)
+    return calendar_for(week_starts).week_of_month(week_starts)
+
+def week_of_year_array(week_starts):
+    week_starts = pd.DatetimeIndex(week_starts)
+    return calendar_for(week_starts).week_of_year(week_starts)
+
+def project_weekly_pattern_matrix(hist, hist_weeks, proj_weeks):
+    """
+    project_weekly_pattern for every row of hist (lines x hist weeks) at once.
+    returns (lines x proj weeks) array
+    """
+    hist = np.asarray(hist, dtype=float)
+    n_lines, n_hist = hist.shape
+
+    # Seasonality by week-of-month: one-hot (hist weeks x 5) so the means are a matmul
+    wom = week_of_month_array(hist_weeks)
+    onehot = (wom[:, None] == np.arange(1, 6)).astype(float)
+    counts = onehot.sum(axis=0)
+    overall_mean = hist.mean(axis=1) if n_hist else np.full(n_lines, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wom_means = np.where(counts > 0, (hist @ onehot) / counts, overall_mean[:, None])
+
+    # Trend from last 12 weeks: closed-form least-squares slope per line
+    tail_n = min(12, n_hist)
+    if tail_n >= 6:
+        y = hist[:, -tail_n:]
+        x = np.arange(tail_n) - (tail_n - 1) / 2.0
+        slope = (y - y.mean(axis=1, keepdims=True)) @ x / (x @ x)
+    else:
+        slope = np.zeros(n_lines)
+
+    denom = np.maximum(1.0, np.abs(hist[:, -tail_n:]).mean(axis=1)) if tail_n else np.ones(n_lines)
+    slope_ratio = np.clip(slope / denom, -0.15, 0.15)
+
+    steps = np.arange(1, len(proj_weeks) + 1)
+    base = wom_means[:, week_of_month_array(proj_weeks) - 1]
+    return base * (1.0 + slope_ratio[:, None] * steps)
+
+def weekly_flow_mask(hist):
+    """
+    is_weekly_flow for every row of hist (lines x hist weeks).
+    """
+    hist = np.asarray(hist, dtype=float)
+    return (hist != 0).mean(axis=1) >= 0.60 if hist.shape[1] else np.zeros(len(hist), dtype=bool)
+
+def weekly_pattern_residuals(hist, hist_weeks):
+    """
+    In-sample residuals of the week-of-month means project_weekly_pattern_matrix projects from:
+    hist minus each line's mean for that week of the month. returns (lines x hist weeks) array
+    """
+    hist = np.asarray(hist, dtype=float)
+    wom = week_of_month_array(hist_weeks)
+    onehot = (wom[:, None] == np.arange(1, 6)).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wom_means = np.nan_to_num((hist @ onehot) / onehot.sum(axis=0))
+    return hist - wom_means[:, wom - 1] if hist.shape[1] else hist
+
+def wom_median_matrix(hist, hist_weeks, proj_weeks, tail_weeks=26):
+    """
+    Week-of-month medians of the last tail_weeks for every line (fallback: overall tail median).
+    returns (lines x proj weeks) projection and a per-line flag telling whether any
+    week-of-month median is non-zero
+    """
+    hist = np.asarray(hist, dtype=float)
+    tail = hist[:, -tail_weeks:]
+    wom = week_of_month_array(hist_weeks)[-tail_weeks:] if hist.shape[1] else np.array([], dtype=int)
+    overall = np.median(tail, axis=1) if tail.shape[1] else np.zeros(len(hist))
+
+    medians = np.repeat(overall[:, None], 5, axis=1)
+    found = np.zeros(len(hist), dtype=bool)
+    for k in range(1, 6):
+        cols = wom == k
+        if cols.any():
+            medians[:, k - 1] = np.median(tail[:, cols], axis=1)
+            found |= medians[:, k - 1] != 0.0
+    return medians[:, week_of_month_array(proj_weeks) - 1], found
+
+def last_year_matrix(hist, hist_weeks, proj_weeks):
+    """
+    replicate_last_year_transactions for every line: each projected week takes the latest
+    history week with the same week_of_year, NaN when there is none.
+    """
+    hist = np.asarray(hist, dtype=float)
+    # latest history column per week of year (later columns overwrite earlier ones)
+    hist_woy = week_of_year_array(hist_weeks)
+    latest = np.full(54, -1)
+    latest[hist_woy] = np.arange(len(hist_woy))
+    cols = latest[week_of_year_array(proj_weeks)]
+    out = np.full((len(hist), len(proj_weeks)), np.nan)
+    if len(hist):
+        out[:, cols >= 0] = hist[:, cols[cols >= 0]]
+    return out
+
+# =========================
+# ARRAY EVENT SCHEDULER (all cadenced lines at once)
+# =========================
+
+DAY_NS = 86_400_000_000_000
+DAY_STEPS = {"weekly": 7, "biweekly": 14}
+MONTH_STEPS = {"monthly": 1, "quarterly": 3, "annual": 12}
+
+def days_in_month(months):
+    """
+    months: integer months since 1970-01 (datetime64[M] as int)
+    """
+    m = np.asarray(months).astype("datetime64[M]")
+    return ((m + 1).astype("datetime64[D]") - m.astype("datetime64[D]")).astype(np.int64)
+
+def monday_ns(ts_ns):
+    # 1970-01-01 was a Thursday (weekday 3)
+    days = np.floor_divide(ts_ns, DAY_NS)
+    return (days - (days + 3) % 7) * DAY_NS
+
+def _steps_until(start_ns, step_ns, end_ns):
+    # steps k >= 1 taken by "while d < end: d += step", i.e. ceil((end - start) / step) when start < end
+    return np.where(start_ns < end_ns, -((start_ns - end_ns) // step_ns), 0)
+
+def top_values(line_codes, values, n_lines, k):
+    """
+    The k most frequent values of every line, in pd.Series(<values of the line>).value_counts() order:
+    count descending, ties as value_counts leaves them. That tie order is numpy's (unstable) quicksort
+    of the counts listed in first-seen order, so each line's counts are sorted the same way, with one
+    2-D argsort per number of distinct values instead of one value_counts per line.
+    returns (n_lines x k) array, -1 where a line has fewer than k distinct values
+    """
+    out = np.full((n_lines, k), -1, dtype=np.int64)
+    if not len(line_codes):
+        return out
+    # (line, value) counts in first-seen order, grouped by line keeping that order
+    counts = pd.DataFrame({"line": line_codes, "value": values}).groupby(["line","value"], sort=False).size()
+    order = np.argsort(counts.index.get_level_values("line").to_numpy(), kind="stable")
+    lines = counts.index.get_level_values("line").to_numpy()[order]
+    vals = counts.index.get_level_values("value").to_numpy()[order]
+    n = counts.to_numpy()[order]
+    n_distinct = np.bincount(lines, minlength=n_lines)
+    starts = np.cumsum(n_distinct) - n_distinct
+    for m in np.unique(n_distinct[n_distinct > 0]):
+        rows = np.flatnonzero(n_distinct == m)
+        pos = starts[rows, None] + np.arange(m)
+        # what Series.sort_values(ascending=False) does: argsort the reversed counts, map back, reverse
+        rank = (m - 1 - np.argsort(n[pos][:, ::-1], axis=1, kind="quicksort"))[:, ::-1]
+        top = np.take_along_axis(vals[pos], rank[:, :k], axis=1)
+        out[rows, :top.shape[1]] = top
+    return out
+
+def schedule_events_matrix(line_codes, dates, amounts, kinds, proj_week_starts, proj_start, proj_end):
+    """
+    project_cadenced_events + allocate_to_weeks for many lines at once.
+    line_codes / dates / amounts have one entry per past event; kinds is the cadence kind per line.
+    Future dates are generated as datetime64 arrays (one row per line, one column per step),
+    with monthly / quarterly / annual days clamped to month end and the clamp carried forward
+    like repeated DateOffset additions (Jan 31 -> Feb 28 -> Mar 28).
+    returns ((lines x proj weeks) array, per-line flag: any event scheduled)
+    """
+    kinds = np.asarray(kinds, dtype=object)
+    n_lines = len(kinds)
+    proj_week_starts = pd.DatetimeIndex(proj_week_starts)
+    out = np.zeros((n_lines, len(proj_week_starts)))
+    has_events = np.zeros(n_lines, dtype=bool)
+
+    line_codes = np.asarray(line_codes, dtype=np.int64)
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+    amounts = np.asarray(amounts, dtype=float)
+    ok = ~np.isnat(dates)
+    line_codes, dates, amounts = line_codes[ok], dates[ok], amounts[ok]
+    if not len(line_codes):
+        return out, has_events
+    # each line's events in date order (stable, like sort_values in project_cadenced_events)
+    order = np.lexsort((dates, line_codes))
+    line_codes, dates, amounts = line_codes[order], dates[order], amounts[order]
+
+    present = np.bincount(line_codes, minlength=n_lines) > 0
+    last = np.full(n_lines, np.iinfo(np.int64).min)
+    np.maximum.at(last, line_codes, dates.view(np.int64))
+
+    # signed median of the non-zero past amounts
+    nz = amounts != 0
+    amt_med = pd.Series(amounts[nz]).groupby(line_codes[nz]).median().reindex(range(n_lines), fill_value=0.0).to_numpy()
+
+    start_ns = pd.Timestamp(proj_start).value
+    end_ns = pd.Timestamp(proj_end).value
+    ev_line, ev_ns, ev_amt = [], [], []
+
+    def add(sel, d, valid, amt):
+        rows = np.broadcast_to(sel[:, None], d.shape)
+        ev_line.append(rows[valid])
+        ev_ns.append(d[valid])
+        ev_amt.append(np.broadcast_to(amt[:, None], d.shape)[valid])
+        has_events[sel[valid.any(axis=1)]] = True
+
+    for kind, step_days in DAY_STEPS.items():
+        sel = np.flatnonzero((kinds == kind) & present)
+        if not len(sel):
+            continue
+        step = step_days * DAY_NS
+        n_steps = _steps_until(last[sel], step, end_ns)
+        k = np.arange(1, max(int(n_steps.max()), 1) + 1)
+        d = last[sel][:, None] + k * step
+        add(sel, d, (k <= n_steps[:, None]) & (d >= start_ns), amt_med[sel])
+
+    for kind, step_months in MONTH_STEPS.items():
+        sel = np.flatnonzero((kinds == kind) & present)
+        if not len(sel):
+            continue
+        last_dt = last[sel].astype("datetime64[ns]")
+        last_day = last_dt.astype("datetime64[D]")
+        last_month = last_dt.astype("datetime64[M]").astype(np.int64)
+        day = (last_day - last_day.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+        time_of_day = last[sel] - last_day.astype("datetime64[ns]").view(np.int64)
+
+        end_month = np.datetime64(pd.Timestamp(proj_end).to_datetime64(), "M").astype(np.int64)
+        k = np.arange(1, max(int(((end_month - last_month) // step_months).max()) + 2, 1) + 1)
+        months = last_month[:, None] + k * step_months
+        eff_day = np.minimum(day[:, None], np.minimum.accumulate(days_in_month(months), axis=1))
+        d = (months.astype("datetime64[M]").astype("datetime64[D]").astype("datetime64[ns]").view(np.int64)
+             + (eff_day - 1) * DAY_NS + time_of_day[:, None])
+        prev = np.concatenate([last[sel][:, None], d[:, :-1]], axis=1)
+        add(sel, d, (prev < end_ns) & (d >= start_ns), amt_med[sel])
+
+    sel = np.flatnonzero((kinds == "semimonthly") & present)
+    if len(sel):
+        # two most common days of month per line (value_counts tie order, as in project_cadenced_events)
+        top = top_values(line_codes, pd.DatetimeIndex(dates).day.to_numpy(), n_lines, 2)[sel]
+        top[:, 1] = np.where(top[:, 1] < 0, np.minimum(28, top[:, 0] + 14), top[:, 1])
+        top.sort(axis=1)
+
+        months = pd.date_range(start=pd.Timestamp(proj_start).normalize(), end=pd.Timestamp(proj_end).normalize(), freq="MS")
+        m = months.to_numpy(dtype="datetime64[M]").astype(np.int64)
+        if len(m):
+            eff_day = np.minimum(top[:, None, :], days_in_month(m)[None, :, None])
+            d = (months.to_numpy(dtype="datetime64[ns]").view(np.int64)[None, :, None] + (eff_day - 1) * DAY_NS).reshape(len(sel), -1)
+            add(sel, d, (d >= start_ns) & (d < end_ns), amt_med[sel] / 2.0)
+
+    if ev_line:
+        ev_line, ev_ns, ev_amt = np.concatenate(ev_line), np.concatenate(ev_ns), np.concatenate(ev_amt)
+        wk = proj_week_starts.get_indexer(pd.DatetimeIndex(monday_ns(ev_ns).astype("datetime64[ns]")))
+        keep = wk >= 0
+        np.add.at(out, (ev_line[keep], wk[keep]), ev_amt[keep])
 
+    return out, has_events
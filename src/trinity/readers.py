@@ -0,0 +1,201 @@
+import importlib.util
+import time
+import numpy as np
+import pandas as pd
+
+# =========================
+# SHEET LAYOUTS (QuickBooks exports)
+# =========================
+
+COA_SKIPROWS = 3
+COA_COLUMNS = ["full_name","type","detail_type","description","total_balance"]
+COA_USECOLS = ["full_name","type","detail_type","total_balance"]
+
+GL_SKIPROWS = 4
+GL_COLUMNS = ["account_section","date","txn_type","num","name","memo","split_account","amount","balance"]
+
+# QuickBooks writes "Transaction date" as text in this format
+GL_DATE_FORMAT = "%m/%d/%Y"
+
+ENGINES = ["calamine", "openpyxl"]
+
+
+def available_engines():
+    """
+    Engines that can be used in this environment, fastest first.
+    calamine needs the optional python-calamine package.
+    """
+    engines = []
+    if importlib.util.find_spec("python_calamine") is not None:
+        engines.append("calamine")
+    engines.append("openpyxl")
+    return engines
+
+
+def default_engine():
+    return available_engines()[0]
+
+
+def _rewind(source):
+    # Streamlit uploads are file-like objects that may already have been read
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _read_calamine(source, skiprows, names, usecols):
+    # Only the usecols columns are parsed; read_excel takes them (and their names) in sheet order
+    keep = sorted(names.index(c) for c in usecols)
+    df = pd.read_excel(source, engine="calamine", skiprows=skiprows, usecols=keep, names=[names[i] for i in keep])
+    return df if list(df.columns) == usecols else df[usecols]
+
+
+def _read_openpyxl(source, skiprows, names, usecols):
+    """
+    Stream the first sheet in read-only / values-only mode, so no cell objects are kept.
+    skiprows + 1 rows are dropped to mirror pd.read_excel(skiprows=..., names=...),
+    which consumes the export's own header row.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        n = len(names)
+        keep = [names.index(c) for c in usecols]
+        data = {c: [] for c in usecols}
+        for row in ws.iter_rows(min_row=skiprows + 2, values_only=True):
+            if len(row) < n:
+                row = tuple(row) + (None,) * (n - len(row))
+            for c, i in zip(usecols, keep):
+                # empty and blank text cells are NaN, as in pd.read_excel
+                v = row[i]
+                data[c].append(np.nan if v is None or v == "" else v)
+    finally:
+        wb.close()
+
+    df = pd.DataFrame(data, columns=usecols)
+    # pd.read_excel drops trailing blank rows; do the same
+    non_blank = df.notna().any(axis=1)
+    if non_blank.any():
+        df = df.loc[:non_blank[::-1].idxmax()]
+    else:
+        df = df.iloc[0:0]
+    return df.infer_objects()
+
+
+def read_sheet(source, skiprows, names, usecols=None, engine=None):
+    """
+    Read the first sheet of an Excel export into a frame with the given column names.
+    Only the columns in usecols are kept (all by default).
+    """
+    usecols = list(names) if usecols is None else list(usecols)
+    engine = engine or default_engine()
+    _rewind(source)
+    if engine == "calamine":
+        return _read_calamine(source, skiprows, names, usecols)
+    if engine == "openpyxl":
+        return _read_openpyxl(source, skiprows, names, usecols)
+    raise ValueError(f"Unknown Excel engine '{engine}'. Expected one of {ENGINES}")
+
+
+def nulls_to_nan(df):
+    # Arrow nulls come back as None in text columns; the Excel readers produce NaN
+    for col in df.columns[df.dtypes.eq(object)]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def iter_csv_chunks(source, skiprows, names, chunksize, numeric=("amount","balance")):
+    """
+    Read a CSV export with the same layout as the Excel one in blocks of chunksize rows.
+    Everything is read as text so every block gets the same dtypes; numeric columns
+    are converted afterwards (thousands separators removed).
+    """
+    _rewind(source)
+    reader = pd.read_csv(source, skiprows=skiprows, names=names, header=0, dtype=str,
+                         chunksize=chunksize, skip_blank_lines=False)
+    for df in reader:
+        for col in numeric:
+            df[col] = pd.to_numeric(df[col].str.replace(",", "", regex=False), errors="coerce")
+        yield df
+
+
+def iter_parquet_chunks(source, names, chunksize):
+    """
+    Read a Parquet GL (columns named as in names, no title rows) in record batches.
+    """
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    pf = pq.ParquetFile(source)
+    for batch in pf.iter_batches(batch_size=chunksize, columns=names):
+        yield nulls_to_nan(batch.to_pandas())
+
+
+def csv_line_count(source, block_size=1 << 20):
+    """
+    Number of lines of a CSV (an upper bound on its rows), counted over the raw bytes in blocks.
+    """
+    _rewind(source)
+    f = open(source, "rb") if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__") else source
+    try:
+        lines, last = 0, None
+        while block := f.read(block_size):
+            lines += block.count(b"\n" if isinstance(block, bytes) else "\n")
+            last = block
+        # a last line without a newline
+        return lines + (last is not None and last[-1:] not in (b"\n", "\n"))
+    finally:
+        if f is not source:
+            f.close()
+        _rewind(source)
+
+
+def parquet_row_count(source):
+    """
+    Rows of a Parquet file, from its metadata.
+    """
+    import pyarrow.parquet as pq
+
+    _rewind(source)
+    count = pq.ParquetFile(source).metadata.num_rows
+    _rewind(source)
+    return count
+
+
+def parse_dates(series, fmt=GL_DATE_FORMAT):
+    """
+    Parse dates with a fixed format. Values that do not match (real Excel dates,
+    other layouts) fall back to the general parser; anything unparseable becomes NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    parsed = pd.to_datetime(series, format=fmt, errors="coerce")
+    missed = parsed.isna() & series.notna()
+    if missed.any():
+        parsed[missed] = pd.to_datetime(series[missed], errors="coerce", format="mixed")
+    return parsed
+
+
+# =========================
+# READER BENCHMARK
+# =========================
+
+def benchmark_readers(source, skiprows=GL_SKIPROWS, names=GL_COLUMNS, usecols=None, engines=None):
+    """
+    Time each available engine on the same file.
+    returns one row per engine with rows, seconds and rows/sec
+    """
+    results = []
+    for engine in engines or available_engines():
+        t0 = time.perf_counter()
+        df = read_sheet(source, skiprows, names, usecols=usecols, engine=engine)
+        elapsed = time.perf_counter() - t0
+        results.append({
+            "engine": engine,
+            "rows": len(df),
+            "seconds": elapsed,
+            "rows_per_sec": len(df) / elapsed if elapsed > 0 else float("inf"),
+        })
+        print(f"{engine}: {len(df)} rows in {elapsed:.3f}s ({results[-1]['rows_per_sec']:,.0f} rows/sec)")
+    return pd.DataFrame(results)
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# WHAT-IF SCENARIOS (scenarios x lines x weeks)
+# =========================
+
+# A scenario is a list of rules applied to the projected weeks of combined_full:
+#   {"op": "scale", "match": {...}, "factor": 0.7}     multiply matched lines
+#   {"op": "shift", "match": {...}, "weeks": 2}         move matched lines later (negative: earlier)
+#   {"op": "set",   "match": {...}, "value": 0.0}       override matched lines
+# "match" maps idx_names fields to a value or list of values (all must match; empty matches every line).
+# Optional "start"/"end" week starts limit scale and set rules to part of the horizon.
+# Per line, shifts are applied first (and add up), then scales (which multiply), then overrides.
+SCENARIO_OPS = {"scale", "shift", "set"}
+BASE_SCENARIO = "Base"
+
+
+def match_lines(index, match):
+    """
+    Boolean mask over the lines of index (MultiIndex over idx_names) for a rule's match dict.
+    """
+    mask = np.ones(len(index), dtype=bool)
+    for field, wanted in (match or {}).items():
+        wanted = [wanted] if isinstance(wanted, str) or not np.iterable(wanted) else list(wanted)
+        mask &= index.get_level_values(field).isin(wanted)
+    return mask
+
+
+def scenario_arrays(scenarios, index, proj_week_starts):
+    """
+    Compile the rules into per-scenario arrays: shift (scenarios x lines), factor and override
+    (scenarios x lines x proj weeks, NaN where not overridden).
+    """
+    proj_week_starts = pd.DatetimeIndex(proj_week_starts)
+    n_s, n_l, n_w = len(scenarios), len(index), len(proj_week_starts)
+    shift = np.zeros((n_s, n_l), dtype=np.int64)
+    factor = np.ones((n_s, n_l, n_w))
+    override = np.full((n_s, n_l, n_w), np.nan)
+
+    for s, rules in enumerate(scenarios.values()):
+        for rule in rules:
+            op = rule.get("op")
+            if op not in SCENARIO_OPS:
+                raise ValueError(f"Unknown scenario op '{op}', expected one of {sorted(SCENARIO_OPS)}")
+            lines = match_lines(index, rule.get("match"))
+            weeks = np.ones(n_w, dtype=bool)
+            if "start" in rule:
+                weeks &= proj_week_starts >= pd.Timestamp(rule["start"])
+            if "end" in rule:
+                weeks &= proj_week_starts <= pd.Timestamp(rule["end"])
+            cells = lines[:, None] & weeks[None, :]
+
+            if op == "shift":
+                shift[s, lines] += int(rule["weeks"])
+            elif op == "scale":
+                factor[s][cells] *= float(rule["factor"])
+            else:
+                override[s][cells] = float(rule["value"])
+
+    return shift, factor, override
+
+
+def apply_scenarios(combined_full, scenarios, proj_week_starts):
+    """
+    combined_full: finished bank lines x all weeks (get_combined_bank).
+    scenarios: dict name -> list of rules; the base case is added first as BASE_SCENARIO.
+    returns (scenario names, array scenarios x lines x all weeks). Actual weeks are never changed;
+    shifted amounts that leave the horizon drop out and vacated weeks become zero.
+    """
+    scenarios = {BASE_SCENARIO: [], **scenarios}
+    values = combined_full.to_numpy(dtype=float)
+    proj_cols = combined_full.columns.get_indexer(pd.DatetimeIndex(proj_week_starts))
+    proj = values[:, proj_cols]
+    n_w = len(proj_cols)
+
+    shift, factor, override = scenario_arrays(scenarios, combined_full.index, proj_week_starts)
+
+    # gather every (scenario, line, week) from its source week in one fancy-index
+    src = np.arange(n_w)[None, None, :] - shift[:, :, None]
+    inside = (src >= 0) & (src < n_w)
+    lines = np.arange(len(values))[None, :, None]
+    shifted = np.where(inside, proj[lines, np.clip(src, 0, n_w - 1)], 0.0)
+    out_proj = np.where(np.isnan(override), shifted * factor, override)
+
+    out = np.repeat(values[None, :, :], len(scenarios), axis=0)
+    out[:, :, proj_cols] = out_proj
+    return list(scenarios), out
+
+
+def scenario_totals(cube, combined_full, actual_week_starts, TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES):
+    """
+    Total inflows and outflows (scenarios x weeks) exactly as build_inflows_outflows would give for
+    each scenario. Lines are split into inflows/outflows and top-N by the trailing actual weeks,
+    which scenarios don't touch, so the split is shared; outflows are abs() per top line and
+    abs() of the collapsed "Other Outflows" row.
+    """
+    trailing_actual = combined_full[actual_week_starts]
+    trailing = trailing_actual.sum(axis=1).to_numpy()
+    inflow, outflow = trailing > 0, trailing < 0
+
+    out_rank = (-trailing_actual.clip(upper=0)).sum(axis=1).to_numpy()
+    # same ordering as sort_values(ascending=False).head(n): stable sort on the masked lines
+    out_lines = np.flatnonzero(outflow)
+    top_out = out_lines[pd.Series(out_rank[out_lines]).sort_values(ascending=False).index[:TOP_N_OUTFLOW_LINES]]
+    other_out = np.setdiff1d(out_lines, top_out)
+
+    total_inflows = cube[:, inflow, :].sum(axis=1)
+    total_outflows = np.abs(cube[:, top_out, :]).sum(axis=1)
+    if len(other_out):
+        total_outflows = total_outflows + np.abs(cube[:, other_out, :].sum(axis=1))
+    return total_inflows, total_outflows
+
+
+def scenario_balances(total_inflows, total_outflows, beginning_cash_balance):
+    """
+    get_cash_balance for every scenario at once. returns (beginning, ending) arrays (scenarios x weeks)
+    """
+    end_bal = beginning_cash_balance + np.cumsum(total_inflows - total_outflows, axis=1)
+    beg_bal = np.concatenate([np.full((len(end_bal), 1), beginning_cash_balance), end_bal[:, :-1]], axis=1)
+    return beg_bal, end_bal
+
+
+def run_scenarios(combined_full, scenarios, beginning_cash_balance, actual_week_starts, proj_week_starts,
+                  all_week_starts, TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES):
+    """
+    Apply all scenarios and build the side-by-side comparison: one row per (scenario, measure),
+    one column per week (same labels as the Projections sheet).
+    """
+    names, cube = apply_scenarios(combined_full[all_week_starts], scenarios, proj_week_starts)
+    total_inflows, total_outflows = scenario_totals(cube, combined_full[all_week_starts], actual_week_starts,
+                                                    TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES)
+    beg_bal, end_bal = scenario_balances(total_inflows, total_outflows, beginning_cash_balance)
+
+    measures = {
+        "Beginning Bank Balance": beg_bal,
+        "Total Cash Inflows": total_inflows,
+        "Total Cash Outflows": total_outflows,
+        "Ending Bank Balance": end_bal,
+        "Change vs Base": end_bal - end_bal[:1],
+    }
+    stacked = np.stack(list(measures.values()), axis=1).reshape(len(names) * len(measures), -1)
+    index = pd.MultiIndex.from_product([names, list(measures)], names=["Scenario", "Measure"])
+    columns = [w.strftime("%Y-%m-%d") for w in all_week_starts]
+    return pd.DataFrame(stacked, index=index, columns=columns)
@@ -1,71 +1,59 @@
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill
-
-def style_projections(OUTPUT_XLSX, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
-
-    wb = load_workbook(OUTPUT_XLSX)
-
-    # Define styles
-    sheet_name = "Projections (Table)"
-
-    if sheet_name not in wb.sheetnames:
-        raise ValueError(f"Sheet '{sheet_name}' not found")
-
-    ws = wb[sheet_name]
-    # Styles
-    font_style = Font(name="Aptos Narrow", size=12)
-    header_fill = PatternFill(
-        start_color="A3A5D0",
-        end_color="A3A5D0",
-        fill_type="solid"
-    )
-
-    accounting_format = '_(* #,##0.00_);_(* (#,##0.00);_(* "-"??_);_(@_)'
-
-    # Apply styles
-    for row in ws.iter_rows():
-        for cell in row:
-            # Font for everything
-            cell.font = font_style
-
-            # Accounting format only for numbers
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = accounting_format
-
-    # Header fill
-    for cell in ws[1]:
-        cell.fill = header_fill
-
-    # Category fill
-    category_fill = PatternFill(
-        start_color="BFBFBF",
-        end_color="BFBFBF",
-        fill_type="solid"
-    )
-
+# =========================
+# PROJECTIONS (TABLE) STYLES
+# =========================
+
+PROJECTION_FONT = {"name": "Aptos Narrow", "size": 12}
+HEADER_COLOR = "A3A5D0"
+CATEGORY_COLOR = "BFBFBF"
+ACCOUNTING_FORMAT = '_(* #,##0.00_);_(* (#,##0.00);_(* "-"??_);_(@_)'
+# Fill of each row kind; the header also keeps pd.ExcelWriter's header borders and alignment
+ROW_KIND_COLORS = {"body": None, "category": CATEGORY_COLOR, "balance": HEADER_COLOR, "header": HEADER_COLOR}
+
+
+def projection_styles():
+    """
+    Named styles of the Projections (Table) sheet. returns {(row kind, amount cell): NamedStyle}
+    """
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    styles = {}
+    for kind, color in ROW_KIND_COLORS.items():
+        for amount in (False, True):
+            style = NamedStyle(name=f"Projections {kind.title()}" + (" Amount" if amount else ""), font=Font(**PROJECTION_FONT))
+            if color:
+                style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+            if amount:
+                style.number_format = ACCOUNTING_FORMAT
+            if kind == "header":
+                thin = Side(style="thin")
+                style.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+                style.alignment = Alignment(horizontal="center", vertical="top")
+            styles[kind, amount] = style
+    return styles
+
+
+def register_projection_styles(wb):
+    """
+    Add the Projections (Table) named styles to wb (once). returns {(row kind, amount cell): NamedStyle}
+    """
+    styles = projection_styles()
+    registered = set(wb.named_styles)
+    for style in styles.values():
+        if style.name not in registered:
+            wb.add_named_style(style)
+    return styles
+
+
+def projection_row_kinds(inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    """
+    Row kind and first styled column of the special rows of the Projections (Table) sheet; every
+    other row is body. returns {sheet row: (row kind, first styled column)}
+    """
+    row_kinds = {1: ("header", 0)}
     for section_indexes in [inflow_section_indexes, outflow_section_indexes]:
-        
-        for i in range(len(section_indexes)):
-            idx = section_indexes[i]
-            row = ws[idx]
-
+        for i, idx in enumerate(section_indexes):
             # Total inflows and outflows are one column to the left of the categories
-            if i == len(section_indexes)-1:
-                start = 0
-            else:
-                start = 1
-            for i in range(start, len(row)):
-                row[i].fill = category_fill
-
-    # Apply color to bag end cash
-    beg_cash_row_idx = cash_balance_indexes[0]
-    end_cash_row_idx = cash_balance_indexes[1]
-    beg_row = ws[beg_cash_row_idx]
-    end_row = ws[end_cash_row_idx]
-
-    for col in range(ws.max_column):
-        beg_row[col].fill = header_fill
-        end_row[col].fill = header_fill
-
-
-    wb.save(OUTPUT_XLSX)
\ No newline at end of file
+            row_kinds[idx] = ("category", 0 if i == len(section_indexes) - 1 else 1)
+    for idx in cash_balance_indexes[:2]:
+        row_kinds[idx] = ("balance", 0)
+    return row_kinds
@@ -0,0 +1,20 @@
+import pytest
+from src.trinity.preprocessing import load_and_clean_coa, load_and_clean_gl
+
+# =========================
+# GRACE GLOBAL SAMPLE BOOKS
+# =========================
+
+COA_PATH = "tests/Grace Global Logistics Inc_Account List.xlsx"
+GL_PATH = "tests/Grace Global Logistics Inc_Transaction Detail by Account.xlsx"
+
+
+@pytest.fixture(scope="module")
+def grace():
+    """
+    The cleaned Grace Global COA and GL, loaded once per test module (copy before modifying).
+    returns gl, coa, bank_accounts, cc_accounts
+    """
+    coa, bank_accounts, cc_accounts = load_and_clean_coa(COA_PATH)
+    gl = load_and_clean_gl(GL_PATH, coa)
+    return gl, coa, bank_accounts, cc_accounts
@@ -0,0 +1,625 @@
+import pandas as pd
+import numpy as np
+from src.trinity.postprocessing import template_rows, output_frames, projections_table
+from src.trinity.calendar_table import calendar_for
+from src.trinity.preprocessing import monday_week_start
+from src.trinity.projections import week_of_month_array, week_of_year_array, weekly_sums
+from src.trinity.credit_card import SCHEDULE_COLUMNS
+
+# =========================
+# REFERENCE IMPLEMENTATIONS
+# =========================
+# The straightforward versions the optimized pipeline code replaced. Tests check the
+# pipeline against them and the benchmarks time them; nothing in src/ uses them.
+
+
+# -----------------------------------------
+# Bank lines projected one line at a time
+# -----------------------------------------
+
+def clamp(v, lo, hi):
+    return max(lo, min(hi, v))
+
+
+def build_weekly_series(transactions_df, week_index):
+    """
+    transactions_df has columns: date, amount
+    returns weekly sum series indexed by week_index (Mon starts)
+    """
+    wk = monday_week_start(transactions_df["date"])
+    sums = weekly_sums(np.zeros(len(wk), dtype=np.int64), wk, transactions_df["amount"], 1, week_index)
+    return pd.Series(sums[0], index=week_index, name="amount")
+
+
+def is_weekly_flow(series_hist):
+    """
+    Decide whether a line behaves like a weekly-flow series.
+    If it has non-zero activity in >= 60% of weeks, treat as weekly-flow.
+    """
+    nz_rate = (series_hist != 0).mean() if len(series_hist) else 0.0
+    return nz_rate >= 0.60
+
+
+def project_weekly_pattern(series_hist, proj_weeks):
+    """
+    Project a weekly-flow line:
+    - Use week-of-month seasonality (avg by week_in_month: 1..5)
+    - Add mild trend based on last 12 weeks slope, clamped
+    """
+    hist_weeks = series_hist.index
+    hist_vals = series_hist.values.astype(float)
+
+    # Seasonality by week-of-month
+    wom = week_of_month_array(hist_weeks)
+    df = pd.DataFrame({"wom": wom, "y": hist_vals})
+    wom_means = df.groupby("wom")["y"].mean()
+
+    # Baseline from seasonality (fallback to overall mean)
+    overall_mean = float(df["y"].mean())
+
+    # Trend from last 12 weeks (simple linear regression)
+    tail_n = min(12, len(hist_vals))
+    if tail_n >= 6:
+        y = hist_vals[-tail_n:]
+        x = np.arange(tail_n)
+        # slope via least squares
+        slope = float(np.polyfit(x, y, 1)[0])
+    else:
+        slope = 0.0
+
+    # Clamp trend so we don't explode
+    # Convert weekly slope into a per-week multiplier relative to mean magnitude
+    denom = max(1.0, np.nanmean(np.abs(hist_vals[-tail_n:])) if tail_n else 1.0)
+    slope_ratio = slope / denom
+    slope_ratio = clamp(slope_ratio, -0.15, 0.15)  # cap to +/-15% per week equivalent
+    # Apply cumulative trend
+    proj = []
+    for i, wom_i in enumerate(week_of_month_array(proj_weeks), start=1):
+        base = float(wom_means.get(wom_i, overall_mean))
+        proj_val = base * (1.0 + slope_ratio * i)
+        proj.append(proj_val)
+
+    return pd.Series(proj, index=proj_weeks, dtype=float)
+
+
+def classify_cadence(date_series: pd.Series, cadence_start, cadence_end) -> str:
+
+    # We need to add the cadence end and start dates to the ds variable
+    # This way the take into account the whole year and not get isolated events passed as weekly, monthy, etc
+    date_series = pd.concat([pd.Series(cadence_start), date_series, pd.Series(cadence_end)])
+    ds = pd.to_datetime(date_series).dropna().sort_values().unique()
+    if len(ds) < 3: return "irregular"
+    diffs = np.diff(ds).astype("timedelta64[D]").astype(int)
+    diffs = diffs[diffs > 0]
+    std = np.std(diffs)
+    if len(diffs) < 2: return "irregular"
+    med = float(np.median(diffs))
+    if 12 <= med <= 17 and std/14 <0.2:
+        months = pd.to_datetime(ds).to_period("M")
+        counts = pd.Series(months).value_counts()
+        if (counts >= 2).mean() >= 0.55: return "semimonthly"
+        return "biweekly"
+    if 24 <= med <= 37 and std/30 <0.2: return "monthly"
+    if 70 <= med <= 110 and std/90 <0.2: return "quarterly"
+    if 320 <= med <= 420 and std/365 <0.2: return "annual"
+    return "irregular"
+
+
+def project_cadenced_events(dates, amounts, proj_start, proj_end, cadence_start, cadence_end, kind=None):
+    """
+    Schedule future events based on cadence kind; return list of (date, amount_signed)
+    Amount uses median of past event amounts (signed).
+    kind can be passed in when already known (classify_cadence_grouped); otherwise it is inferred.
+    """
+    dates = pd.to_datetime(dates).dropna().sort_values()
+    amounts = pd.Series(amounts).astype(float)
+
+    if len(dates) == 0:
+        return []
+
+    if kind is None:
+        kind = classify_cadence(dates, cadence_start, cadence_end)
+    amt_med = float(pd.Series(amounts).replace(0, np.nan).dropna().median()) if (pd.Series(amounts) != 0).any() else 0.0
+    last_date = pd.Timestamp(dates.max())
+
+    future = []
+
+    if kind == "weekly":
+        step = pd.Timedelta(days=7)
+        d = last_date
+        while d < proj_end:
+            d = d + step
+            if d >= proj_start:
+                future.append((d, amt_med))
+
+    elif kind == "biweekly":
+        step = pd.Timedelta(days=14)
+        d = last_date
+        while d < proj_end:
+            d = d + step
+            if d >= proj_start:
+                future.append((d, amt_med))
+
+    elif kind == "monthly":
+        d = last_date
+        while d < proj_end:
+            d = d + pd.DateOffset(months=1)
+            if d >= proj_start:
+                future.append((d, amt_med))
+
+    elif kind == "quarterly":
+        d = last_date
+        while d < proj_end:
+            d = d + pd.DateOffset(months=3)
+            if d >= proj_start:
+                future.append((d, amt_med))
+
+    elif kind == "annual":
+        d = last_date
+        while d < proj_end:
+            d = d + pd.DateOffset(years=1)
+            if d >= proj_start:
+                future.append((d, amt_med))
+
+    elif kind == "semimonthly":
+        # Choose two most common days of month from history
+        dti = pd.DatetimeIndex(pd.to_datetime(dates))
+        dom = dti.day
+        top_days = pd.Series(dom).value_counts().head(2).index.tolist()
+        if len(top_days) == 1:
+            top_days = [top_days[0], min(28, top_days[0] + 14)]
+        top_days = sorted(top_days)
+
+        months = pd.date_range(start=proj_start.normalize(), end=proj_end.normalize(), freq="MS")
+        for m in months:
+            for day in top_days:
+                d = m + pd.Timedelta(days=day - 1)
+                # clamp to month end
+                if d.month != m.month:
+                    d = m + pd.offsets.MonthEnd(0)
+                if proj_start <= d < proj_end:
+                    future.append((d, amt_med / 2.0))
+
+    else:
+        # irregular: no scheduled events; return empty (will be handled by weekly TS method if needed)
+        return []
+
+    return future
+
+
+def allocate_to_weeks(dates, amounts, week_starts):
+    s = pd.Series(amounts, index=pd.to_datetime(dates))
+    wk = monday_week_start(s.index.to_series())
+    out = s.groupby(wk).sum()
+    return out.reindex(week_starts, fill_value=0.0)
+
+
+def replicate_last_year_transactions(s_hist, proj_week_starts):
+    week_of_year_transaction_map = {}
+    for w, woy in zip(s_hist.index, week_of_year_array(s_hist.index)):
+        week_of_year_transaction_map[woy] = s_hist[w]
+    projection_list = []
+    for woy in week_of_year_array(proj_week_starts):
+        corresponding_last_year_transaction = week_of_year_transaction_map.get(woy)
+        projection_list.append(corresponding_last_year_transaction)
+    proj_series = pd.Series(projection_list, index=proj_week_starts)
+    return proj_series
+
+
+def project_line(df_line, hist_week_starts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end):
+    """
+    Project one bank line from its own transactions (date, amount), one line at a time.
+    project_bank_lines does the same for all lines at once.
+    returns (method, projected weekly series)
+    """
+    df_line = df_line.sort_values("date")
+    s_hist = build_weekly_series(df_line[["date","amount"]], hist_week_starts)
+
+    # If series exists and more than half values are non zero, return true, else return false
+    if is_weekly_flow(s_hist):
+        # Get projections based on linear slopes for eahc week of the month
+        # These projections therefore get weekly cyclical trends and linear long term trends
+        return "weekly", project_weekly_pattern(s_hist, proj_week_starts)
+
+    future_events = project_cadenced_events(df_line["date"], df_line["amount"], PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+    if future_events:
+        dts, amts = zip(*future_events)
+        return "cadenced", allocate_to_weeks(dts, amts, proj_week_starts)
+
+    tail = s_hist.iloc[-26:] if len(s_hist) else s_hist
+    wom = pd.Series(week_of_month_array(tail.index), index=tail.index)
+    wom_median = tail.groupby(wom).median()
+    found = False
+    for amnt in wom_median:
+        if amnt != 0.0:
+            found = True
+            break
+
+    if found:
+        overall = float(tail.median()) if len(tail) else 0.0
+        return "wom_median", pd.Series(
+            [float(wom_median.get(k, overall)) for k in week_of_month_array(proj_week_starts)],
+            index=proj_week_starts
+        )
+    # If all medians are zero we replicate last year tendencies
+    return "last_year", replicate_last_year_transactions(s_hist, proj_week_starts)
+
+
+# -----------------------------------------
+# CC payments allocated one payment and one category at a time
+# -----------------------------------------
+
+def spend_mix_for_window(window_week_starts, cc_spend_cat_pivot_top, cc_spend_proj_cat):
+    """
+    rolling mix over a set of week_starts: use actual if available, else projected.
+    returns shares by category over that window
+    """
+    mix_vals = []
+    for cat in cc_spend_cat_pivot_top.index:
+        # actual + projected per category weekly
+        s_cat = pd.concat([cc_spend_cat_pivot_top.loc[cat], cc_spend_proj_cat.loc[cat]])
+        mix_vals.append(s_cat.reindex(window_week_starts, fill_value=0.0).abs().sum())
+    mix = pd.Series(mix_vals, index=cc_spend_cat_pivot_top.index)
+    if mix.sum() == 0:
+        return pd.Series({"Uncategorized": 1.0})
+    return mix / mix.sum()
+
+
+def allocate_payments_by_event(cc_spend_proj_cat, cc_spend_cat_pivot_top, payment_event_dates, CC_MIX_ROLLING_WEEKS, proj_week_starts, idx_names, ccpay_kind, dom_mode):
+    """
+    allocate_payments one payment and one category at a time.
+    """
+    # Compute monthly "statement" amount from projected CC spend:
+    # For each payment date, pay the prior month's total projected CC spend magnitude.
+    # We compute CC spend totals from cc_spend_proj_cat (weekly) and/or last actual weeks for the first payment.
+    cc_spend_week_all = cc_spend_cat_pivot_top.sum(axis=0)  # historical weekly total across cats
+    cc_spend_proj_week_all = cc_spend_proj_cat.sum(axis=0)  # projected weekly total across cats
+
+    # Helper: get CC spend by week (actual+proj)
+    cc_spend_total_week = pd.concat([cc_spend_week_all, cc_spend_proj_week_all]).groupby(level=0).sum()
+
+    # Build a projected cash-outflow table for CC payments by category (signed negative)
+    cc_payment_alloc = pd.DataFrame(0.0,
+                                index=pd.MultiIndex.from_tuples([], names=idx_names),
+                                columns=proj_week_starts)
+
+    # Prebuild combined per-category weekly spend (actual+proj) for window lookups
+    cc_cat_week_combined = {}
+    for cat in cc_spend_cat_pivot_top.index:
+        cc_cat_week_combined[cat] = pd.concat([cc_spend_cat_pivot_top.loc[cat], cc_spend_proj_cat.loc[cat]]).groupby(level=0).sum()
+
+    # Also store CC payment schedule
+    cc_payment_schedule_rows = []
+
+    # Calendar lookups for every payment date at once: prior month bounds and their week starts,
+    # the week before the payment (end of the mix window) and the payment week
+    pay_dates = pd.DatetimeIndex(payment_event_dates)
+    cal = calendar_for(pay_dates.append(pay_dates - pd.Timedelta(days=62)))
+    prior_month_ends = cal.month_start(pay_dates) - np.timedelta64(1, "D")
+    prior_month_starts = cal.month_start(prior_month_ends)
+    prior_start_weeks = cal.week_start(prior_month_starts)
+    prior_end_weeks = cal.week_start(prior_month_ends)
+    mix_end_weeks = cal.week_start(pay_dates - pd.Timedelta(days=1))
+    pay_weeks = cal.week_start(pay_dates)
+
+    for i, pay_date in enumerate(pay_dates):
+        # Determine "prior month" window relative to payment date
+        prior_month_end = pd.Timestamp(prior_month_ends[i])
+        prior_month_start = pd.Timestamp(prior_month_starts[i])
+
+        # weeks in prior month (Mon week starts that intersect that month)
+        weeks_in_prior_month = pd.date_range(start=prior_start_weeks[i], end=prior_end_weeks[i], freq="W-MON")
+
+        # Statement amount = sum of weekly CC spend totals in prior month (absolute)
+        stmt_amt = cc_spend_total_week.reindex(weeks_in_prior_month, fill_value=0.0).abs().sum()
+
+        # If statement amount is tiny/zero, skip
+        if float(stmt_amt) == 0.0:
+            continue
+
+        # Allocate across categories based on rolling mix window ending before payment date
+        mix_end_week = pd.Timestamp(mix_end_weeks[i])
+        mix_window_weeks = pd.date_range(end=mix_end_week, periods=CC_MIX_ROLLING_WEEKS, freq="W-MON")
+        shares = spend_mix_for_window(mix_window_weeks, cc_spend_cat_pivot_top, cc_spend_proj_cat)
+
+        # allocate into the payment's week bucket
+        pay_week = pd.Timestamp(pay_weeks[i])
+        if pay_week not in proj_week_starts:
+            continue
+
+        # Add rows for each category
+        for cat, share in shares.items():
+            line = (f"CC Payment - {cat}", "Credit Card Payment", "")
+            if line not in cc_payment_alloc.index:
+                cc_payment_alloc.loc[line, :] = 0.0
+            cc_payment_alloc.loc[line, pay_week] += -float(stmt_amt * share)  # signed cash outflow
+
+        cc_payment_schedule_rows.append({
+            "payment_date": pay_date,
+            "payment_week_start": pay_week,
+            "estimated_payment_total": float(stmt_amt),
+            "allocation_window_weeks": f"{mix_window_weeks.min().date()} to {mix_window_weeks.max().date()}",
+            "prior_month": f"{prior_month_start.date()} to {prior_month_end.date()}",
+            "cadence_inferred": ccpay_kind,
+            "typical_dom": dom_mode,
+        })
+
+    cc_payment_schedule = pd.DataFrame(cc_payment_schedule_rows).sort_values("payment_date") if len(cc_payment_schedule_rows) else pd.DataFrame(
+        columns=SCHEDULE_COLUMNS
+    )
+
+    return cc_payment_schedule, cc_payment_alloc
+
+
+# -----------------------------------------
+# Projections (Table) filled one cell at a time
+# -----------------------------------------
+
+def projections_table_by_row(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, beg_bal_series, end_bal_series):
+    """
+    Fill the template one line and one week cell at a time.
+    projections_table does the same in one block assignment.
+    """
+    rows, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes = template_rows(inflows_by_cat, outflows_by_cat)
+
+    proj_sheet = pd.DataFrame(rows, columns=["Section","Notes","Line Item"])
+    for w in all_week_starts:
+        proj_sheet[w.strftime("%Y-%m-%d")] = np.nan
+
+    def put_row_value(section, acct, values):
+        mask = (proj_sheet["Section"].eq(section)) & (proj_sheet["Line Item"].eq(acct))
+        idx = proj_sheet.index[mask]
+        if len(idx):
+            i = idx[0]
+            for w in all_week_starts:
+                proj_sheet.loc[i, w.strftime("%Y-%m-%d")] = float(values[w])
+
+    put_row_value("Beginning Bank Balance","", beg_bal_series)
+    put_row_value("Ending Bank Balance","", end_bal_series)
+    put_row_value("Total Cash Inflows","", total_inflows)
+    put_row_value("Total Cash Outflows","", total_outflows)
+
+    for (acct, typ, det), row in inflows_present.iterrows():
+        put_row_value("", acct, row)
+
+    for (acct, typ, det), row in outflows_present.iterrows():
+        put_row_value("", acct, row)
+
+    return proj_sheet, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes
+
+
+# -----------------------------------------
+# Projections (Table) styled one attribute of one cell at a time
+# -----------------------------------------
+
+def style_projections_sheet_by_cell(ws, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    """
+    Fonts, number formats and fills of the Projections (Table) worksheet, in place, set one
+    attribute of one cell at a time. write_projections_sheet gives each cell a named style instead.
+    """
+    from openpyxl.styles import Font, PatternFill
+
+    # Styles
+    font_style = Font(name="Aptos Narrow", size=12)
+    header_fill = PatternFill(
+        start_color="A3A5D0",
+        end_color="A3A5D0",
+        fill_type="solid"
+    )
+
+    accounting_format = '_(* #,##0.00_);_(* (#,##0.00);_(* "-"??_);_(@_)'
+
+    # Apply styles
+    for row in ws.iter_rows():
+        for cell in row:
+            # Font for everything
+            cell.font = font_style
+
+            # Accounting format only for numbers
+            if isinstance(cell.value, (int, float)):
+                cell.number_format = accounting_format
+
+    # Header fill
+    for cell in ws[1]:
+        cell.fill = header_fill
+
+    # Category fill
+    category_fill = PatternFill(
+        start_color="BFBFBF",
+        end_color="BFBFBF",
+        fill_type="solid"
+    )
+
+    for section_indexes in [inflow_section_indexes, outflow_section_indexes]:
+        
+        for i in range(len(section_indexes)):
+            idx = section_indexes[i]
+            row = ws[idx]
+
+            # Total inflows and outflows are one column to the left of the categories
+            if i == len(section_indexes)-1:
+                start = 0
+            else:
+                start = 1
+            for i in range(start, len(row)):
+                row[i].fill = category_fill
+
+    # Apply color to bag end cash
+    beg_cash_row_idx = cash_balance_indexes[0]
+    end_cash_row_idx = cash_balance_indexes[1]
+    beg_row = ws[beg_cash_row_idx]
+    end_row = ws[end_cash_row_idx]
+
+    for col in range(ws.max_column):
+        beg_row[col].fill = header_fill
+        end_row[col].fill = header_fill
+
+
+# -----------------------------------------
+# Three-pass workbook: write the file, reload it for the formulas, reload it again for the styles
+# (build_output_workbook does all of it in one in-memory pass)
+# -----------------------------------------
+
+def write_sheets(writer, all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series, scenario_comparison=None, cash_bands=None):
+    """
+    Write every output sheet (values only) with the open pd.ExcelWriter.
+    returns (inflow_section_indexes, outflow_section_indexes, cash_balance_indexes) of the Projections (Table) sheet
+    """
+    frames = output_frames(all_week_starts, inflows_present, outflows_present, total_inflows, total_outflows,
+                           cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn,
+                           cc_payment_schedule, beg_bal_series, end_bal_series)
+    for sheet_name, frame in frames.items():
+        frame.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    # Template-style table
+    proj_sheet, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes = projections_table(
+        all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows,
+        total_outflows, beg_bal_series, end_bal_series)
+
+    proj_sheet.to_excel(writer, sheet_name="Projections (Table)", index=False)
+
+    # What-if comparison (run_scenarios), only when scenarios were requested
+    if scenario_comparison is not None:
+        scenario_comparison.reset_index().to_excel(writer, sheet_name="Scenarios", index=False)
+
+    # Monte Carlo balance bands (simulate_cash_bands), only in probabilistic mode
+    if cash_bands is not None:
+        bands, p_breach = cash_bands
+        bands.reset_index().to_excel(writer, sheet_name="Cash Bands", index=False)
+        pd.DataFrame({"Probability of breaching the cash floor in the horizon": [p_breach]}).to_excel(
+            writer, sheet_name="Cash Bands", index=False, startrow=len(bands) + 2)
+
+    return inflow_section_indexes, outflow_section_indexes, cash_balance_indexes
+
+
+def write_output_excel(all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present, total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display, cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series, OUTPUT_XLSX, scenario_comparison=None, cash_bands=None):
+    """
+    Values only; calculate_category_totals and style_projections then reload and save the file.
+    returns the Projections (Table) section indexes
+    """
+    with pd.ExcelWriter(OUTPUT_XLSX, engine="openpyxl") as writer:
+        indexes = write_sheets(writer, all_week_starts, inflows_by_cat, outflows_by_cat, inflows_present, outflows_present,
+                               total_inflows, total_outflows, cc_spend_proj_display, cc_spend_actual_display,
+                               cc_payment_alloc_present, cc_spend_txn, cc_payment_schedule, beg_bal_series, end_bal_series,
+                               scenario_comparison=scenario_comparison, cash_bands=cash_bands)
+
+    return indexes
+
+
+def add_category_formulas(ws, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    """
+    Replace the category, total and cash balance values of the Projections (Table) worksheet by
+    formulas, one cell at a time. category_formulas builds them all as one mapping.
+    """
+    from openpyxl.utils import get_column_letter
+
+    # -----------------------------------------
+    # Get the category totals
+    # -----------------------------------------
+
+    for section_indexes in [inflow_section_indexes, outflow_section_indexes]:
+
+        if section_indexes is inflow_section_indexes:
+            operation = 'SUM'
+        else:
+            operation = '-SUM'
+    
+        for i in range(len(section_indexes)):
+            idx = section_indexes[i]
+            if idx == section_indexes[-1]:
+                break
+            
+            next_idx = section_indexes[i+1]
+            
+            row = ws[idx]
+            for col in range(3, len(row)):
+                col_letter = get_column_letter(col+1)
+                if next_idx-2 >= idx+1:
+                    row[col].value = f'={operation}({col_letter}{idx+1}:{col_letter}{next_idx-2})'
+                else:
+                    row[col].value = 0.0
+
+
+    # -----------------------------------------
+    # Calculate total inflows and outflows
+    # -----------------------------------------
+
+    total_inflows_row_idx = inflow_section_indexes[-1]
+    total_outflows_row_idx = outflow_section_indexes[-1]
+    for col in range(3, ws.max_column):
+        col_letter = get_column_letter(col+1)
+        # Total Inflows
+        inflows_sum_String =  f'='
+        for i in range(len(inflow_section_indexes)-1):
+            inflows_sum_String += f'{col_letter}{inflow_section_indexes[i]}+'
+        inflows_sum_String = inflows_sum_String.rstrip('+')
+        row = ws[total_inflows_row_idx]
+        row[col].value = inflows_sum_String
+
+        # Total Outflows
+        outflows_sum_String =  f'='
+        for i in range(len(outflow_section_indexes)-1):
+            outflows_sum_String += f'{col_letter}{outflow_section_indexes[i]}+'
+        outflows_sum_String = outflows_sum_String.rstrip('+')
+        row = ws[total_outflows_row_idx]
+        row[col].value = outflows_sum_String
+
+
+    # ----------------------------------------------
+    # Calculate beginning and ending cash balances
+    # ----------------------------------------------
+
+    beg_cash_row_idx = cash_balance_indexes[0]
+    end_cash_row_idx = cash_balance_indexes[1]
+    beg_row = ws[beg_cash_row_idx]
+    end_row = ws[end_cash_row_idx]
+
+    # Logic is different for the values of the past than teh ones of the present:
+
+    # Cash balances for the past
+    for col in range(3, 7):
+        col_letter = get_column_letter(col+1)
+        next_col_letter = get_column_letter(col+2)
+        
+        # End balance is just the beg balanace from teh next column
+        end_row[col].value = f'={next_col_letter}{beg_cash_row_idx}'
+
+        # Beg balaance is end balaance - inflows - outflows (already negative)
+        beg_row[col].value = f'={col_letter}{end_cash_row_idx}-{col_letter}{total_outflows_row_idx}-{col_letter}{total_inflows_row_idx}'
+
+    for col in range(7, ws.max_column):
+        col_letter = get_column_letter(col+1)
+        prev_col_letter = get_column_letter(col)
+
+        # Beg balaance is end balaance from previous column except for the one of the present
+        if col == 7:
+            pass
+        else:
+            beg_row[col].value = f'={prev_col_letter}{end_cash_row_idx}'
+
+        # End balance is beg balance + inflows + outflows (already negative)
+        end_row[col].value = f'={col_letter}{beg_cash_row_idx}+{col_letter}{total_inflows_row_idx}+{col_letter}{total_outflows_row_idx}'
+
+
+def calculate_category_totals(OUTPUT_XLSX, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(OUTPUT_XLSX, data_only=True)
+    add_category_formulas(wb["Projections (Table)"], inflow_section_indexes, outflow_section_indexes, cash_balance_indexes)
+    wb.save(OUTPUT_XLSX)
+
+
+def style_projections(OUTPUT_XLSX, inflow_section_indexes, outflow_section_indexes, cash_balance_indexes):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(OUTPUT_XLSX)
+
+    # Define styles
+    sheet_name = "Projections (Table)"
+
+    if sheet_name not in wb.sheetnames:
+        raise ValueError(f"Sheet '{sheet_name}' not found")
+
+    style_projections_sheet_by_cell(wb[sheet_name], inflow_section_indexes, outflow_section_indexes, cash_balance_indexes)
+
+    wb.save(OUTPUT_XLSX)
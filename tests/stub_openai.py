@@ -0,0 +1,105 @@
+import ast
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =========================
+# LOCAL STAND-IN FOR THE OPENAI RESPONSES API
+# =========================
+
+FIELDS = {
+    "inflow": ["collected", "line_credit", "other"],
+    "outflow": ["expenses_accounts_payable", "credit_cards_loans", "owner_expenses"],
+}
+
+
+# ast.literal_eval from several handler threads at once can fail on CPython 3.11 ("AST constructor
+# recursion depth mismatch"), so prompts are parsed one at a time
+_parse_lock = threading.Lock()
+
+
+def fake_answer(prompt):
+    """
+    Classify the names listed in a classification prompt by keyword, in the structured format.
+    """
+    kind = "inflow" if "Inflows list:" in prompt else "outflow"
+    with _parse_lock:
+        names = ast.literal_eval(re.search(r"list:\s*(\[.*?\])\s*\n", prompt, re.S).group(1))
+    fields = FIELDS[kind]
+    out = {f: [] for f in fields}
+    for name in names:
+        lowered = name.lower()
+        if "credit" in lowered or "loc" in lowered.split():
+            out[fields[1]].append(name)
+        elif "owner" in lowered or "other" in lowered:
+            out[fields[2]].append(name)
+        else:
+            out[fields[0]].append(name)
+    return out
+
+
+def response_body(answer):
+    return {
+        "id": "resp_stub", "object": "response", "created_at": int(time.time()), "model": "gpt-4.1",
+        "status": "completed", "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+        "output": [{
+            "type": "message", "id": "msg_stub", "role": "assistant", "status": "completed",
+            "content": [{"type": "output_text", "text": json.dumps(answer), "annotations": []}],
+        }],
+    }
+
+
+class StubServer:
+    """
+    Threaded HTTP server answering POST /v1/responses after `latency` seconds plus `per_name`
+    seconds per listed name (generation time grows with the answer).
+    The first `fail_first` requests get a 500. Counts requests and the peak number in flight.
+    """
+
+    def __init__(self, latency=0.0, fail_first=0, per_name=0.0):
+        self.latency = latency
+        self.per_name = per_name
+        self.fail_first = fail_first
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    n = stub.requests
+                    stub.in_flight += 1
+                    stub.peak = max(stub.peak, stub.in_flight)
+                answer = fake_answer(body["input"])
+                time.sleep(stub.latency + stub.per_name * sum(map(len, answer.values())))
+                with stub.lock:
+                    stub.in_flight -= 1
+                status, payload = (500, {"error": {"message": "stub failure", "type": "server_error"}}) \
+                    if n <= stub.fail_first else (200, response_body(answer))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# SYNTHETIC OUTPUT DATA
+# =========================
+# Shared by the output tests and the workbook and styling benchmarks
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def synthetic_present(n_lines, weeks, seed=0):
+    """
+    Present lines (split_account, split_type, split_detail_type) x weeks of random amounts.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Account {i:03d}" for i in range(n_lines)]
+    # repeated names: several lines of one account, and an account on both sides
+    names[5] = names[4]
+    names[-1] = "Account 000"
+    index = pd.MultiIndex.from_tuples([(n, f"Type {i % 3}", "") for i, n in enumerate(names)], names=IDX_NAMES)
+    return pd.DataFrame(rng.normal(size=(n_lines, len(weeks))).round(2) * 1000, index=index, columns=weeks)
+
+
+def synthetic_output(weeks, n_in=12, n_out=40, n_txn=300, seed=0):
+    """
+    build_output_workbook arguments for synthetic inflow/outflow lines and credit card sheets.
+    """
+    rng = np.random.default_rng(seed)
+    inflows = synthetic_present(n_in, weeks, seed=seed + 1)
+    outflows = synthetic_present(n_out, weeks, seed=seed + 2).rename(index=lambda n: n.replace("Account", "Vendor"), level=0)
+    names_in = list(dict.fromkeys(inflows.index.get_level_values(0)))
+    names_out = list(dict.fromkeys(outflows.index.get_level_values(0)))
+    inflows_by_cat = {"AR Collected": names_in[::2], "Line of Credit Advances": [], "Other Income": names_in[1::2]}
+    outflows_by_cat = {"Expenses Accounts Payable": names_out[::2], "Credit Cards and Loans": names_out[1::2], "Owner's Expense": []}
+
+    total_inflows = inflows.sum()
+    total_outflows = outflows.sum()
+    beg = pd.Series(1e5 + np.cumsum(total_inflows + total_outflows).shift(fill_value=0.0).to_numpy(), index=weeks)
+    end = beg + total_inflows + total_outflows
+    cc_spend_txn = pd.DataFrame({
+        "date": pd.Timestamp(weeks[0]) + pd.to_timedelta(rng.integers(0, 7 * len(weeks), n_txn), unit="D"),
+        "account_name": rng.choice(["Card A", "Card B"], n_txn),
+        "category": rng.choice(["Fuel", "Meals", "Travel"], n_txn),
+        "amount": rng.gamma(2.0, 50.0, n_txn).round(2),
+    })
+    cc_weekly = cc_spend_txn.assign(week_start=cc_spend_txn["date"].dt.to_period("W-SUN").dt.start_time).pivot_table(
+        index="category", columns="week_start", values="amount", aggfunc="sum", fill_value=0.0)
+    cc_schedule = pd.DataFrame({"payment_date": weeks[-4:], "card": "Card A", "amount": [500.0, 250.0, 0.0, 125.5]})
+    return (weeks, inflows_by_cat, outflows_by_cat, inflows, outflows, total_inflows, total_outflows, cc_weekly, cc_weekly,
+            cc_weekly.iloc[:2], cc_spend_txn, cc_schedule, beg, end)
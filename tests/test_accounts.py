@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from src.trinity.accounts import AccountIndex, weekly_rollup
+
+
+def make_coa():
+    return pd.DataFrame({
+        "full_name": ["Utilities:Internet", "Auto Insurance", "Utilities", "Utilities:Electricity",
+                      "Legal & Professional Services:Consulting", "Auto"],
+        "type": ["Expenses"] * 6,
+        "detail_type": [""] * 6,
+    })
+
+
+def test_hierarchy_ranges():
+    accounts = AccountIndex.from_coa(make_coa())
+    util = accounts.id("Utilities")
+    kids = set(accounts.names[accounts.descendants(util)])
+    assert kids == {"Utilities:Internet", "Utilities:Electricity"}
+    assert accounts.parent[accounts.id("Utilities:Internet")] == util
+    assert len(accounts.descendants(accounts.id("Auto"))) == 0
+
+    # parent only implied by a child name
+    legal = accounts.id("Legal & Professional Services")
+    assert accounts.implicit[legal]
+    assert accounts.ids(["Legal & Professional Services"], include_implicit=False)[0] == -1
+    assert accounts.ids(["Nope"])[0] == -1
+
+
+def test_weekly_rollup_includes_children():
+    accounts = AccountIndex.from_coa(make_coa())
+    weeks = pd.date_range("2025-01-06", periods=2, freq="W-MON")
+    tx = pd.DataFrame({
+        "split_account": ["Utilities", "Utilities:Internet", "Utilities:Electricity", "Auto", "Unknown"],
+        "week_start": [weeks[0], weeks[0], weeks[1], weeks[1], weeks[0]],
+        "amount": [-10.0, -20.0, -5.0, -7.0, -100.0],
+    })
+    out = weekly_rollup(tx, accounts, weeks)
+    np.testing.assert_allclose(out.loc["Utilities"].values, [-30.0, -5.0])
+    np.testing.assert_allclose(out.loc["Utilities:Internet"].values, [-20.0, 0.0])
+    np.testing.assert_allclose(out.loc["Auto"].values, [0.0, -7.0])
+    assert out.to_numpy().min() > -100.0
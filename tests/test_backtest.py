@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from src.trinity.preprocessing import week_windows
+from src.trinity.cash import begin_cash, project_bank_lines
+from src.trinity.backtest import HistoryCube, cube_weeks, project_origin, rolling_origins, run_backtest
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def test_cube_slices_match_pipeline(grace):
+    gl, coa, bank_accounts, cc_accounts = grace
+    origins = pd.DatetimeIndex(["2025-05-05", "2025-09-01"])
+    cube = HistoryCube(gl, bank_accounts, cc_accounts, cube_weeks(origins))
+
+    for date_strt in origins:
+        (PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, _, hist_week_starts, cadence_start,
+         cadence_end, proj_end_date) = week_windows(date_strt)
+        bank_tx, _, _ = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+        hist = bank_tx[(bank_tx["date"] >= cadence_start) & (bank_tx["date"] <= cadence_end)]
+        hist = hist[~hist["split_account"].isin(cc_accounts)]
+        lines, expected, method = project_bank_lines(hist, IDX_NAMES, hist_week_starts, proj_week_starts,
+                                                     PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+
+        proj, cube_method, _ = project_origin(cube, date_strt)
+        rows = cube.lines.get_indexer(lines)
+        np.testing.assert_array_equal(proj[rows], np.nan_to_num(expected))
+        assert list(cube_method[rows]) == list(method)
+        # lines without history in the window project to zero
+        assert not proj[np.setdiff1d(np.arange(len(cube.lines)), rows)].any()
+
+
+def test_backtest_scores(grace):
+    gl, _, bank_accounts, cc_accounts = grace
+    origins = rolling_origins(gl, n_origins=6, step_weeks=2)
+    assert (origins.weekday == 0).all()
+    assert origins[-1] + pd.Timedelta(weeks=13) <= gl["date"].max() + pd.Timedelta(days=1)
+
+    origin_scores, line_scores = run_backtest(gl, bank_accounts, cc_accounts, origins)
+    assert list(origin_scores.index) == list(origins)
+    diff = origin_scores["projected_total"] - origin_scores["actual_total"]
+    np.testing.assert_allclose(origin_scores["ending_balance_error"], diff)
+    assert (line_scores["mae"] >= line_scores["bias"].abs()).all()
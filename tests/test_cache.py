@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.trinity.cache import FrameCache, load_inputs
+from tests.conftest import COA_PATH, GL_PATH
+
+
+def test_cached_inputs_match_fresh_load(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    coa, bank, cc, gl = load_inputs(COA_PATH, GL_PATH, cache=None)
+    first = load_inputs(COA_PATH, GL_PATH, cache=cache)
+    assert cache.misses == 2 and cache.hits == 0
+    coa_c, bank_c, cc_c, gl_c = load_inputs(COA_PATH, GL_PATH, cache=cache)
+    assert cache.hits == 2
+
+    assert bank_c == bank and cc_c == cc
+    assert_frame_equal(coa_c, coa)
+    assert_frame_equal(gl_c, gl)
+    assert_frame_equal(first[3], gl)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    _, _, _, gl = load_inputs(COA_PATH, GL_PATH, cache=None)
+    cache = FrameCache(str(tmp_path), max_bytes=10**12)
+    cache.put("a", "gl", gl)
+    cache.put("b", "gl", gl)
+    one = os.path.getsize(tmp_path / "a-gl.parquet")
+    os.utime(tmp_path / "a-gl.parquet", (0, 0))
+    os.utime(tmp_path / "b-gl.parquet", (1, 1))
+    cache.get("a", "gl")  # refreshes a, so b is now the oldest
+
+    cache.max_bytes = one + one // 2
+    cache.evict()
+    assert os.path.exists(tmp_path / "a-gl.parquet")
+    assert not os.path.exists(tmp_path / "b-gl.parquet")
+
+
+def test_engine_is_part_of_the_key(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    load_inputs(COA_PATH, GL_PATH, cache=cache, engine="calamine")
+    load_inputs(COA_PATH, GL_PATH, cache=cache, engine="openpyxl")
+    assert cache.misses == 4 and cache.hits == 0
+
+
+def test_mixed_columns_round_trip(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    # a QuickBooks "num" column mixing check numbers, references and dates
+    df = pd.DataFrame({"num": [1001, "EFT-7", float("nan"), 12.5, pd.Timestamp("2025-03-01")],
+                       "amount": [1.5, -2.0, 3.25, 0.0, 1.0]})
+    assert cache.put("k", "gl", df) is df
+    got = cache.get("k", "gl")
+    assert_frame_equal(got, df)
+    assert [type(v) for v in got["num"]] == [int, str, float, float, pd.Timestamp]
+
+
+def test_failed_write_is_only_a_warning(tmp_path):
+    cache = FrameCache(str(tmp_path / "cache"))
+    # the cache directory went away (or the disk is full, or Parquet can't hold a column)
+    os.rmdir(tmp_path / "cache")
+    df = pd.DataFrame({"amount": [1.5, -2.0]})
+    with pytest.warns(UserWarning, match="Could not cache gl"):
+        assert_frame_equal(cache.put("k", "gl", df), df)
+    assert cache.get("k", "gl") is None
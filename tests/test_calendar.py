@@ -0,0 +1,62 @@
+import threading
+import pandas as pd
+import pytest
+from src.trinity import calendar_table
+from src.trinity.calendar_table import Calendar, get_calendar
+from src.trinity.preprocessing import monday_week_start
+from src.trinity.projections import week_of_month, week_of_year
+
+
+def test_calendar_matches_scalar_helpers():
+    days = pd.date_range("2023-12-25", "2027-01-10", freq="D")
+    cal = Calendar(days[0], days[-1])
+
+    assert (cal.week_of_month(days) == [week_of_month(d) for d in days]).all()
+    assert (cal.week_of_year(days) == [week_of_year(d) for d in days]).all()
+    assert (cal.week_start(days) == (days - pd.to_timedelta(days.weekday, unit="D")).values).all()
+    assert (cal.month_start(days) == days.to_period("M").to_timestamp().values).all()
+    assert (cal.month_end(days) == (days + pd.offsets.MonthEnd(0)).values).all()
+    with pytest.raises(ValueError):
+        cal.week_start([pd.Timestamp("2030-01-01")])
+
+
+def test_fiscal_period():
+    cal = Calendar("2025-01-01", "2025-12-31", fiscal_start_month=7)
+    year, period = cal.fiscal_period(pd.DatetimeIndex(["2025-06-30", "2025-07-01", "2025-12-31"]))
+    assert list(year) == [2025, 2026, 2026] and list(period) == [12, 1, 6]
+    frame = cal.frame()
+    assert len(frame) == 365 and frame.loc["2025-07-01", "fiscal_period"] == 1
+
+
+def test_monday_week_start_keeps_time_and_nat():
+    d = pd.Series(pd.to_datetime(["2026-01-14 10:30", None, "2026-01-12 00:00"]), name="date")
+    out = monday_week_start(d)
+    assert out.name == "date"
+    assert out[0] == pd.Timestamp("2026-01-12 10:30") and pd.isna(out[1]) and out[2] == pd.Timestamp("2026-01-12")
+
+
+def test_shared_calendar_is_bounded(monkeypatch):
+    monkeypatch.setattr(calendar_table, "_calendar", None)
+    monkeypatch.setattr(calendar_table, "CALENDAR_MAX_DAYS", 5000)
+    first = get_calendar("2024-01-01", "2026-06-30")
+    # a nearby range extends the calendar, a far one starts over instead of growing it
+    assert get_calendar("2027-01-01", "2027-03-31").covers(first.first, "2027-03-31")
+    far = get_calendar("2060-01-01", "2060-03-31")
+    assert not far.covers(first.first, first.last) and len(far) < 5000
+
+
+def test_concurrent_lookups_get_a_covering_calendar(monkeypatch):
+    monkeypatch.setattr(calendar_table, "_calendar", None)
+    ranges = [(f"{y}-01-01", f"{y}-12-31") for y in range(1990, 2030, 2)]
+    got = [None] * len(ranges)
+
+    def lookup(i):
+        got[i] = get_calendar(*ranges[i])
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(len(ranges))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(cal.covers(start, end) for cal, (start, end) in zip(got, ranges))
+
@@ -0,0 +1,25 @@
+import pandas as pd
+from src.trinity.cash import bank_balances_asof, beginning_cash_balances
+
+
+def test_balances_for_many_dates_match_single_dates(grace):
+    gl, coa, bank_accounts, _ = grace
+    dates = pd.date_range("2025-01-05", "2026-01-11", freq="W-SUN")
+
+    many = bank_balances_asof(gl, coa, bank_accounts, dates)
+    assert list(many.columns) == sorted(bank_accounts)
+    for d in dates[::10]:
+        one = bank_balances_asof(gl, coa, bank_accounts, [d])
+        assert (one.iloc[0] == many.loc[d]).all()
+
+    totals = beginning_cash_balances(gl, coa, bank_accounts, dates)
+    assert len(totals) == len(dates)
+
+
+def test_balance_falls_back_to_coa(grace):
+    gl, coa, bank_accounts, _ = grace
+    before_gl = gl["date"].min() - pd.Timedelta(days=1)
+
+    balances = bank_balances_asof(gl, coa, bank_accounts, [before_gl]).iloc[0]
+    expected = coa.set_index("full_name")["total_balance"].reindex(balances.index).fillna(0.0)
+    assert (balances == expected).all()
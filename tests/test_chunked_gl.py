@@ -0,0 +1,61 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.trinity.readers import read_sheet, GL_SKIPROWS, GL_COLUMNS
+from src.trinity.preprocessing import load_and_clean_gl, iter_gl_chunks
+from tests.conftest import GL_PATH
+
+
+def test_csv_chunks_match_excel(grace, tmp_path):
+    expected, coa = grace[:2]
+
+    csv_path = tmp_path / "gl.csv"
+    pd.read_excel(GL_PATH, header=None).to_csv(csv_path, header=False, index=False)
+
+    # small blocks so account sections span block boundaries
+    chunks = list(iter_gl_chunks(str(csv_path), coa, chunksize=700))
+    assert len(chunks) > 5
+    assert max(len(c) for c in chunks) <= 700
+
+    gl = load_and_clean_gl(str(csv_path), coa, chunksize=700)
+    assert_frame_equal(gl, expected, check_dtype=False)
+
+
+def test_parquet_chunks_match_excel(grace, tmp_path):
+    expected, coa = grace[:2]
+
+    pq_path = tmp_path / "gl.parquet"
+    read_sheet(GL_PATH, GL_SKIPROWS, GL_COLUMNS).to_parquet(pq_path)
+
+    gl = load_and_clean_gl(str(pq_path), coa, chunksize=1000)
+    assert_frame_equal(gl, expected, check_dtype=False)
+
+
+def test_fill_columns_matches_concat():
+    import numpy as np
+    import tracemalloc
+    from src.trinity.preprocessing import fill_columns
+
+    def chunks(n_chunks=4, rows=50):
+        for i in range(n_chunks):
+            frame = pd.DataFrame({"amount": np.arange(rows, dtype=float) + i, "name": [f"n{i}"] * rows,
+                                  "date": pd.date_range("2025-01-01", periods=rows)})
+            # a column whose dtype changes between chunks is upcast, as pd.concat does
+            frame["num"] = np.arange(rows) if i % 2 else np.arange(rows) + 0.5
+            yield frame
+
+    expected = pd.concat(chunks(), ignore_index=True)
+    # capacity too small: the columns grow
+    for capacity in (200, 60):
+        assert_frame_equal(fill_columns(chunks(), capacity), expected)
+    assert fill_columns(iter([]), 10) is None
+
+    # only one chunk is alive next to the output: peak well under the list + concat copy
+    def big_chunks():
+        for _ in range(8):
+            yield pd.DataFrame(np.random.default_rng(0).random((100_000, 4)), columns=list("abcd"))
+
+    tracemalloc.start()
+    out = fill_columns(big_chunks(), 800_000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(out) == 800_000 and peak < 1.3 * out.memory_usage(index=False).sum()
@@ -0,0 +1,111 @@
+import pandas as pd
+from src.trinity.preprocessing import load_and_clean_coa
+from src.trinity.classification_cache import ClassificationCache, classify_cached, client_key, main
+from tests.conftest import COA_PATH
+
+
+def present(lines):
+    return pd.DataFrame(index=pd.MultiIndex.from_tuples(
+        [(name, split_type, "") for name, split_type in lines], names=["split_account","split_type","split_detail_type"]))
+
+
+class FakeModel:
+    """
+    Stand-in for classify_outflows that records what it was asked.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, names):
+        self.calls.append(list(names))
+        out = {"Owner's Expense": [], "Expenses Accounts Payable": []}
+        for name in names:
+            out["Owner's Expense" if "Owner" in name else "Expenses Accounts Payable"].append(name)
+        return out
+
+
+def test_known_lines_skip_the_model(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    model = FakeModel()
+    week1 = present([("Utilities", "Expense"), ("Owner's Pay", "Equity")])
+
+    first = classify_cached(week1, "outflows", model, "v1", "grace", cache)
+    assert first == {"Expenses Accounts Payable": ["Utilities"], "Credit Cards and Loans": [], "Owner's Expense": ["Owner's Pay"]}
+    assert model.calls == [["Utilities", "Owner's Pay"]] and cache.misses == 2
+
+    # same lines (spacing/case differences are the same account): no model call
+    week2 = present([("utilities ", "Expense"), ("Owner's  Pay", "Equity")])
+    assert classify_cached(week2, "outflows", model, "v1", "grace", cache) == {
+        "Expenses Accounts Payable": ["utilities "], "Credit Cards and Loans": [], "Owner's Expense": ["Owner's  Pay"]}
+    assert len(model.calls) == 1 and cache.hits == 2
+
+    # only the new line is sent; other clients, directions and prompt versions don't share answers
+    week3 = present([("Utilities", "Expense"), ("Rent", "Expense")])
+    classify_cached(week3, "outflows", model, "v1", "grace", cache)
+    assert model.calls[-1] == ["Rent"]
+    for client, direction, version in [("luna", "outflows", "v1"), ("grace", "inflows", "v1"), ("grace", "outflows", "v2")]:
+        classify_cached(week1, direction, model, version, client, cache)
+        assert model.calls[-1] == ["Utilities", "Owner's Pay"]
+
+    # inflows and outflows entries of the account
+    assert cache.invalidate(client="grace", prompt_version="v1", name="UTILITIES") == 2
+    classify_cached(week3, "outflows", model, "v1", "grace", cache)
+    assert model.calls[-1] == ["Utilities"]
+    cache.close()
+
+
+def test_unanswered_lines_are_retried(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    lines = present([("Utilities", "Expense"), ("Rent", "Expense")])
+    forgetful = lambda names: {"Expenses Accounts Payable": names[:1]}
+    assert classify_cached(lines, "outflows", forgetful, "v1", "grace", cache) == {
+        "Expenses Accounts Payable": ["Utilities"], "Credit Cards and Loans": [], "Owner's Expense": []}
+
+    model = FakeModel()
+    classify_cached(lines, "outflows", model, "v1", "grace", cache)
+    assert model.calls == [["Rent"]]
+    cache.close()
+
+
+def test_every_category_in_fixed_order(tmp_path):
+    # the Projections (Table) sections follow these keys, whichever lines came from the cache
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    cache.put("grace", "outflows", [("Owner's Pay", "Equity", "Owner's Expense")], "v1")
+    lines = present([("Owner's Pay", "Equity"), ("Utilities", "Expense")])
+    out = classify_cached(lines, "outflows", FakeModel(), "v1", "grace", cache)
+    assert list(out) == ["Expenses Accounts Payable", "Credit Cards and Loans", "Owner's Expense"]
+    assert out["Credit Cards and Loans"] == []
+
+    out = classify_cached(present([("Sales", "Income")]), "inflows", lambda names: {"AR Collected": names}, "v1", "grace", cache)
+    assert list(out) == ["AR Collected", "Line of Credit Advances", "Other Income"]
+    cache.close()
+
+
+def test_clear_command(tmp_path, capsys):
+    path = str(tmp_path / "classify.sqlite")
+    cache = ClassificationCache(path)
+    cache.put("grace", "outflows", [("Utilities", "Expense", "Expenses Accounts Payable")], "v1")
+    cache.put("luna", "outflows", [("Utilities", "Expense", "Expenses Accounts Payable")], "v1")
+    cache.close()
+
+    main(["clear", "--path", path, "--client", "grace"])
+    assert "Deleted 1" in capsys.readouterr().out
+    main(["stats", "--path", path])
+    assert "luna" in capsys.readouterr().out
+
+    coa, _, _ = load_and_clean_coa(COA_PATH)
+    assert client_key(coa) == client_key(coa.sample(frac=1, random_state=0))
+
+
+def test_rename_client(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    cache.put("3f9a0c", "outflows", [("Utilities", "Expense", "Expenses Accounts Payable"),
+                                     ("Rent", "Expense", "Expenses Accounts Payable")], "v1")
+    cache.put("grace", "outflows", [("Rent", "Expense", "Owner's Expense")], "v1")
+
+    assert cache.rename_client("3f9a0c", "grace") == 1
+    assert cache.stats() == [("grace", "v1", 2)]
+    known = cache.get("grace", "outflows", [("Utilities", "Expense"), ("Rent", "Expense")], "v1")
+    assert known == {("utilities", "Expense"): "Expenses Accounts Payable", ("rent", "Expense"): "Owner's Expense"}
+    cache.close()
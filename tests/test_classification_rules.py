@@ -0,0 +1,50 @@
+import asyncio
+import pandas as pd
+from openai import AsyncOpenAI
+from src.trinity.cash import get_bank_tx
+from src.trinity.classification_rules import classify_by_rules, rule_category
+from src.trinity.classify_transactions import get_calssifications_async
+from tests.stub_openai import StubServer
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def grace_lines(grace):
+    gl, _, bank_accounts, cc_accounts = grace
+    totals = get_bank_tx(gl, bank_accounts, cc_accounts).groupby(IDX_NAMES)["amount"].sum()
+    return totals[totals > 0].to_frame(), totals[totals < 0].to_frame()
+
+
+def test_rules(grace):
+    assert rule_category("inflows", "Income") == "AR Collected"
+    assert rule_category("inflows", "Long Term Liabilities") == "Line of Credit Advances"
+    assert rule_category("outflows", " EQUITY") == "Owner's Expense"
+    assert rule_category("outflows", "Expenses") == "Expenses Accounts Payable"
+    assert rule_category("outflows", "Unmapped") is None and rule_category("inflows", "Other") is None
+
+    inflows, outflows = grace_lines(grace)
+    by_cat, ambiguous = classify_by_rules(outflows, "outflows")
+    assert set(ambiguous.index.get_level_values("split_type")) <= {"Unmapped", "Other Assets", "Other Current Assets"}
+    assert sum(map(len, by_cat.values())) + len(ambiguous) == len(outflows)
+    assert len(ambiguous) < len(outflows) / 4
+
+
+def test_only_ambiguous_lines_reach_the_model(grace):
+    inflows, outflows = grace_lines(grace)
+    outflows = pd.concat([outflows, pd.DataFrame({"amount": [-1.0]}, index=pd.MultiIndex.from_tuples(
+        [("Other Outflows", "Other", "")], names=IDX_NAMES))])
+    _, ambiguous = classify_by_rules(outflows, "outflows")
+
+    async def run(stub):
+        async with AsyncOpenAI(base_url=stub.base_url, api_key="test", max_retries=0) as llm:
+            return await get_calssifications_async(inflows, outflows, llm=llm)
+
+    with StubServer() as stub:
+        inflows_by_cat, outflows_by_cat = asyncio.run(run(stub))
+        # one request per direction: Owner's Investment (an Equity inflow) and the ambiguous outflows
+        assert stub.requests == 2
+
+    assert list(inflows_by_cat) == ["AR Collected", "Line of Credit Advances", "Other Income"]
+    assert list(outflows_by_cat) == ["Expenses Accounts Payable", "Credit Cards and Loans", "Owner's Expense"]
+    assert "Other Outflows" in ambiguous.index.get_level_values("split_account")
+    assert sorted(sum(outflows_by_cat.values(), [])) == sorted(outflows.index.get_level_values("split_account"))
@@ -0,0 +1,73 @@
+import asyncio
+import pandas as pd
+from openai import AsyncOpenAI
+from src.trinity.classify_transactions import get_calssifications, get_calssifications_async, chunk_names, estimate_tokens
+from src.trinity.classification_cache import ClassificationCache
+from tests.stub_openai import StubServer
+
+
+# Unmapped accounts: the type rules don't settle them, so they all go to the model
+def present(names, split_type="Unmapped"):
+    return pd.DataFrame(index=pd.MultiIndex.from_tuples(
+        [(name, split_type, "") for name in names], names=["split_account","split_type","split_detail_type"]))
+
+
+INFLOWS = present(["Customer Payment", "Line of Credit Advance", "Other Income"])
+OUTFLOWS = present([f"Vendor {i:03d}" for i in range(40)] + ["Owner's Pay", "citi business credit card"])
+
+
+def classify(stub, **kwargs):
+    async def run():
+        async with AsyncOpenAI(base_url=stub.base_url, api_key="test", max_retries=0) as llm:
+            return await get_calssifications_async(INFLOWS, OUTFLOWS, llm=llm, **kwargs)
+    return asyncio.run(run())
+
+
+def test_chunks_are_token_bounded():
+    names = [f"Vendor {i:03d}" for i in range(100)] + ["Vendor 000"]
+    chunks = chunk_names(names, max_tokens=40)
+    assert sum(chunks, []) == names[:100]
+    assert all(sum(map(estimate_tokens, c)) <= 40 for c in chunks) and len(chunks) > 1
+
+
+def test_concurrent_chunks_against_stub():
+    with StubServer(latency=0.5) as stub:
+        inflows_by_cat, outflows_by_cat = classify(stub, max_tokens=20, concurrency=8)
+
+    assert inflows_by_cat == {"AR Collected": ["Customer Payment"], "Line of Credit Advances": ["Line of Credit Advance"],
+                              "Other Income": ["Other Income"]}
+    assert outflows_by_cat["Credit Cards and Loans"] == ["citi business credit card"]
+    assert outflows_by_cat["Owner's Expense"] == ["Owner's Pay"]
+    assert len(outflows_by_cat["Expenses Accounts Payable"]) == 40
+    # one inflow request and 9 outflow chunks
+    n_requests = 1 + len(chunk_names(OUTFLOWS.index.get_level_values("split_account"), 20))
+    assert n_requests == 10 and stub.requests == n_requests
+    # the chunks overlap on the stub but never more than 8 are in flight; under load the first
+    # answers can come back before the last chunks are sent, so the peak itself may stay below 8
+    assert 1 < stub.peak <= 8
+
+
+def test_server_errors_are_retried(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    with StubServer(fail_first=2) as stub:
+        _, outflows_by_cat = classify(stub, cache=cache, client="grace")
+        assert stub.requests == 4 and "Owner's Expense" in outflows_by_cat
+        # everything is cached now: no requests at all
+        assert classify(stub, cache=cache, client="grace")[1] == outflows_by_cat
+        assert stub.requests == 4
+    cache.close()
+
+
+def test_sync_call_inside_running_loop(tmp_path, monkeypatch):
+    cache = ClassificationCache(str(tmp_path / "classify.sqlite"))
+    with StubServer() as stub:
+        monkeypatch.setenv("OPENAI_BASE_URL", stub.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+        async def caller():
+            return get_calssifications(INFLOWS, OUTFLOWS, client="grace", cache=cache)
+        inflows_by_cat, outflows_by_cat = asyncio.run(caller())
+        assert inflows_by_cat["AR Collected"] == ["Customer Payment"]
+        assert outflows_by_cat["Owner's Expense"] == ["Owner's Pay"]
+        assert stub.requests > 0
+    cache.close()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.trinity.cash import begin_cash, buil_actual_weekly_cash, project_cash
+from src.trinity.credit_card import (allocate_payments, get_cc_debt_history, project_cc_debt, project_cc_payments,
+                                     POOLED_CARD)
+from src.trinity.preprocessing import week_windows
+from src.trinity.projections import top_values
+from tests.reference import allocate_payments_by_event
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def spend_frames(seed, n_cats, quiet_weeks=()):
+    rng = np.random.default_rng(seed)
+    hist_weeks = pd.date_range("2025-07-14", "2026-01-05", freq="W-MON")
+    proj_weeks = pd.date_range("2026-01-12", periods=13, freq="W-MON")
+    cats = pd.Index([f"Cat {i}" for i in range(n_cats)], name="cat")
+    hist = pd.DataFrame(rng.normal(-200, 150, (n_cats, len(hist_weeks))), index=cats, columns=hist_weeks)
+    proj = pd.DataFrame(rng.normal(-200, 150, (n_cats, len(proj_weeks))), index=cats, columns=proj_weeks)
+    hist[hist.abs() < 60] = 0.0
+    for w in quiet_weeks:
+        for frame in (hist, proj):
+            if w in frame.columns:
+                frame[w] = 0.0
+    return hist, proj, proj_weeks
+
+
+@pytest.mark.parametrize("seed, n_cats, quiet, rolling", [
+    (0, 12, (), 8),
+    (1, 3, pd.date_range("2026-03-02", "2026-03-30", freq="W-MON"), 2),     # empty mix window -> Uncategorized
+    (2, 5, pd.date_range("2025-12-01", "2026-01-05", freq="W-MON"), 8),     # empty December statement
+    (3, 0, (), 8),
+])
+def test_matrix_allocation_matches_per_event(seed, n_cats, quiet, rolling):
+    hist, proj, proj_weeks = spend_frames(seed, n_cats, quiet)
+    pay_dates = [pd.Timestamp("2026-01-14"), pd.Timestamp("2026-02-14"), pd.Timestamp("2026-03-31"), pd.Timestamp("2026-04-30")]
+
+    args = (proj, hist, pay_dates, rolling, proj_weeks, IDX_NAMES, "monthly", 14)
+    schedule, alloc = allocate_payments(*args)
+    expected_schedule, expected_alloc = allocate_payments_by_event(*args)
+
+    assert_frame_equal(alloc, expected_alloc, check_exact=False, check_names=False)
+    assert (schedule["card"] == POOLED_CARD).all()
+    assert_frame_equal(schedule.drop(columns="card").reset_index(drop=True), expected_schedule.reset_index(drop=True),
+                       check_exact=False, check_dtype=False)
+
+
+def card_ledger():
+    """
+    Two cards with their own statement days: Amex paid on the 5th, Citi on the 20th.
+    """
+    weeks = pd.date_range("2025-07-07", "2026-01-05", freq="W-MON")
+    spend = pd.DataFrame({
+        "account_name": ["Amex"] * len(weeks) + ["Citi"] * len(weeks) + ["Citi"] * 5,
+        "split_account": ["Fuel"] * len(weeks) + ["Meals"] * len(weeks) + ["Fuel"] * 5,
+        "date": list(weeks + pd.Timedelta(days=1)) * 2 + list(weeks[-5:] + pd.Timedelta(days=2)),
+        "amount": [100.0] * len(weeks) + [40.0] * len(weeks) + [10.0] * 5,
+    })
+    months = pd.date_range("2025-02-01", "2025-12-01", freq="MS")
+    payments = pd.DataFrame({
+        "split_account": ["Amex"] * len(months) + ["Citi"] * len(months),
+        "date": list(months + pd.Timedelta(days=4)) + list(months + pd.Timedelta(days=19)),
+        "amount": -500.0,
+    })
+    return spend, payments
+
+
+@pytest.mark.parametrize("per_card", [True, False])
+def test_cards_get_their_own_statements(per_card):
+    spend, payments = card_ledger()
+    PROJ_WEEK1_START = pd.Timestamp("2026-01-12")
+    asof_date = PROJ_WEEK1_START - pd.Timedelta(days=1)
+    proj_weeks = pd.date_range(PROJ_WEEK1_START, periods=13, freq="W-MON")
+    actual_weeks = pd.date_range(end=PROJ_WEEK1_START - pd.Timedelta(weeks=1), periods=4, freq="W-MON")
+    proj_end = proj_weeks[-1] + pd.Timedelta(days=7)
+
+    pivot, hist_start = get_cc_debt_history(spend, asof_date, PROJ_WEEK1_START, 26, per_card=per_card)
+    proj_cat, hist_cat = project_cc_debt(pivot, hist_start, 40, proj_weeks, actual_weeks)
+    events, kinds, dom = project_cc_payments(payments, asof_date, PROJ_WEEK1_START, proj_end, pd.Timestamp("2025-01-12"),
+                                             asof_date, cards=hist_cat.index.unique("card"), per_card=per_card)
+    schedule, alloc = allocate_payments(proj_cat, hist_cat, events, 8, proj_weeks, IDX_NAMES, kinds, dom)
+
+    # card totals add up to the pooled category spend either way
+    assert hist_cat.groupby(level="cat").sum().loc["Fuel"].sum() == 26 * 100.0 + 5 * 10.0
+    if not per_card:
+        assert list(dom.index) == [POOLED_CARD] and set(schedule["card"]) == {POOLED_CARD}
+        return
+
+    assert dom.to_dict() == {"Amex": 5, "Citi": 20}
+    assert set(kinds) == {"monthly"}
+    assert list(schedule["payment_date"].dt.day.unique()) == [5, 20]
+    feb = schedule[schedule["payment_date"].dt.month == 2].set_index("card")["estimated_payment_total"]
+    # each card pays its own January spend (weeks touching January: Dec 29 .. Jan 26)
+    jan = lambda card: proj_cat.loc[card].iloc[:, :3].sum().abs().sum() + hist_cat.loc[card].iloc[:, -2:].sum().abs().sum()
+    np.testing.assert_allclose(feb["Amex"], jan("Amex"))
+    np.testing.assert_allclose(feb["Citi"], jan("Citi"))
+    # Amex only ever spent on Fuel, so its payments never land on Meals
+    amex_weeks = schedule.loc[schedule["card"] == "Amex", "payment_week_start"]
+    meals = alloc.loc[("CC Payment - Meals", "Credit Card Payment", ""), amex_weeks]
+    citi_meals = -schedule.loc[schedule["card"] == "Citi"].set_index("payment_week_start")["estimated_payment_total"]
+    assert (meals.loc[~meals.index.isin(citi_meals.index)] == 0).all()
+
+
+@pytest.mark.parametrize("asof", ["2025-05-05", "2026-01-12"])
+def test_pooled_payment_day_matches_value_counts(grace, asof):
+    gl, coa, bank_accounts, cc_accounts = grace
+    (PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, all_week_starts, hist_week_starts,
+     cadence_start, cadence_end, proj_end_date) = week_windows(asof)
+    bank_tx, _, asof_date = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+    pivot, idx_names = buil_actual_weekly_cash(bank_tx, all_week_starts)
+    hist_ccpay_bank, _ = project_cash(pivot, bank_tx, cadence_start, cadence_end, cc_accounts, proj_week_starts,
+                                      PROJ_WEEK1_START, proj_end_date, hist_week_starts, idx_names)
+
+    _, _, dom = project_cc_payments(hist_ccpay_bank, asof_date, PROJ_WEEK1_START, proj_end_date, cadence_start,
+                                    cadence_end, per_card=False)
+    days = pd.DatetimeIndex(hist_ccpay_bank["date"].sort_values()).day
+    assert dom[POOLED_CARD] == int(pd.Series(days).value_counts().idxmax())
+    if asof == "2025-05-05":
+        # days 2 and 19 both occur five times; value_counts puts 2 first
+        assert dom[POOLED_CARD] == 2
+
+
+def test_top_values_follow_value_counts():
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, 30, 2000)
+    values = rng.integers(1, 29, 2000)
+    top = top_values(codes, values, 31, 2)
+    for code in range(31):
+        expected = pd.Series(values[codes == code]).value_counts().head(2).index.tolist()
+        assert top[code].tolist() == expected + [-1] * (2 - len(expected))
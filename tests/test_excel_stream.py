@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+from src.trinity.excel_stream import SheetStreamer
+
+
+def transactions(n):
+    return pd.DataFrame({
+        "date": pd.date_range("2025-01-01", periods=n, freq="D"),
+        "account_name": np.where(np.arange(n) % 2, "Card A", "Card B"),
+        "amount": np.arange(n, dtype=float),
+    })
+
+
+def saved_rows(wb, path):
+    wb.save(path)
+    return {ws.title: [[c.value for c in row] for row in ws.iter_rows()] for ws in load_workbook(path).worksheets}
+
+
+def test_rows_past_the_limit_continue_in_more_sheets(tmp_path):
+    tx = transactions(35)
+    wb = Workbook(write_only=True)
+    streamer = SheetStreamer(wb, max_rows=11, overflow="split", batch_rows=4)
+    names = streamer.write_frame("CC Spend - Transactions", tx)
+    assert names == ["CC Spend - Transactions"] + [f"CC Spend - Transactions ({i})" for i in (2, 3, 4)]
+
+    sheets = saved_rows(wb, tmp_path / "split.xlsx")
+    assert [len(sheets[n]) for n in names] == [11, 11, 11, 6]
+    assert all(sheets[n][0] == ["date", "account_name", "amount"] for n in names)
+    assert [row[2] for n in names for row in sheets[n][1:]] == tx["amount"].tolist()
+
+
+def test_rows_past_the_limit_spill_to_csv(tmp_path):
+    tx = transactions(35)
+    wb = Workbook(write_only=True)
+    streamer = SheetStreamer(wb, max_rows=11, overflow="csv", spill_prefix=str(tmp_path / "output"), batch_rows=4)
+    assert streamer.write_frame("CC Spend - Transactions", tx) == ["CC Spend - Transactions"]
+    assert streamer.spilled == [str(tmp_path / "output - CC Spend - Transactions.csv")]
+
+    sheets = saved_rows(wb, tmp_path / "spill.xlsx")
+    assert len(sheets["CC Spend - Transactions"]) == 11
+    spilled = pd.read_csv(streamer.spilled[0], parse_dates=["date"])
+    pd.testing.assert_frame_equal(spilled, tx.iloc[10:].reset_index(drop=True))
+
+
+def test_csv_overflow_needs_a_prefix():
+    with pytest.raises(ValueError):
+        SheetStreamer(Workbook(write_only=True), overflow="csv")
+
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pandas.testing import assert_frame_equal
+from src.trinity.preprocessing import week_windows
+from src.trinity.cash import get_bank_tx, buil_actual_weekly_cash
+from src.trinity.credit_card import begin_cc, get_cc_debt_history
+from src.trinity.gl_store import GLStore, store_path, migrate_store
+from src.trinity.classification_cache import client_key
+
+
+def assert_store_matches(store, gl, bank_accounts, cc_accounts):
+    (PROJ_WEEK1_START, _, CC_SPEND_TS_WEEKS, _, _, _, _, _, all_week_starts, _, _,
+     asof_date, _) = week_windows("2026-01-12")
+
+    expected, _ = buil_actual_weekly_cash(get_bank_tx(gl, bank_accounts, cc_accounts), all_week_starts)
+    got, _ = buil_actual_weekly_cash(store.bank_weekly(), all_week_starts)
+    assert_frame_equal(got, expected, check_exact=False)
+
+    cc_txn = begin_cc(gl, bank_accounts, cc_accounts)
+    expected, _ = get_cc_debt_history(cc_txn, asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS)
+    got, _ = get_cc_debt_history(store.cc_spend_weekly(), asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS)
+    assert_frame_equal(got, expected, check_exact=False)
+
+
+def test_incremental_sync_matches_full_rebuild(grace, tmp_path):
+    gl, coa, bank_accounts, cc_accounts = grace
+    store = GLStore(str(tmp_path / "store.sqlite"))
+
+    last_week = gl.iloc[:4000]
+    assert store.sync(last_week, bank_accounts, cc_accounts)["added"] == len(last_week)
+    assert_store_matches(store, last_week, bank_accounts, cc_accounts)
+
+    # new rows appended and one old row edited
+    this_week = gl.copy()
+    this_week.loc[10, "amount"] += 1.0
+    diff = store.sync(this_week, bank_accounts, cc_accounts)
+    assert diff == {"added": len(gl) - 4000 + 1, "removed": 1, "rebuilt": False}
+    assert_store_matches(store, this_week, bank_accounts, cc_accounts)
+
+    assert store.sync(this_week, bank_accounts, cc_accounts) == {"added": 0, "removed": 0, "rebuilt": False}
+    store.close()
+
+
+def test_concurrent_syncs_of_one_store(grace, tmp_path):
+    gl, _, bank_accounts, cc_accounts = grace
+    path = str(tmp_path / "store.sqlite")
+    GLStore(path).close()
+    start = threading.Barrier(2)
+
+    def sync(_):
+        store = GLStore(path)
+        start.wait()
+        added = store.sync(gl, bank_accounts, cc_accounts)["added"]
+        store.close()
+        return added
+
+    with ThreadPoolExecutor(2) as pool:
+        added = sorted(pool.map(sync, range(2)))
+    # one sync adds everything, the other one sees its rows
+    assert added == [0, len(gl)]
+    store = GLStore(path)
+    assert_store_matches(store, gl, bank_accounts, cc_accounts)
+    store.close()
+
+
+def test_one_store_per_client(grace, tmp_path):
+    coa = grace[1]
+    assert store_path("grace", str(tmp_path)) == str(tmp_path / "grace.sqlite")
+    assert store_path("Grace Global/Logistics", str(tmp_path)) == str(tmp_path / "Grace_Global_Logistics.sqlite")
+
+    # a store kept under the chart of accounts key moves to the client id
+    legacy = tmp_path / f"{client_key(coa)}.sqlite"
+    legacy.write_bytes(b"store")
+    assert migrate_store("grace", coa, str(tmp_path)) == str(tmp_path / "grace.sqlite")
+    assert not legacy.exists() and (tmp_path / "grace.sqlite").read_bytes() == b"store"
+    # once the client has its own store, a stale one is removed
+    legacy.write_bytes(b"stale")
+    migrate_store("grace", coa, str(tmp_path))
+    assert not legacy.exists() and (tmp_path / "grace.sqlite").read_bytes() == b"store"
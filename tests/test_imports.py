@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+
+def test_pipeline_imports_without_streamlit_or_credentials(tmp_path):
+    # no API key, no .env and no Streamlit secrets reachable
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["HOME"] = str(tmp_path)
+    check = ("import sys, src.trinity.pipeline, src.trinity.postprocessing, src.trinity.classify_transactions; "
+             "print(sorted(m for m in ('streamlit', 'openai', 'openpyxl', 'pydantic', 'tenacity', 'dotenv') if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, cwd=tmp_path,
+                          env={**env, "PYTHONPATH": os.getcwd()})
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "[]"
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from src.trinity.preprocessing import week_windows
+from src.trinity.cash import begin_cash
+from src.trinity.projections import week_of_month_array
+from src.trinity.montecarlo import bank_line_residuals, simulate_flow_noise, cash_balance_bands
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def test_residuals_center_each_week_of_month(grace):
+    (PROJ_WEEK1_START, _, _, _, _, _, _, _, _, hist_week_starts, cadence_start,
+     cadence_end, _) = week_windows("2026-01-12")
+    gl, coa, bank_accounts, cc_accounts = grace
+    bank_tx, _, _ = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+
+    lines, residuals = bank_line_residuals(bank_tx, cc_accounts, cadence_start, cadence_end, hist_week_starts, IDX_NAMES)
+    assert residuals.shape == (len(lines), len(hist_week_starts)) and len(lines)
+    wom = week_of_month_array(hist_week_starts)
+    for k in np.unique(wom):
+        np.testing.assert_allclose(residuals[:, wom == k].mean(axis=1), 0.0, atol=1e-6)
+
+
+def test_bands():
+    weeks = pd.date_range("2026-01-05", periods=5, freq="W-MON")
+    proj_weeks = weeks[2:]
+    beg = pd.Series([100.0, 90.0, 80.0, 70.0, 60.0], index=weeks)
+    end = pd.Series([90.0, 80.0, 70.0, 60.0, 50.0], index=weeks)
+
+    bands, p_breach = cash_balance_bands(beg, end, proj_weeks, np.zeros((50, 3)), cash_floor=65.0)
+    np.testing.assert_array_equal(bands["Ending Bank Balance P10"], end)
+    np.testing.assert_array_equal(bands["Beginning Bank Balance P90"], beg)
+    assert list(bands["P(Ending < 65)"]) == [0, 0, 0, 1, 1] and p_breach == 1.0
+
+    # one path loses 30 in the first projected week and stays down
+    noise = np.zeros((10, 3))
+    noise[0, 0] = -30.0
+    bands, p_breach = cash_balance_bands(beg, end, proj_weeks, noise, cash_floor=45.0)
+    assert list(bands["P(Ending < 45)"]) == [0, 0, 0.1, 0.1, 0.1] and p_breach == 0.1
+
+
+def test_noise_resamples_history():
+    rng = np.random.default_rng(1)
+    residuals = rng.normal(size=(40, 52))
+    joint = simulate_flow_noise(residuals, 13, 2000, joint=True, seed=0)
+    assert joint.shape == (2000, 13)
+    assert np.isin(joint, residuals.sum(axis=0)).all()
+
+    independent = simulate_flow_noise(residuals, 13, 2500, joint=False, seed=0)
+    assert independent.shape == (2500, 13)
+    assert abs(independent.std() - np.sqrt(40) * residuals.std()) < 0.5
+    assert not simulate_flow_noise(np.zeros((0, 52)), 13, 5).any()
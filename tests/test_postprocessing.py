@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from openpyxl import load_workbook
+from src.trinity.postprocessing import projections_table, build_output_workbook
+from tests.synthetic import synthetic_present, synthetic_output
+from tests.reference import projections_table_by_row, write_output_excel, calculate_category_totals, style_projections
+
+
+def test_block_assembly_matches_row_by_row():
+    weeks = list(pd.date_range("2025-12-15", periods=17, freq="W-MON"))
+    inflows = synthetic_present(12, weeks, seed=1)
+    outflows = synthetic_present(40, weeks, seed=2)
+    outflows = outflows.rename(index=lambda n: n.replace("Account 0", "Vendor 0") if n != "Account 000" else n, level=0)
+
+    names_in = sorted(set(inflows.index.get_level_values(0)))
+    names_out = sorted(set(outflows.index.get_level_values(0)))
+    inflows_by_cat = {"AR Collected": names_in[:8], "Line of Credit Advances": [], "Other Income": names_in[8:]}
+    # one name listed twice and one that is not a present line
+    outflows_by_cat = {"Expenses Accounts Payable": names_out[:20] + ["Not Present"],
+                       "Credit Cards and Loans": names_out[19:], "Owner's Expense": []}
+
+    series = [pd.Series(np.arange(len(weeks)) * k, index=weeks, dtype=float) for k in (1.0, 2.0, 3.0, 4.0)]
+    args = (weeks, inflows_by_cat, outflows_by_cat, inflows, outflows, *series)
+    expected = projections_table_by_row(*args)
+    got = projections_table(*args)
+
+    assert got[1:] == expected[1:]
+    assert_frame_equal(got[0], expected[0])
+    # every distinct account fills one row (its first), plus the four balance and total rows
+    assert got[0].iloc[:, 3:].notna().any(axis=1).sum() == len(set(names_in) | set(names_out)) + 4
+
+
+def cell_snapshot(cell):
+    return (cell.value, cell.number_format, cell.font.name, cell.font.sz, cell.font.b, cell.fill.fill_type, cell.fill.fgColor.rgb)
+
+
+def test_single_pass_workbook_matches_three_passes(tmp_path):
+    weeks = list(pd.date_range("2025-12-15", periods=17, freq="W-MON"))
+    args = synthetic_output(weeks)
+    week_index = pd.Index(weeks, name="Week Start")
+    extra = {
+        "scenario_comparison": pd.DataFrame({"Base": np.arange(17.0), "Delay AR": np.arange(17.0) - 5}, index=week_index),
+        "cash_bands": (pd.DataFrame({"Ending Bank Balance P10": np.linspace(0, 1, 17)}, index=week_index), 0.25),
+    }
+
+    # reference: write the file, reload it for the formulas, reload it again for the styles
+    path = str(tmp_path / "three_pass.xlsx")
+    indexes = write_output_excel(*args, path, **extra)
+    calculate_category_totals(path, *indexes)
+    style_projections(path, *indexes)
+
+    single = tmp_path / "single_pass.xlsx"
+    single.write_bytes(build_output_workbook(*args, **extra))
+
+    expected, got = load_workbook(path), load_workbook(single)
+    assert got.sheetnames == expected.sheetnames
+    for name in expected.sheetnames:
+        expected_cells = [[cell_snapshot(c) for c in row] for row in expected[name].iter_rows()]
+        got_cells = [[cell_snapshot(c) for c in row] for row in got[name].iter_rows()]
+        assert got_cells == expected_cells, name
+    assert str(got["Projections (Table)"].cell(indexes[0][0], 4).value).startswith("=SUM(")
+    # header borders and alignment too, and every Projections (Table) cell refers to a named style
+    def look(ws):
+        return [(getattr(c.border.left, "style", None), c.alignment.horizontal) for row in ws.iter_rows() for c in row]
+
+    assert look(got["Projections (Table)"]) == look(expected["Projections (Table)"])
+    assert all(c.style.startswith("Projections ") for row in got["Projections (Table)"].iter_rows() for c in row)
+    assert got["Projections (Table)"].cell(indexes[0][0], 4).style == "Projections Category"
+    assert got["Projections (Table)"].cell(1, 1).style == "Projections Header"
+
+
+def test_spilled_csv_paths_are_reported(tmp_path):
+    weeks = list(pd.date_range("2025-12-15", periods=17, freq="W-MON"))
+    args = synthetic_output(weeks, n_txn=150)
+    spilled = []
+    data = build_output_workbook(*args, overflow="csv", max_rows=101, spill_prefix=str(tmp_path / "output"), spilled=spilled)
+
+    assert spilled == [str(tmp_path / "output - CC Spend - Transactions.csv")]
+    assert len(pd.read_csv(spilled[0])) == 50
+    path = tmp_path / "output.xlsx"
+    path.write_bytes(data)
+    assert load_workbook(path)["CC Spend - Transactions"].max_row == 101
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.trinity.preprocessing import week_windows
+from src.trinity.cash import begin_cash, project_bank_lines
+from tests.reference import project_line
+
+IDX_NAMES = ["split_account","split_type","split_detail_type"]
+
+
+def hist_noncc(grace, date_strt):
+    gl, coa, bank_accounts, cc_accounts = grace
+    (PROJ_WEEK1_START, _, _, _, _, _, _, proj_week_starts, _, hist_week_starts, cadence_start,
+     cadence_end, proj_end_date) = week_windows(date_strt)
+    bank_tx, _, _ = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+    hist = bank_tx[(bank_tx["date"] >= cadence_start) & (bank_tx["date"] <= cadence_end)]
+    hist = hist[~hist["split_account"].isin(cc_accounts)]
+    return hist, (hist_week_starts, proj_week_starts, PROJ_WEEK1_START, proj_end_date, cadence_start, cadence_end)
+
+
+@pytest.mark.parametrize("date_strt", ["2025-05-05", "2025-09-01", "2026-01-12"])
+def test_batched_lines_match_per_line(grace, date_strt):
+    hist, args = hist_noncc(grace, date_strt)
+    lines, proj, method = project_bank_lines(hist, IDX_NAMES, *args)
+
+    keys = []
+    for i, (key, df_line) in enumerate(hist.groupby(IDX_NAMES)):
+        expected_method, expected = project_line(df_line, *args)
+        keys.append(key)
+        assert method.iloc[i] == expected_method, key
+        np.testing.assert_allclose(proj[i], expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-9, equal_nan=True)
+    assert list(lines) == keys
+
+
+def test_grouped_cadence_matches_classify_cadence():
+    from src.trinity.projections import classify_cadence_grouped
+    from tests.reference import classify_cadence
+
+    start, end = pd.Timestamp("2025-01-12"), pd.Timestamp("2026-01-11")
+    months = pd.date_range(start, end, freq="MS")
+    lines = [
+        pd.date_range(start, end, freq="14D"),
+        pd.DatetimeIndex([start + pd.DateOffset(months=k) for k in range(12)]),
+        months.append(months + pd.Timedelta(days=14)),
+        pd.DatetimeIndex([start + pd.DateOffset(months=3 * k) for k in range(4)]),
+        pd.DatetimeIndex(["2025-03-02", "2025-03-02", "2025-06-20"]),
+        pd.DatetimeIndex([]),
+        pd.DatetimeIndex(["2025-02-10", "2026-02-10"]),
+    ]
+    codes = np.concatenate([np.full(len(d), i) for i, d in enumerate(lines)])
+    dates = pd.Series(np.concatenate([np.asarray(d, dtype="datetime64[ns]") for d in lines]))
+
+    grouped = classify_cadence_grouped(codes, dates, start, end, n_lines=len(lines))
+    expected = [classify_cadence(pd.Series(d), start, end) for d in lines]
+    assert list(grouped) == expected
+    assert set(expected) >= {"semimonthly", "monthly", "quarterly", "irregular"}
+
+
+@pytest.mark.parametrize("proj_start", ["2025-03-03", "2024-02-26", "2025-12-29"])
+def test_event_scheduler_matches_per_line(proj_start):
+    from src.trinity.projections import schedule_events_matrix
+    from tests.reference import project_cadenced_events, allocate_to_weeks
+
+    proj_start = pd.Timestamp(proj_start)
+    proj_end = proj_start + pd.Timedelta(weeks=13)
+    proj_weeks = pd.date_range(proj_start, periods=13, freq="W-MON")
+    cadence_start = (proj_start - pd.DateOffset(months=12)).normalize()
+    cadence_end = proj_start - pd.Timedelta(days=1)
+
+    rng = np.random.default_rng(0)
+    kinds = ["weekly", "biweekly", "monthly", "quarterly", "annual", "semimonthly", "irregular"] * 30
+    month_ends = pd.DatetimeIndex(["2024-01-31", "2024-02-29", "2025-01-31", "2025-05-31", "2024-12-31"])
+    codes, dates, amounts = [], [], []
+    for i in range(len(kinds)):
+        d = list(cadence_start + pd.to_timedelta(rng.integers(0, 365, size=rng.integers(0, 6)), unit="D"))
+        d.append(month_ends[i % len(month_ends)])
+        codes += [i] * len(d)
+        dates += d
+        amounts += list(rng.choice([0.0, -100.0, 250.5, -33.3], size=len(d)))
+    codes, dates, amounts = np.array(codes), pd.Series(dates, dtype="datetime64[ns]"), np.array(amounts)
+
+    out, has_events = schedule_events_matrix(codes, dates, amounts, kinds, proj_weeks, proj_start, proj_end)
+    for i, kind in enumerate(kinds):
+        m = codes == i
+        events = project_cadenced_events(dates[m], amounts[m], proj_start, proj_end, cadence_start, cadence_end, kind)
+        expected = allocate_to_weeks(*zip(*events), proj_weeks).to_numpy() if events else np.zeros(13)
+        assert has_events[i] == bool(events), (i, kind)
+        np.testing.assert_allclose(out[i], expected, err_msg=f"{i} {kind}")
+
+
+def test_weekly_matrix_matches_pivot(grace):
+    from src.trinity.projections import weekly_matrix
+    from tests.reference import build_weekly_series
+    gl = grace[0]
+    week_starts = pd.date_range("2025-06-02", periods=20, freq="W-MON")
+    lines, weekly, codes = weekly_matrix(gl, IDX_NAMES, week_starts)
+
+    expected = (gl.pivot_table(index=IDX_NAMES, columns="week_start", values="amount", aggfunc="sum", fill_value=0.0)
+                .reindex(columns=week_starts, fill_value=0.0))
+    assert lines.equals(expected.index)
+    np.testing.assert_allclose(weekly, expected.to_numpy(), atol=1e-9)
+    assert (lines[codes] == pd.MultiIndex.from_frame(gl[IDX_NAMES])).all()
+
+    one = gl[gl["split_account"] == lines[0][0]]
+    np.testing.assert_allclose(build_weekly_series(one[["date","amount"]], week_starts), weekly[0], atol=1e-9)
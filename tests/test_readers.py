@@ -0,0 +1,29 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.trinity.readers import available_engines, read_sheet, parse_dates, GL_SKIPROWS, GL_COLUMNS
+from src.trinity.preprocessing import load_and_clean_coa, load_and_clean_gl
+from tests.conftest import COA_PATH, GL_PATH
+
+
+def test_engines_match_read_excel():
+    expected = pd.read_excel(GL_PATH, skiprows=GL_SKIPROWS, names=GL_COLUMNS)
+    for engine in available_engines():
+        df = read_sheet(GL_PATH, GL_SKIPROWS, GL_COLUMNS, engine=engine)
+        assert_frame_equal(df, expected, check_dtype=False)
+
+
+def test_load_gl_same_for_every_engine():
+    coa, _, _ = load_and_clean_coa(COA_PATH, engine="openpyxl")
+    expected = load_and_clean_gl(GL_PATH, coa, engine="openpyxl")
+    for engine in available_engines():
+        gl = load_and_clean_gl(GL_PATH, coa, engine=engine)
+        assert_frame_equal(gl, expected, check_dtype=False)
+    assert expected["date"].notna().all()
+
+
+def test_parse_dates_fallback():
+    s = pd.Series(["01/13/2025", "2025-02-01", "TOTAL", None])
+    parsed = parse_dates(s)
+    assert parsed.iloc[0] == pd.Timestamp("2025-01-13")
+    assert parsed.iloc[1] == pd.Timestamp("2025-02-01")
+    assert parsed.iloc[2:].isna().all()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from src.trinity.preprocessing import week_windows
+from src.trinity.cash import begin_cash, buil_actual_weekly_cash, project_cash
+from src.trinity.credit_card import begin_cc, get_cc_debt_history, project_cc_debt, project_cc_payments, allocate_payments
+from src.trinity.postprocessing import get_combined_bank, build_inflows_outflows, get_cash_balance
+from src.trinity.scenarios import apply_scenarios, run_scenarios
+
+
+@pytest.fixture(scope="module")
+def combined(grace):
+    (PROJ_WEEK1_START, CC_MIX_ROLLING_WEEKS, CC_SPEND_TS_WEEKS, TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES,
+     TOP_N_CC_CATS, actual_week_starts, proj_week_starts, all_week_starts, hist_week_starts, cadence_start,
+     cadence_end, proj_end_date) = week_windows("2026-01-12")
+    gl, coa, bank_accounts, cc_accounts = grace
+
+    bank_tx, beginning_cash_balance, asof_date = begin_cash(gl, coa, PROJ_WEEK1_START, bank_accounts, cc_accounts)
+    cc_spend_txn = begin_cc(gl, bank_accounts, cc_accounts)
+    bank_actual_pivot, idx_names = buil_actual_weekly_cash(bank_tx, all_week_starts)
+    hist_ccpay_bank, proj_bank = project_cash(bank_actual_pivot, bank_tx, cadence_start, cadence_end, cc_accounts,
+                                              proj_week_starts, PROJ_WEEK1_START, proj_end_date, hist_week_starts, idx_names)
+    cc_spend_cat_pivot, cc_spend_hist_start = get_cc_debt_history(cc_spend_txn, asof_date, PROJ_WEEK1_START, CC_SPEND_TS_WEEKS)
+    cc_spend_proj_cat, cc_spend_cat_pivot_top = project_cc_debt(cc_spend_cat_pivot, cc_spend_hist_start, TOP_N_CC_CATS,
+                                                                proj_week_starts, actual_week_starts)
+    payment_event_dates, ccpay_kind, dom_mode = project_cc_payments(hist_ccpay_bank, asof_date, PROJ_WEEK1_START,
+                                                                    proj_end_date, cadence_start, cadence_end)
+    _, cc_payment_alloc = allocate_payments(cc_spend_proj_cat, cc_spend_cat_pivot_top, payment_event_dates,
+                                            CC_MIX_ROLLING_WEEKS, proj_week_starts, idx_names, ccpay_kind, dom_mode)
+    combined_full = get_combined_bank(proj_bank, bank_actual_pivot, actual_week_starts, proj_week_starts,
+                                      all_week_starts, cc_payment_alloc)
+    return (combined_full, beginning_cash_balance, actual_week_starts, proj_week_starts, all_week_starts,
+            TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES, idx_names)
+
+
+def test_base_scenario_matches_pipeline(combined):
+    (combined_full, beginning_cash_balance, actual_week_starts, proj_week_starts, all_week_starts,
+     TOP_N_INFLOW_LINES, TOP_N_OUTFLOW_LINES, idx_names) = combined
+    # small top-N so the "Other" rows are exercised too
+    _, _, total_inflows, total_outflows = build_inflows_outflows(combined_full, actual_week_starts, all_week_starts, 5, 5, idx_names)
+    beg_bal, end_bal = get_cash_balance(total_inflows, total_outflows, beginning_cash_balance, all_week_starts)
+
+    comparison = run_scenarios(combined_full, {"Nothing": []}, beginning_cash_balance, actual_week_starts,
+                               proj_week_starts, all_week_starts, 5, 5)
+    for name in ["Base", "Nothing"]:
+        np.testing.assert_allclose(comparison.loc[(name, "Total Cash Inflows")], total_inflows.to_numpy())
+        np.testing.assert_allclose(comparison.loc[(name, "Total Cash Outflows")], total_outflows.to_numpy())
+        np.testing.assert_allclose(comparison.loc[(name, "Beginning Bank Balance")], beg_bal.to_numpy())
+        np.testing.assert_allclose(comparison.loc[(name, "Ending Bank Balance")], end_bal.to_numpy())
+    assert not comparison.loc[("Nothing", "Change vs Base")].any()
+
+
+def test_scale_shift_set(combined):
+    combined_full, _, actual_week_starts, proj_week_starts, all_week_starts = combined[:5]
+    full = combined_full[all_week_starts]
+    income = {"split_type": "Income"}
+    scenarios = {
+        "Slip": [{"op": "shift", "match": income, "weeks": 2}],
+        "Cut": [{"op": "scale", "match": income, "factor": 0.7, "start": proj_week_starts[4]}],
+        "Stop": [{"op": "set", "match": {}, "value": 0.0}],
+    }
+    names, cube = apply_scenarios(full, scenarios, proj_week_starts)
+    assert names == ["Base", "Slip", "Cut", "Stop"]
+
+    rows = full.index.get_level_values("split_type") == "Income"
+    base = full.to_numpy()
+    proj = full[proj_week_starts].to_numpy()
+    n_act = len(actual_week_starts)
+    # actual weeks never change
+    assert (cube[:, :, :n_act] == base[None, :, :n_act]).all()
+    np.testing.assert_array_equal(cube[0], base)
+
+    slip = cube[1][:, n_act:]
+    assert not slip[rows, :2].any()
+    np.testing.assert_array_equal(slip[rows, 2:], proj[rows, :-2])
+    np.testing.assert_array_equal(slip[~rows], proj[~rows])
+
+    cut = cube[2][:, n_act:]
+    np.testing.assert_array_equal(cut[rows, :4], proj[rows, :4])
+    np.testing.assert_allclose(cut[rows, 4:], proj[rows, 4:] * 0.7)
+
+    assert not cube[3][:, n_act:].any()
+
+    with pytest.raises(ValueError):
+        apply_scenarios(full, {"Bad": [{"op": "double"}]}, proj_week_starts)